@@ -40,6 +40,14 @@ def create_app(config_name=None):
     # Initialize extensions here (Qdrant will be initialized in services)
     # No traditional database needed
     
+    # Size the shared response caches
+    from app.utils.cache_manager import configure_caches
+    configure_caches(app.config)
+    
+    # Warm the caches from the last snapshot and keep snapshotting them
+    from app.utils.cache_snapshot import start_cache_snapshots
+    start_cache_snapshots(app.config)
+    
     # Register blueprints
     register_blueprints(app)
     
@@ -49,8 +57,25 @@ def create_app(config_name=None):
     # Add context processors for templates
     register_context_processors(app)
     
+    # Opt-in: blocks on Qdrant/Cohere; otherwise warmup_services.py or the
+    # first request's background warm-up does the one-time setup
+    if app.config.get('VECTOR_WARMUP_ON_BOOT'):
+        warm_up_services(app)
+    
     return app
 
+def warm_up_services(app, force=False):
+    """
+    Run one-time setup for services that talk to external stores
+    
+    Returns:
+        Dict of per-service warm-up results
+    """
+    from app.services.vector_service import get_vector_service
+    
+    with app.app_context():
+        return {'vector': get_vector_service().warm_up(force=force)}
+
 def register_blueprints(app):
     """Register Flask blueprints"""
     
@@ -26,8 +26,65 @@ class Config:
     # Qdrant Vector Database Configuration
     QDRANT_URL = os.environ.get('QDRANT_URL') or 'http://localhost:6333'
     QDRANT_API_KEY = os.environ.get('QDRANT_API_KEY')
+    QDRANT_PREFER_GRPC = os.environ.get('QDRANT_PREFER_GRPC', 'False').lower() == 'true'  # gRPC for lower per-query overhead
+    QDRANT_GRPC_PORT = int(os.environ.get('QDRANT_GRPC_PORT', 6334))
+    QDRANT_TIMEOUT = int(os.environ.get('QDRANT_TIMEOUT', 10))  # Seconds
+    QDRANT_PATH = os.environ.get('QDRANT_PATH')  # Embedded on-disk mode, no server (single process only)
     QDRANT_COLLECTION_NAME = 'safeindy_knowledge'
     
+    # Embedding Cache (EMBEDDING_CACHE_PATH enables a SQLite store shared by all workers)
+    EMBEDDING_CACHE_SIZE = int(os.environ.get('EMBEDDING_CACHE_SIZE', 5000))
+    EMBEDDING_CACHE_PATH = os.environ.get('EMBEDDING_CACHE_PATH')
+    
+    # Bulk Ingestion (Cohere accepts up to 96 texts per embed request)
+    EMBED_BATCH_SIZE = int(os.environ.get('EMBED_BATCH_SIZE', 96))
+    EMBED_CONCURRENCY = int(os.environ.get('EMBED_CONCURRENCY', 4))
+    QDRANT_UPSERT_BATCH_SIZE = int(os.environ.get('QDRANT_UPSERT_BATCH_SIZE', 256))
+    
+    # In-process vector index: 'fallback' (used when Qdrant is down), 'primary' or 'off'
+    VECTOR_LOCAL_INDEX = os.environ.get('VECTOR_LOCAL_INDEX', 'fallback')
+    LOCAL_INDEX_SYNC_INTERVAL = int(os.environ.get('LOCAL_INDEX_SYNC_INTERVAL', 300))
+    
+    # Embedding Backend
+    EMBEDDING_BACKEND = os.environ.get('EMBEDDING_BACKEND', 'cohere')  # 'cohere' or 'local' (hashed n-grams, no network)
+    EMBEDDING_OFFLINE_FALLBACK = os.environ.get('EMBEDDING_OFFLINE_FALLBACK', 'True').lower() == 'true'  # Local-embedding collection for Cohere outages
+    LOCAL_EMBEDDING_DIMENSIONS = int(os.environ.get('LOCAL_EMBEDDING_DIMENSIONS', 512))
+    LOCAL_EMBEDDING_COLLECTION = os.environ.get('LOCAL_EMBEDDING_COLLECTION', 'safeindy_knowledge_local')
+    
+    # Snapshots
+    VECTOR_SNAPSHOT_PATH = os.environ.get('VECTOR_SNAPSHOT_PATH')  # Restored instead of re-embedding on reset/new collection
+    
+    # Warm-up
+    VECTOR_WARMUP_ON_BOOT = os.environ.get('VECTOR_WARMUP_ON_BOOT', 'False').lower() == 'true'  # Block create_app on the collection setup
+    VECTOR_WARMUP_STATE_PATH = os.environ.get('VECTOR_WARMUP_STATE_PATH', 'vector_warmup.json')  # Shared record of the last schema check
+    VECTOR_WARMUP_MAX_AGE = int(os.environ.get('VECTOR_WARMUP_MAX_AGE', 86400))  # Re-check the schema after this many seconds
+    
+    # Retrieval Result Cache (invalidated on every collection write)
+    RETRIEVAL_CACHE_ENABLED = os.environ.get('RETRIEVAL_CACHE_ENABLED', 'True').lower() == 'true'
+    RETRIEVAL_CACHE_TTL = int(os.environ.get('RETRIEVAL_CACHE_TTL', 300))
+    RETRIEVAL_CACHE_SIZE = int(os.environ.get('RETRIEVAL_CACHE_SIZE', 1000))
+    
+    # Semantic Response Cache (reuses answers to paraphrased non-emergency questions)
+    SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'True').lower() == 'true'
+    SEMANTIC_CACHE_SIZE = int(os.environ.get('SEMANTIC_CACHE_SIZE', 2000))
+    
+    # Hybrid Retrieval
+    VECTOR_RETRIEVAL_MODE = os.environ.get('VECTOR_RETRIEVAL_MODE', 'hybrid')  # 'dense' or 'hybrid' (dense + BM25)
+    RRF_K = int(os.environ.get('RRF_K', 60))  # Reciprocal-rank fusion constant
+    KNOWLEDGE_CONTEXT_LIMIT = int(os.environ.get('KNOWLEDGE_CONTEXT_LIMIT', 3))  # Knowledge snippets sent to the LLM
+    KNOWLEDGE_SNIPPET_CHARS = int(os.environ.get('KNOWLEDGE_SNIPPET_CHARS', 300))
+    KNOWLEDGE_GEO_RADIUS_KM = float(os.environ.get('KNOWLEDGE_GEO_RADIUS_KM', 8))  # Location-tagged entries farther than this from the user are skipped
+    
+    # Collection Storage
+    QDRANT_QUANTIZATION = os.environ.get('QDRANT_QUANTIZATION', 'none')  # 'none', 'scalar' (int8) or 'binary'
+    QDRANT_QUANTIZATION_ALWAYS_RAM = os.environ.get('QDRANT_QUANTIZATION_ALWAYS_RAM', 'True').lower() == 'true'
+    QDRANT_ON_DISK_VECTORS = os.environ.get('QDRANT_ON_DISK_VECTORS', 'False').lower() == 'true'  # Full vectors on disk
+    QDRANT_HNSW_M = int(os.environ.get('QDRANT_HNSW_M', 16))
+    QDRANT_HNSW_EF_CONSTRUCT = int(os.environ.get('QDRANT_HNSW_EF_CONSTRUCT', 100))
+    QDRANT_SEARCH_HNSW_EF = int(os.environ['QDRANT_SEARCH_HNSW_EF']) if os.environ.get('QDRANT_SEARCH_HNSW_EF') else None
+    QDRANT_RESCORE = os.environ.get('QDRANT_RESCORE', 'True').lower() == 'true'  # Rescore quantized hits with full vectors
+    QDRANT_OVERSAMPLING = float(os.environ.get('QDRANT_OVERSAMPLING', 2.0))
+    
     # Session Configuration (in-memory)
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = False
@@ -64,6 +121,14 @@ class Config:
     # Cache Configuration
     CACHE_TYPE = 'simple'  # In-memory cache
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 32 * 1024 * 1024))  # Per cache (AI, location, weather, retrieval)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # 'memory' (per worker), 'sqlite' (shared on host) or 'redis'
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', 'safeindy_cache.db')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')  # Needs the redis package
+    CACHE_SNAPSHOT_PATH = os.environ.get('CACHE_SNAPSHOT_PATH')  # e.g. safeindy_cache_snapshot.jsonl; unset = no restart snapshots
+    CACHE_SNAPSHOT_INTERVAL = int(os.environ.get('CACHE_SNAPSHOT_INTERVAL', 300))  # Seconds between snapshots (also saved at shutdown)
+    WEATHER_TILE_PRECISION = int(os.environ.get('WEATHER_TILE_PRECISION', 5))  # Geohash length; 5 = ~4.9 km tiles
+    PLACES_TILE_PRECISION = int(os.environ.get('PLACES_TILE_PRECISION', 6))  # 6 = ~1.2 x 0.6 km tiles
     
     @staticmethod
     def validate_config():
@@ -297,9 +297,9 @@ def nearby_services():
 def test_vector_service():
     """Test vector database functionality"""
     try:
-        from app.services.vector_service import VectorService
+        from app.services.vector_service import get_vector_service
         
-        vector_service = VectorService()
+        vector_service = get_vector_service()
         
         # Test embedding generation
         test_text = "Indianapolis emergency services"
@@ -313,10 +313,13 @@ def test_vector_service():
         
         return jsonify({
             'success': True,
-            'embedding_dimensions': len(embedding),
+            'embedding_dimensions': len(embedding) if embedding else 0,
+            'embedding_backend': vector_service.embedding_model if vector_service.embedder else None,
             'search_results_count': len(search_result.get('results', [])),
             'collection_info': collection_info,
-            'test_embedding_sample': embedding[:5],  # First 5 values
+            'test_embedding_sample': embedding[:5] if embedding else [],  # First 5 values
+            'embedding_cache': vector_service.embedding_cache.get_stats() if vector_service.embedding_cache else None,
+            'warmup': vector_service.warmup_result,
             'timestamp': datetime.now().isoformat()
         })
         
@@ -359,14 +362,14 @@ def test_search_service():
 def reset_vector_database():
     """Reset vector database - USE WITH CAUTION"""
     try:
-        from app.services.vector_service import VectorService
+        from app.services.vector_service import get_vector_service
         
         # Add password protection
         password = request.json.get('password') if request.json else None
         if password != 'reset-safeindy-2025':  # Change this password
             return jsonify({'error': 'Invalid password'}), 401
         
-        vector_service = VectorService()
+        vector_service = get_vector_service()
         result = vector_service.reset_collection()
         
         if result:
@@ -387,9 +390,9 @@ def reset_vector_database():
 def populate_vector_database():
     """Populate vector database with initial knowledge"""
     try:
-        from app.services.vector_service import VectorService
+        from app.services.vector_service import get_vector_service
         
-        vector_service = VectorService()
+        vector_service = get_vector_service()
         
         # Check if already populated
         collection_info = vector_service.get_collection_info()
@@ -427,9 +430,10 @@ def clear_ai_cache():
     """Clear AI response cache"""
     try:
         from app.utils.cache_manager import get_ai_cache
+        from app.utils.semantic_cache import get_semantic_cache
         
-        cache = get_ai_cache()
-        # Clear the cache (implementation depends on your cache manager)
+        get_ai_cache().clear()
+        get_semantic_cache().clear()
         
         return jsonify({
             'success': True,
@@ -444,6 +448,44 @@ def clear_ai_cache():
             'timestamp': datetime.now().isoformat()
         }), 500
 
+@api_bp.route('/cache-stats')
+def cache_stats():
+    """Cache hit rates, sizes and AI response savings"""
+    try:
+        from app.utils.cache_manager import get_all_cache_stats
+        
+        return jsonify({
+            'success': True,
+            'caches': get_all_cache_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
+@api_bp.route('/cache-metrics')
+def cache_metrics():
+    """Cache counters per key prefix and intent (?cache=ai_response for one cache)"""
+    try:
+        from app.utils.cache_telemetry import get_cache_telemetry
+        
+        return jsonify({
+            'success': True,
+            'metrics': get_cache_telemetry().report(request.args.get('cache')),
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }), 500
+
 @api_bp.route('/debug-intent', methods=['POST'])
 def debug_intent_classification():
     """Debug intent classification"""
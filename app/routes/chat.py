@@ -163,7 +163,8 @@ def send_message():
             'confidence': ai_result.get('confidence'),
             'sources': ai_result.get('sources', []),
             'emergency': ai_result.get('emergency', False),
-            'has_map': bool(ai_result.get('map_html'))
+            'has_map': bool(ai_result.get('map_html')),
+            'from_cache': ai_result.get('from_cache', False)
         }
         
         # CRITICAL: Add map data if available
@@ -203,6 +204,7 @@ def send_message():
         print(f"   - Confidence: {ai_result.get('confidence')}")
         print(f"   - Has Map: {response_data['has_map']}")
         print(f"   - Sources: {len(response_data.get('sources', []))}")
+        print(f"   - From Cache: {response_data['from_cache']}")
         
         return jsonify(response_data)
         
@@ -8,6 +8,7 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import defaultdict, Counter
+import threading
 import time
 
 class AnalyticsService:
@@ -24,6 +25,7 @@ class AnalyticsService:
             'error_count': 0,
             'location_requests': 0
         }
+        self._lock = threading.Lock()  # Guards metrics and session_data across request threads
         print("✅ Analytics service initialized")
     
     def track_message(self, user_message: str, ai_response: Dict, processing_time: float, session_id: str):
@@ -32,37 +34,42 @@ class AnalyticsService:
             return
         
         try:
-            self.metrics['total_messages'] += 1
-            self.metrics['response_times'].append(processing_time)
-            
-            # Track intent distribution
             intent = ai_response.get('intent', 'unknown')
-            self.metrics['intent_distribution'][intent] += 1
+            emergency = ai_response.get('emergency', False)
+            
+            with self._lock:
+                self.metrics['total_messages'] += 1
+                self.metrics['response_times'].append(processing_time)
+                
+                # Track intent distribution
+                self.metrics['intent_distribution'][intent] += 1
+                
+                if emergency:
+                    self.metrics['emergency_alerts'] += 1
+                
+                # Track session data
+                if session_id not in self.session_data:
+                    self.metrics['user_sessions'] += 1
+                    self.session_data[session_id] = {
+                        'start_time': datetime.now().isoformat(),
+                        'message_count': 0,
+                        'intents': [],
+                        'location_shared': False,
+                        'emergency_triggered': False
+                    }
+                
+                session_info = self.session_data[session_id]
+                session_info['message_count'] += 1
+                session_info['intents'].append(intent)
+                session_info['last_activity'] = datetime.now().isoformat()
+                
+                if emergency:
+                    session_info['emergency_triggered'] = True
             
             # Track emergency events
-            if ai_response.get('emergency', False):
-                self.metrics['emergency_alerts'] += 1
+            if emergency:
                 self._log_emergency_event(f"Emergency detected in session {session_id}: {user_message[:50]}")
             
-            # Track session data
-            if session_id not in self.session_data:
-                self.metrics['user_sessions'] += 1
-                self.session_data[session_id] = {
-                    'start_time': datetime.now().isoformat(),
-                    'message_count': 0,
-                    'intents': [],
-                    'location_shared': False,
-                    'emergency_triggered': False
-                }
-            
-            session_info = self.session_data[session_id]
-            session_info['message_count'] += 1
-            session_info['intents'].append(intent)
-            session_info['last_activity'] = datetime.now().isoformat()
-            
-            if ai_response.get('emergency', False):
-                session_info['emergency_triggered'] = True
-            
             # Log detailed interaction
             self._log_interaction({
                 'timestamp': datetime.now().isoformat(),
@@ -85,17 +92,18 @@ class AnalyticsService:
             return
         
         try:
-            self.metrics['api_calls'][service_name] += 1
-            
-            if not success:
-                self.metrics['error_count'] += 1
-                self.metrics['api_calls'][f"{service_name}_errors"] += 1
-            
-            # Track API performance
-            api_key = f"{service_name}_response_times"
-            if api_key not in self.metrics:
-                self.metrics[api_key] = []
-            self.metrics[api_key].append(response_time)
+            with self._lock:
+                self.metrics['api_calls'][service_name] += 1
+                
+                if not success:
+                    self.metrics['error_count'] += 1
+                    self.metrics['api_calls'][f"{service_name}_errors"] += 1
+                
+                # Track API performance
+                api_key = f"{service_name}_response_times"
+                if api_key not in self.metrics:
+                    self.metrics[api_key] = []
+                self.metrics[api_key].append(response_time)
             
         except Exception as e:
             print(f"❌ API tracking error: {e}")
@@ -106,11 +114,12 @@ class AnalyticsService:
             return
         
         try:
-            self.metrics['location_requests'] += 1
-            
-            if session_id in self.session_data:
-                self.session_data[session_id]['location_shared'] = True
-                self.session_data[session_id]['location_source'] = source
+            with self._lock:
+                self.metrics['location_requests'] += 1
+                
+                if session_id in self.session_data:
+                    self.session_data[session_id]['location_shared'] = True
+                    self.session_data[session_id]['location_source'] = source
             
             self._log_location_event({
                 'timestamp': datetime.now().isoformat(),
@@ -145,22 +154,29 @@ class AnalyticsService:
         """Get comprehensive analytics summary"""
         try:
             now = datetime.now()
+            with self._lock:
+                response_times = list(self.metrics['response_times'])
+                sessions = [dict(s) for s in self.session_data.values()]
+                intent_distribution = Counter(self.metrics['intent_distribution'])
+                api_calls = dict(self.metrics['api_calls'])
+                counts = {key: self.metrics[key] for key in
+                          ('total_messages', 'user_sessions', 'emergency_alerts', 'location_requests', 'error_count')}
             
             # Calculate averages
-            avg_response_time = sum(self.metrics['response_times']) / len(self.metrics['response_times']) if self.metrics['response_times'] else 0
+            avg_response_time = sum(response_times) / len(response_times) if response_times else 0
             
             # Session analytics
-            active_sessions = len([s for s in self.session_data.values() 
+            active_sessions = len([s for s in sessions 
                                  if datetime.fromisoformat(s.get('last_activity', s.get('start_time'))) > now - timedelta(hours=1)])
             
             # Top intents
-            top_intents = dict(self.metrics['intent_distribution'].most_common(10))
+            top_intents = dict(intent_distribution.most_common(10))
             
             # API performance
             api_performance = {}
-            for service, count in self.metrics['api_calls'].items():
+            for service, count in api_calls.items():
                 if not service.endswith('_errors'):
-                    error_count = self.metrics['api_calls'].get(f"{service}_errors", 0)
+                    error_count = api_calls.get(f"{service}_errors", 0)
                     success_rate = ((count - error_count) / count * 100) if count > 0 else 0
                     api_performance[service] = {
                         'total_calls': count,
@@ -170,24 +186,24 @@ class AnalyticsService:
             
             return {
                 'overview': {
-                    'total_messages': self.metrics['total_messages'],
-                    'total_sessions': self.metrics['user_sessions'],
+                    'total_messages': counts['total_messages'],
+                    'total_sessions': counts['user_sessions'],
                     'active_sessions': active_sessions,
-                    'emergency_alerts': self.metrics['emergency_alerts'],
-                    'location_requests': self.metrics['location_requests'],
+                    'emergency_alerts': counts['emergency_alerts'],
+                    'location_requests': counts['location_requests'],
                     'average_response_time': round(avg_response_time, 3),
-                    'error_rate': round((self.metrics['error_count'] / max(self.metrics['total_messages'], 1)) * 100, 2)
+                    'error_rate': round((counts['error_count'] / max(counts['total_messages'], 1)) * 100, 2)
                 },
                 'user_behavior': {
                     'top_intents': top_intents,
-                    'messages_per_session': round(self.metrics['total_messages'] / max(self.metrics['user_sessions'], 1), 2),
-                    'emergency_rate': round((self.metrics['emergency_alerts'] / max(self.metrics['total_messages'], 1)) * 100, 2),
-                    'location_sharing_rate': round((self.metrics['location_requests'] / max(self.metrics['user_sessions'], 1)) * 100, 2)
+                    'messages_per_session': round(counts['total_messages'] / max(counts['user_sessions'], 1), 2),
+                    'emergency_rate': round((counts['emergency_alerts'] / max(counts['total_messages'], 1)) * 100, 2),
+                    'location_sharing_rate': round((counts['location_requests'] / max(counts['user_sessions'], 1)) * 100, 2)
                 },
                 'api_performance': api_performance,
                 'system_health': {
                     'uptime': 'Available in production',
-                    'total_errors': self.metrics['error_count'],
+                    'total_errors': counts['error_count'],
                     'last_updated': now.isoformat()
                 }
             }
@@ -198,10 +214,11 @@ class AnalyticsService:
     
     def get_session_analytics(self, session_id: str) -> Dict:
         """Get analytics for specific session"""
-        if session_id not in self.session_data:
-            return {'error': 'Session not found'}
-        
-        session_info = self.session_data[session_id]
+        with self._lock:
+            session_info = self.session_data.get(session_id)
+            if session_info is None:
+                return {'error': 'Session not found'}
+            session_info = dict(session_info, intents=list(session_info['intents']))
         
         # Calculate session duration
         start_time = datetime.fromisoformat(session_info['start_time'])
@@ -223,12 +240,15 @@ class AnalyticsService:
     def get_emergency_statistics(self) -> Dict:
         """Get emergency-specific analytics"""
         try:
-            emergency_sessions = [s for s in self.session_data.values() if s.get('emergency_triggered', False)]
+            with self._lock:
+                emergency_sessions = [dict(s) for s in self.session_data.values() if s.get('emergency_triggered', False)]
+                emergency_alerts = self.metrics['emergency_alerts']
+                user_sessions = self.metrics['user_sessions']
             
             return {
-                'total_emergency_events': self.metrics['emergency_alerts'],
+                'total_emergency_events': emergency_alerts,
                 'emergency_sessions': len(emergency_sessions),
-                'emergency_rate': round((len(emergency_sessions) / max(self.metrics['user_sessions'], 1)) * 100, 2),
+                'emergency_rate': round((len(emergency_sessions) / max(user_sessions, 1)) * 100, 2),
                 'location_provided_rate': round((sum(1 for s in emergency_sessions if s.get('location_shared', False)) / max(len(emergency_sessions), 1)) * 100, 2),
                 'response_protocol': {
                     'immediate_911_guidance': True,
@@ -269,14 +289,15 @@ class AnalyticsService:
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours_old)
             
-            old_sessions = []
-            for session_id, session_info in self.session_data.items():
-                last_activity = datetime.fromisoformat(session_info.get('last_activity', session_info.get('start_time')))
-                if last_activity < cutoff_time:
-                    old_sessions.append(session_id)
-            
-            for session_id in old_sessions:
-                del self.session_data[session_id]
+            with self._lock:
+                old_sessions = []
+                for session_id, session_info in self.session_data.items():
+                    last_activity = datetime.fromisoformat(session_info.get('last_activity', session_info.get('start_time')))
+                    if last_activity < cutoff_time:
+                        old_sessions.append(session_id)
+                
+                for session_id in old_sessions:
+                    del self.session_data[session_id]
             
             if old_sessions:
                 print(f"🧹 Cleaned up {len(old_sessions)} old sessions")
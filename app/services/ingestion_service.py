@@ -0,0 +1,356 @@
+"""
+Ingestion Service for SafeIndy Assistant
+Streams documents from disk into the Qdrant knowledge base through a
+generator chain: read -> chunk -> dedupe -> batch -> embed + upsert
+"""
+
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .vector_service import VectorService, get_vector_service
+
+SUPPORTED_EXTENSIONS = {'.md', '.markdown', '.txt', '.html', '.htm', '.jsonl'}
+
+class IngestionCheckpoint:
+    """
+    SQLite record of finished files, ingested chunk hashes and the points
+    each file produced
+
+    Lets an interrupted run resume: finished files are skipped and chunks
+    already upserted are dropped by the dedupe stage. Keeping the hashes on
+    disk also keeps dedupe memory flat for very large corpora. The point ids
+    per file let a re-ingested file drop the chunks it no longer contains.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS chunks (hash TEXT PRIMARY KEY, point_id TEXT, ingested_at TEXT)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, chunks INTEGER, finished_at TEXT)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS file_points (path TEXT, point_id TEXT, PRIMARY KEY (path, point_id))')
+        self.db.execute('CREATE TABLE IF NOT EXISTS stale_points (point_id TEXT PRIMARY KEY)')
+        self.db.commit()
+
+    def is_file_done(self, path: str, mtime: float) -> bool:
+        row = self.db.execute('SELECT mtime FROM files WHERE path = ?', (path,)).fetchone()
+        return bool(row) and row[0] == mtime
+
+    def mark_file_done(self, path: str, mtime: float, chunks: int):
+        self.db.execute(
+            'INSERT OR REPLACE INTO files (path, mtime, chunks, finished_at) VALUES (?, ?, ?, ?)',
+            (path, mtime, chunks, datetime.now().isoformat())
+        )
+        self.db.commit()
+
+    def has_chunk(self, chunk_hash: str) -> bool:
+        return self.db.execute('SELECT 1 FROM chunks WHERE hash = ?', (chunk_hash,)).fetchone() is not None
+
+    def record_chunks(self, chunks: List[tuple]):
+        """Record (payload hash, point id) pairs once their batch is upserted"""
+        now = datetime.now().isoformat()
+        self.db.executemany(
+            'INSERT OR IGNORE INTO chunks (hash, point_id, ingested_at) VALUES (?, ?, ?)',
+            [(chunk_hash, point_id, now) for chunk_hash, point_id in chunks]
+        )
+        self.db.commit()
+
+    def replace_file_points(self, path: str, point_ids: Iterable[str]):
+        """Store the ids a file produced this run; ids it no longer produces are queued as stale"""
+        current = set(point_ids)
+        previous = {row[0] for row in self.db.execute('SELECT point_id FROM file_points WHERE path = ?', (path,))}
+        self.db.execute('DELETE FROM file_points WHERE path = ?', (path,))
+        self.db.executemany('INSERT INTO file_points (path, point_id) VALUES (?, ?)',
+                            [(path, point_id) for point_id in current])
+        self.db.executemany('INSERT OR IGNORE INTO stale_points (point_id) VALUES (?)',
+                            [(point_id,) for point_id in previous - current])
+        self.db.commit()
+
+    def stale_points(self) -> List[str]:
+        """Queued ids that no file produces any more (the same chunk may come from several files)"""
+        self.db.execute('DELETE FROM stale_points WHERE point_id IN (SELECT point_id FROM file_points)')
+        self.db.commit()
+        return [row[0] for row in self.db.execute('SELECT point_id FROM stale_points')]
+
+    def forget_points(self, point_ids: List[str]):
+        """Drop deleted points from the queue and their chunk hashes, so a later run writes them again"""
+        self.db.executemany('DELETE FROM stale_points WHERE point_id = ?', [(point_id,) for point_id in point_ids])
+        self.db.executemany('DELETE FROM chunks WHERE point_id = ?', [(point_id,) for point_id in point_ids])
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+class IngestionService:
+    """Library entry point for bulk knowledge base ingestion"""
+
+    def __init__(self, vector_service: VectorService = None, chunk_size: int = 1200,
+                 chunk_overlap: int = 150, batch_size: int = None):
+        self.vector_service = vector_service or get_vector_service()
+        self.chunk_size = chunk_size  # Characters per chunk
+        self.chunk_overlap = chunk_overlap  # Characters carried into the next chunk
+        self.batch_size = batch_size  # Defaults to one full round of concurrent embed requests
+        self.stats = self._empty_stats()
+
+    def ingest_paths(self, paths: List[str], category: str = 'general', source: str = None,
+                     checkpoint_path: str = None) -> Dict:
+        """
+        Ingest files and directories into the knowledge base
+
+        Args:
+            paths: Files or directories (searched recursively)
+            category: Default category for chunks (JSONL records may override)
+            source: Default source label (defaults to the file name)
+            checkpoint_path: SQLite checkpoint file enabling resume; it also
+                records the points each file produced, so chunks an edited
+                file no longer contains are deleted after the run
+
+        Returns:
+            Dict with ingestion statistics
+        """
+        self.vector_service.warm_up()
+        if not self.vector_service.client:
+            return {'success': False, 'error': 'Vector service not available'}
+
+        self.stats = self._empty_stats()
+        checkpoint = IngestionCheckpoint(checkpoint_path) if checkpoint_path else None
+        batch_size = self.batch_size or (
+            self.vector_service.embed_batch_size * self.vector_service.embed_concurrency
+        )
+
+        try:
+            for path, mtime in self.iter_files(paths):
+                if checkpoint and checkpoint.is_file_done(path, mtime):
+                    self.stats['files_skipped'] += 1
+                    continue
+
+                emitted = set()  # Every point id the file produces, duplicates included
+                chunks = self.chunk_documents(self.read_document(path, category, source))
+                fresh = self.dedupe(self._track_ids(chunks, emitted), checkpoint)
+
+                file_chunks = 0
+                for batch in self.batched(fresh, batch_size):
+                    self._write_batch(batch, checkpoint)
+                    file_chunks += len(batch)
+
+                if checkpoint:
+                    checkpoint.replace_file_points(path, emitted)
+                    checkpoint.mark_file_done(path, mtime, file_chunks)
+                self.stats['files_processed'] += 1
+                print(f"📄 {path}: {file_chunks} new chunks")
+
+            # After the run, so a chunk that moved to a later file isn't dropped
+            if checkpoint:
+                self._remove_stale(checkpoint)
+
+            self.stats['success'] = True
+
+        except Exception as e:
+            print(f"❌ Ingestion error: {e}")
+            self.stats['success'] = False
+            self.stats['error'] = str(e)
+
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        self.stats['finished_at'] = datetime.now().isoformat()
+        return self.stats
+
+    # Generator stages
+
+    def iter_files(self, paths: List[str]) -> Iterator[tuple]:
+        """Yield (path, mtime) for supported files, directories walked in sorted order"""
+        for root_path in paths:
+            if os.path.isdir(root_path):
+                for dirpath, dirnames, filenames in os.walk(root_path):
+                    dirnames.sort()
+                    for filename in sorted(filenames):
+                        path = os.path.join(dirpath, filename)
+                        if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                            yield path, os.path.getmtime(path)
+            elif os.path.isfile(root_path):
+                yield root_path, os.path.getmtime(root_path)
+            else:
+                print(f"⚠️ Skipping missing path: {root_path}")
+
+    def read_document(self, path: str, category: str, source: str = None) -> Iterator[Dict]:
+        """
+        Yield documents from a file as {'text', 'category', 'source', 'metadata'}
+
+        Markdown/text/HTML files are one document; JSONL files yield one
+        document per line with a 'content' field.
+        """
+        extension = os.path.splitext(path)[1].lower()
+        default_source = source or os.path.basename(path)
+
+        if extension == '.jsonl':
+            with open(path, encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Bad JSON at {path}:{line_number}")
+                        continue
+                    if not record.get('content'):
+                        continue
+                    yield {
+                        'text': record['content'],
+                        'category': record.get('category', category),
+                        'source': record.get('source', default_source),
+                        'metadata': {k: v for k, v in record.items()
+                                     if k not in ('content', 'category', 'source', 'id')}
+                    }
+            return
+
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+
+        if extension in ('.html', '.htm'):
+            text = self._html_to_text(text)
+
+        yield {
+            'text': text,
+            'category': category,
+            'source': default_source,
+            'metadata': {'file_path': path}
+        }
+
+    def chunk_documents(self, documents: Iterable[Dict]) -> Iterator[Dict]:
+        """Split documents on paragraph boundaries into ~chunk_size pieces with overlap"""
+        for document in documents:
+            paragraphs = [p.strip() for p in re.split(r'\n\s*\n', document['text']) if p.strip()]
+            buffer = ''
+            chunk_index = 0
+
+            for paragraph in paragraphs:
+                # Hard-split paragraphs that are longer than a chunk on their own
+                while len(paragraph) > self.chunk_size:
+                    cut = paragraph.rfind(' ', 0, self.chunk_size)
+                    cut = cut if cut > 0 else self.chunk_size
+                    if buffer:
+                        yield self._make_chunk(document, buffer, chunk_index)
+                        chunk_index += 1
+                        buffer = ''
+                    yield self._make_chunk(document, paragraph[:cut], chunk_index)
+                    chunk_index += 1
+                    # Carry overlap only when it still moves the window forward
+                    tail = self._overlap_tail(paragraph[:cut]) if cut > 2 * self.chunk_overlap else ''
+                    paragraph = f"{tail} {paragraph[cut:].strip()}".strip()
+
+                if buffer and len(buffer) + len(paragraph) + 2 > self.chunk_size:
+                    yield self._make_chunk(document, buffer, chunk_index)
+                    chunk_index += 1
+                    buffer = self._overlap_tail(buffer)
+
+                buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+
+            if buffer.strip():
+                yield self._make_chunk(document, buffer, chunk_index)
+
+    def dedupe(self, chunks: Iterable[Dict], checkpoint: IngestionCheckpoint = None) -> Iterator[Dict]:
+        """
+        Drop chunks already written in this run or a previous one
+
+        Keyed on the payload hash, so the same text with a new category,
+        source or metadata still goes through and is rewritten.
+        """
+        seen_in_run = set()
+        for chunk in chunks:
+            self.stats['chunks_seen'] += 1
+            chunk_hash = self.vector_service.payload_hash(chunk)
+            if chunk_hash in seen_in_run or (checkpoint and checkpoint.has_chunk(chunk_hash)):
+                self.stats['duplicates_skipped'] += 1
+                continue
+            seen_in_run.add(chunk_hash)
+            yield chunk
+
+    def batched(self, items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+        """Group a stream into lists of at most size items"""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # Helpers
+
+    def _write_batch(self, batch: List[Dict], checkpoint: IngestionCheckpoint = None):
+        """Embed and upsert one batch; raise so the checkpoint never runs ahead of Qdrant"""
+        point_ids = self.vector_service.add_knowledge_batch(batch)
+        if len(point_ids) != len(batch):
+            raise RuntimeError(f"Batch of {len(batch)} chunks failed to upsert")
+
+        if checkpoint:
+            checkpoint.record_chunks([(self.vector_service.payload_hash(chunk), chunk['id']) for chunk in batch])
+        self.stats['chunks_ingested'] += len(batch)
+
+    def _track_ids(self, chunks: Iterable[Dict], emitted: set) -> Iterator[Dict]:
+        """Pass chunks through, noting their point ids"""
+        for chunk in chunks:
+            emitted.add(chunk['id'])
+            yield chunk
+
+    def _remove_stale(self, checkpoint: IngestionCheckpoint):
+        """Delete points re-ingested files no longer produce; kept queued for the next run if Qdrant refuses"""
+        stale = checkpoint.stale_points()
+        if not stale:
+            return
+        if not self.vector_service.delete_knowledge_batch(stale):
+            raise RuntimeError(f"Failed to delete {len(stale)} stale chunks")
+        checkpoint.forget_points(stale)
+        self.stats['stale_chunks_deleted'] += len(stale)
+
+    def _make_chunk(self, document: Dict, text: str, chunk_index: int) -> Dict:
+        text = text.strip()
+        chunk = {
+            'id': self.vector_service.content_point_id(text),  # Content-addressed, re-ingestion overwrites
+            'content': text,
+            'content_hash': self.vector_service.content_hash(text),
+            'category': document['category'],
+            'source': document['source'],
+            'chunk_index': chunk_index
+        }
+        chunk.update(document.get('metadata', {}))
+        return chunk
+
+    def _overlap_tail(self, text: str) -> str:
+        """Last chunk_overlap characters of text, starting on a word boundary"""
+        if not self.chunk_overlap:
+            return ''
+        tail = text[-self.chunk_overlap:]
+        space = tail.find(' ')
+        return tail[space + 1:] if 0 <= space < len(tail) - 1 else tail
+    
+    def _html_to_text(self, html: str) -> str:
+        """Convert HTML to paragraph text, keeping block boundaries"""
+        try:
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html, 'html.parser')
+            for tag in soup(['script', 'style', 'nav', 'header', 'footer']):
+                tag.decompose()
+            return soup.get_text('\n\n')
+        except ImportError:
+            text = re.sub(r'(?is)<(script|style).*?</\1>', '', html)
+            text = re.sub(r'(?i)</(p|div|li|h[1-6]|tr|section)>', '\n\n', text)
+            return re.sub(r'<[^>]+>', '', text)
+
+    def _empty_stats(self) -> Dict:
+        return {
+            'files_processed': 0,
+            'files_skipped': 0,
+            'chunks_seen': 0,
+            'duplicates_skipped': 0,
+            'chunks_ingested': 0,
+            'stale_chunks_deleted': 0,
+            'started_at': datetime.now().isoformat()
+        }
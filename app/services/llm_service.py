@@ -186,10 +186,22 @@ CURRENT CONTEXT:"""
         if context and 'location' in context:
             base_prompt += f"\n- User location: {context['location']}"
         
+        # Prefer compact contact facts over whole search paragraphs
+        if context and context.get('contact_facts'):
+            facts = '\n  • '.join(context['contact_facts'])
+            base_prompt += f"\n- Verified Indianapolis contacts:\n  • {facts}"
+            if 'search_results' in context:
+                base_prompt += f"\n- Recent Indianapolis data (excerpt): {str(context['search_results'])[:600]}"
+        
         # Add any recent search results or data
-        if context and 'search_results' in context:
+        elif context and 'search_results' in context:
             base_prompt += f"\n- Recent Indianapolis data: {context['search_results']}"
         
+        # Add top knowledge base snippets
+        if context and context.get('knowledge_base'):
+            snippets = '\n  • '.join(context['knowledge_base'])
+            base_prompt += f"\n- SafeIndy knowledge base:\n  • {snippets}"
+        
         base_prompt += "\n\nRespond as SafeIndy Assistant with helpful, accurate Indianapolis public safety guidance."
         
         return base_prompt
@@ -10,6 +10,28 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import re
 
+from app.utils import geohash
+from app.utils.cache_decorator import cached
+from app.utils.geo_filter import haversine_km
+from app.utils.cache_manager import get_location_cache
+
+def _places_tile_key(lat: float, lng: float, place_type: str, radius: int = 10000) -> Dict:
+    """Searches from the same places tile share an entry"""
+    return {'tile': geohash.tile_for(lat, lng, 'places'), 'type': place_type, 'radius': radius}
+
+def _places_neighbor_keys(lat: float, lng: float, place_type: str, radius: int = 10000) -> List[Dict]:
+    """Keys of the surrounding places tiles, closest first"""
+    return [{'tile': tile, 'type': place_type, 'radius': radius}
+            for tile in geohash.nearest_neighbors(lat, lng, 'places')]
+
+def _localize_places(result: Dict, lat: float, lng: float, place_type: str, radius: int = 10000) -> Dict:
+    """Re-measure a cached search from the caller's own point, nearest first"""
+    for place in result.get('places', []):
+        place['distance'] = round(haversine_km(lat, lng, place['lat'], place['lng']), 2)
+    result.get('places', []).sort(key=lambda x: x['distance'])
+    result['search_location'] = {'lat': lat, 'lng': lng}
+    return result
+
 class LocationService:
     def __init__(self):
         self.api_key = None
@@ -30,6 +52,9 @@ class LocationService:
         except Exception as e:
             print(f"❌ Failed to initialize Google Maps client: {e}")
     
+    @cached(ttl=3600, stale_ttl=86400, negative_ttl=60, cache=get_location_cache,
+            key=_places_tile_key, neighbors=_places_neighbor_keys, adapt=_localize_places,
+            is_failure=lambda result: not result.get('success'))
     def find_nearby_places(self, lat: float, lng: float, place_type: str, radius: int = 10000) -> Dict:
         """
         FIXED: Find nearby places with proper error handling and data formatting
@@ -133,6 +158,8 @@ class LocationService:
                 'places': []
             }
     
+    @cached(ttl=86400, negative_ttl=300, cache=get_location_cache,
+            is_failure=lambda result: not result.get('success'))
     def get_place_details(self, place_id: str) -> Dict:
         """Get detailed information about a specific place"""
         if not self.api_key:
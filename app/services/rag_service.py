@@ -5,12 +5,16 @@ Location-aware responses with emergency alerts, no circular imports
 
 from flask import current_app, session
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
+import re
+import time
 
 from .llm_service import LLMService  
 from .search_service import SearchService
-from .vector_service import VectorService
+from .vector_service import get_vector_service
+from app.utils.cache_manager import get_ai_cache
+from app.utils.semantic_cache import get_semantic_cache
 
 class RAGService:
     """
@@ -22,10 +26,11 @@ class RAGService:
     """
     
     def __init__(self):
+        self.response_cache = get_ai_cache()
         try:
             self.llm_service = LLMService()
             self.search_service = SearchService()
-            self.vector_service = VectorService()
+            self.vector_service = get_vector_service()
             print("✅ RAG Service initialized (simplified - no maps)")
         except Exception as e:
             print(f"❌ RAG Service initialization error: {e}")
@@ -55,30 +60,26 @@ class RAGService:
                 'confidence': confidence
             }
             
-            # Route to appropriate handler based on intent
-            if intent == 'emergency' and confidence >= 0.7:
-                print("🚨 Processing as emergency...")
-                return self._process_emergency_query(user_message, session_context, intent_result)
+            # Repeated FAQ-style questions (verbatim or paraphrased) skip the LLM and search round trip
+            cacheable = self._is_response_cacheable(user_message, intent, session_context)
+            query_vector = None
+            if cacheable:
+                cached_response = self.response_cache.get_ai_response(user_message, intent)
+                if cached_response is None:
+                    cached_response, query_vector = self._get_semantic_response(user_message, intent, session_context)
+                if cached_response:
+                    cached_response['timestamp'] = datetime.now().isoformat()
+                    return cached_response
             
-            elif intent in ['medical', 'police', 'location'] and confidence >= 0.7:
-                print(f"📍 Processing as location-based query: {intent}")
-                return self._process_location_query(user_message, session_context, intent_result)
-            
-            elif intent == 'bot_capabilities':
-                print("🤖 Processing bot capabilities question...")
-                return self._handle_capability_questions(user_message)
-            
-            elif intent == 'multiple_questions':
-                print("❓ Processing multiple questions...")
-                return self._handle_multiple_questions(user_message, session_context)
-            
-            elif intent == 'information':
-                print("📚 Processing information request...")
-                return self._handle_information_request(user_message, session_context, intent_result)
+            started = time.perf_counter()
+            result = self._route_message(user_message, session_context, intent_result)
+            generation_time = time.perf_counter() - started
             
-            else:
-                print(f"💬 Processing as general query: {intent}")
-                return self._process_general_query(user_message, session_context, intent_result)
+            if cacheable and self.response_cache.cache_ai_response(user_message, intent, result, generation_time) \
+                    and query_vector is not None:
+                self._cache_semantic_response(user_message, query_vector, intent, result, generation_time,
+                                              session_context)
+            return result
             
         except Exception as e:
             print(f"❌ RAG processing error: {e}")
@@ -86,6 +87,114 @@ class RAGService:
             traceback.print_exc()
             return self._get_fallback_response(user_message, str(e))
 
+    def _route_message(self, user_message: str, session_context: Dict, intent_result: Dict) -> Dict:
+        """Route a classified message to its handler"""
+        intent = intent_result['intent']
+        confidence = intent_result['confidence']
+        
+        # Route to appropriate handler based on intent
+        if intent == 'emergency' and confidence >= 0.7:
+            print("🚨 Processing as emergency...")
+            return self._process_emergency_query(user_message, session_context, intent_result)
+        
+        elif intent in ['medical', 'police', 'location'] and confidence >= 0.7:
+            print(f"📍 Processing as location-based query: {intent}")
+            return self._process_location_query(user_message, session_context, intent_result)
+        
+        elif intent == 'bot_capabilities':
+            print("🤖 Processing bot capabilities question...")
+            return self._handle_capability_questions(user_message)
+        
+        elif intent == 'multiple_questions':
+            print("❓ Processing multiple questions...")
+            return self._handle_multiple_questions(user_message, session_context)
+        
+        elif intent == 'information':
+            print("📚 Processing information request...")
+            return self._handle_information_request(user_message, session_context, intent_result)
+        
+        else:
+            print(f"💬 Processing as general query: {intent}")
+            return self._process_general_query(user_message, session_context, intent_result)
+
+    def _is_response_cacheable(self, user_message: str, intent: str, session_context: Dict) -> bool:
+        """
+        Whether the answer can come from (and go to) the response cache
+        
+        Never for emergency or location queries, and only for sessions with
+        no location or chat history: those go into the prompt and the
+        knowledge filter, so the answer would be personal to this user.
+        """
+        if self._is_personal_session(session_context):
+            return False
+        return bool(self.response_cache.ttl_for_intent(intent)) \
+            and not self._needs_location_context(user_message, intent)
+
+    def _is_personal_session(self, session_context: Dict) -> bool:
+        """Whether the session has a location or chat history that shapes its answers"""
+        return bool(session_context.get('location') or session_context.get('chat_history'))
+
+    def _semantic_cache_for(self, intent: str, session_context: Dict):
+        """
+        Semantic response cache, if enabled, the intent has a similarity
+        threshold and the session isn't personal
+        """
+        if self._is_personal_session(session_context):
+            return None
+        try:
+            if not self.vector_service or not current_app.config.get('SEMANTIC_CACHE_ENABLED', True):
+                return None
+        except RuntimeError:
+            return None  # No app context
+        cache = get_semantic_cache()
+        return cache if cache.threshold_for_intent(intent) else None
+    
+    def _get_semantic_response(self, user_message: str, intent: str,
+                               session_context: Dict) -> Tuple[Optional[Dict], Optional[List[float]]]:
+        """
+        Look for a cached answer to a paraphrase of this message
+        
+        Returns:
+            (cached response or None, query embedding for caching this answer later or None)
+        """
+        cache = self._semantic_cache_for(intent, session_context)
+        if cache is None:
+            return None, None
+        
+        try:
+            # Same text and input type as the knowledge search, so the embedding is reused there
+            query_vector = self.vector_service.embed_query(user_message)
+            if query_vector is None:
+                return None, None
+            
+            cached_response = cache.lookup(query_vector, intent, self.vector_service.embedding_model)
+            if cached_response:
+                cached_response['from_cache'] = True
+                self.response_cache.record_served(f"semantic:{intent}", cached_response.get('generation_time', 0.0))
+                match = cached_response['semantic_match']
+                print(f"✅ Semantic cache hit for AI response: {intent} "
+                      f"(similarity {match['similarity']}, saved ~{cached_response.get('generation_time', 0.0):.2f}s)")
+            return cached_response, query_vector
+            
+        except Exception as e:
+            print(f"⚠️ Semantic cache lookup error: {e}")
+            return None, None
+    
+    def _cache_semantic_response(self, user_message: str, query_vector: List[float], intent: str,
+                                 result: Dict, generation_time: float, session_context: Dict):
+        """Store a freshly generated answer for future paraphrases"""
+        cache = self._semantic_cache_for(intent, session_context)
+        if cache is None:
+            return
+        
+        try:
+            response = result.copy()
+            response['generation_time'] = round(generation_time, 3)
+            cache.add(user_message, query_vector, intent, self.vector_service.embedding_model,
+                      response, self.response_cache.ttl_for_intent(intent))
+        except Exception as e:
+            print(f"⚠️ Semantic cache store error: {e}")
+
     def _get_service_unavailable_response(self, user_message: str) -> Dict:
         """Response when core services are unavailable"""
         return {
@@ -153,7 +262,7 @@ Please try again in a moment while I reconnect to my services.""",
             if self.search_service:
                 search_results = self._get_search_results(user_message, 'emergency')
             if self.vector_service:
-                vector_results = self._get_vector_context(user_message, 'emergency')
+                vector_results = self._get_vector_context(user_message, 'emergency', session_context.get('location'))
             
             # Generate immediate emergency response
             emergency_response = self._handle_emergency_response(user_message, intent_result)
@@ -218,7 +327,7 @@ Please try again in a moment while I reconnect to my services.""",
             if self.search_service:
                 search_results = self._get_search_results(user_message, intent)
             if self.vector_service:
-                vector_results = self._get_vector_context(user_message, intent)
+                vector_results = self._get_vector_context(user_message, intent, session_context.get('location'))
             
             # Build enhanced context for AI response
             enhanced_context = self._build_enhanced_context(
@@ -289,7 +398,7 @@ Please try again in a moment while I reconnect to my services.""",
                 if self.search_service:
                     search_results = self._get_search_results(user_message, intent)
                 if self.vector_service:
-                    vector_results = self._get_vector_context(user_message, intent)
+                    vector_results = self._get_vector_context(user_message, intent, session_context.get('location'))
             
             # Build context
             enhanced_context = self._build_enhanced_context(
@@ -301,9 +410,12 @@ Please try again in a moment while I reconnect to my services.""",
             
             # Generate response
             response_text = 'I apologize, but I encountered an issue generating a response.'
+            llm_error = None
             if self.llm_service:
                 ai_response = self.llm_service.generate_response(user_message, context=enhanced_context)
                 response_text = ai_response.get('response', response_text)
+                if ai_response.get('intent') == 'error':
+                    llm_error = ai_response.get('error', 'AI service unavailable')
             
             # Format the response text to convert markdown links to HTML
             response_text = self._format_response_text(response_text)
@@ -317,6 +429,8 @@ Please try again in a moment while I reconnect to my services.""",
                 'emergency': False,
                 'timestamp': datetime.now().isoformat()
             }
+            if llm_error:
+                result['error'] = llm_error  # Keeps the apology out of the response cache
             
             print(f"✅ General query processed. Intent: {intent}")
             return result
@@ -617,6 +731,11 @@ What specific area would you like current information about?"""
         multi_context['multi_question_mode'] = True
         multi_context['instruction'] = "The user has asked multiple questions. Address each one clearly with organized sections."
         
+        # Retrieve knowledge for every sub-question in one batched search
+        knowledge = self._get_multi_question_knowledge(user_message)
+        if knowledge['snippets']:
+            multi_context['knowledge_base'] = knowledge['snippets']
+        
         # Process through LLM with structured response request
         llm_result = {}
         if self.llm_service:
@@ -637,9 +756,40 @@ What specific area would you like current information about?"""
             'intent': 'multiple_questions',
             'confidence': llm_result.get('confidence', 0.7),
             'emergency': False,
+            'sources': knowledge['sources'],
             'timestamp': datetime.now().isoformat()
         }
 
+    def _get_multi_question_knowledge(self, user_message: str) -> Dict:
+        """Split a compound message into questions and search them as one batch"""
+        knowledge = {'snippets': [], 'sources': []}
+        questions = [q.strip() for q in re.findall(r'[^?]+\?', user_message) if len(q.strip()) > 3]
+        if not self.vector_service or not questions:
+            return knowledge
+        
+        try:
+            intents = [self.llm_service._classify_intent(q, "")[0] if self.llm_service else None for q in questions]
+            
+            # Keep the total context budget of a single question
+            context_limit = current_app.config.get('KNOWLEDGE_CONTEXT_LIMIT', 3)
+            snippet_chars = current_app.config.get('KNOWLEDGE_SNIPPET_CHARS', 300)
+            limit = max(1, context_limit // len(questions))
+            
+            batch_results = self.vector_service.search_knowledge_batch(questions, intents, limit=limit)
+            
+            for question, results in zip(questions, batch_results):
+                for result in results.get('results', []):
+                    if result.get('content'):
+                        knowledge['snippets'].append(f"({question}) {result['content'][:snippet_chars]}")
+                for source in results.get('sources', [])[:1]:
+                    if source not in knowledge['sources']:
+                        knowledge['sources'].append(source)
+        
+        except Exception as e:
+            print(f"⚠️ Multi-question knowledge search error: {e}")
+        
+        return knowledge
+
     def _handle_information_request(self, user_message: str, session_context: Dict, intent_result: Dict) -> Dict:
         """Handle informational queries with enhanced context"""
         # Get relevant information through normal RAG pipeline
@@ -755,13 +905,15 @@ For non-emergency assistance, I can help guide you to current resources."""
             print(f"⚠️ Search error: {e}")
             return None
 
-    def _get_vector_context(self, user_message: str, intent: str) -> Optional[Dict]:
-        """Get relevant context from vector database"""
+    def _get_vector_context(self, user_message: str, intent: str, location: Dict = None) -> Optional[Dict]:
+        """Get relevant context from vector database, near the user's location if known"""
         if not self.vector_service:
             return None
             
         try:
-            return self.vector_service.search_knowledge(user_message, intent)
+            # Hybrid retrieval ranks well enough to keep the LLM context small
+            limit = current_app.config.get('KNOWLEDGE_CONTEXT_LIMIT', 3)
+            return self.vector_service.search_knowledge(user_message, intent, limit=limit, location=location)
         except Exception as e:
             print(f"⚠️ Vector search error: {e}")
             return None
@@ -777,9 +929,16 @@ For non-emergency assistance, I can help guide you to current resources."""
             enhanced_context['search_results'] = search_results['results']
             enhanced_context['search_sources'] = search_results.get('sources', [])
         
+        # Add structured contacts parsed from these search results (not the whole category's index)
+        if search_results and search_results.get('contacts') and self.search_service:
+            enhanced_context['contact_facts'] = self.search_service.contact_index.format_records(search_results['contacts'])
+        
         # Add vector knowledge
         if vector_results and vector_results.get('results'):
-            enhanced_context['knowledge_base'] = vector_results['results']
+            snippet_chars = current_app.config.get('KNOWLEDGE_SNIPPET_CHARS', 300)
+            enhanced_context['knowledge_base'] = [
+                result['content'][:snippet_chars] for result in vector_results['results'] if result.get('content')
+            ]
         
         # Add initial classification
         enhanced_context['initial_intent'] = intent_result.get('intent')
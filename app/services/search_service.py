@@ -8,11 +8,15 @@ import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from app.utils.cache_decorator import cached
+from app.utils.contact_extractor import get_contact_index
+
 class SearchService:
     def __init__(self):
         self.api_key = None
         self.base_url = "https://api.perplexity.ai/chat/completions"
         self.model = "llama-3.1-sonar-small-128k-online"  # Sonar model for web search
+        self.contact_index = get_contact_index()
         self._initialized = False
     
     def _ensure_initialized(self):
@@ -45,7 +49,11 @@ class SearchService:
         }
         
         query = emergency_queries.get(emergency_type, emergency_queries['general'])
-        return self._search_with_focus(query, 'emergency_services')
+        result = self._search_with_focus(query, 'emergency_services')
+        
+        # Contact categories line up with intents ('poison' and 'general' are emergency contacts)
+        category = emergency_type if emergency_type in ['police', 'fire', 'medical', 'weather'] else 'emergency'
+        return self._index_contacts(result, category)
     
     def search_community_resources(self, resource_type: str) -> Dict:
         """Search for current community resources and services"""
@@ -61,7 +69,10 @@ class SearchService:
         }
         
         query = resource_queries.get(resource_type, resource_queries['general'])
-        return self._search_with_focus(query, 'community_resources')
+        result = self._search_with_focus(query, 'community_resources')
+        
+        category = 'medical' if resource_type in ['hospitals', 'mental_health'] else 'community'
+        return self._index_contacts(result, category)
     
     def search_city_services(self, service_type: str) -> Dict:
         """Search for Indianapolis city services information"""
@@ -78,7 +89,8 @@ class SearchService:
         }
         
         query = service_queries.get(service_type, service_queries['general'])
-        return self._search_with_focus(query, 'city_services')
+        result = self._search_with_focus(query, 'city_services')
+        return self._index_contacts(result, 'city_services')
     
     def search_weather_alerts(self) -> Dict:
         """Search for current Indianapolis weather alerts"""
@@ -86,10 +98,39 @@ class SearchService:
         query = 'Indianapolis Indiana weather alerts warnings current conditions emergency notifications today'
         return self._search_with_focus(query, 'weather')
     
+    # Focus areas whose answers go stale within minutes (alerts, closures)
+    LIVE_FOCUS_AREAS = ('weather', 'emergency_services')
+    
     def _search_with_focus(self, query: str, focus_area: str) -> Dict:
         """
         Enhanced search with focus on getting current, accurate information
+        
+        Weather and emergency searches are only reused for two minutes and
+        never served stale. Other results are cached for 30 minutes and
+        served stale for another hour while a background search refreshes
+        them. Failures are remembered briefly so an outage isn't hit on every
+        request.
         """
+        if focus_area in self.LIVE_FOCUS_AREAS:
+            return self._search_live(query, focus_area)
+        return self._search_reference(query, focus_area)
+    
+    @cached(ttl=120, negative_ttl=30,
+            key=lambda query, focus_area: {'query': query.lower().strip(), 'focus_area': focus_area},
+            is_failure=lambda result: bool(result.get('error')))
+    def _search_live(self, query: str, focus_area: str) -> Dict:
+        """Search for time-sensitive information (short TTL, no stale serving)"""
+        return self._search_uncached(query, focus_area)
+    
+    @cached(ttl=1800, stale_ttl=3600, negative_ttl=120,
+            key=lambda query, focus_area: {'query': query.lower().strip(), 'focus_area': focus_area},
+            is_failure=lambda result: bool(result.get('error')))
+    def _search_reference(self, query: str, focus_area: str) -> Dict:
+        """Search for slow-changing reference information (stale-while-revalidate)"""
+        return self._search_uncached(query, focus_area)
+    
+    def _search_uncached(self, query: str, focus_area: str) -> Dict:
+        """Run one focused Perplexity search"""
         if not self.api_key:
             return {
                 'results': f'Real-time search unavailable. Please visit indy.gov for current {focus_area} information.',
@@ -189,6 +230,25 @@ class SearchService:
             print(f"❌ Search service error: {e}")
             return self._get_fallback_search_result(focus_area)
 
+    def _index_contacts(self, result: Dict, category: str) -> Dict:
+        """
+        Parse contacts out of a live search result into the contact index
+        
+        Adds a 'contacts' list of structured records to the result so callers
+        can use compact facts instead of the raw answer text.
+        """
+        if result.get('error') or not isinstance(result.get('results'), str):
+            return result
+        
+        try:
+            source = result['sources'][0].get('url') if result.get('sources') else None
+            result['contacts'] = self.contact_index.index_text(category, result['results'], source)
+            result['contact_category'] = category
+        except Exception as e:
+            print(f"⚠️ Contact extraction error: {e}")
+        
+        return result
+    
     def _build_focused_query(self, user_query: str, focus_area: str) -> str:
         """Build optimized search query for specific focus areas"""
         
@@ -0,0 +1,155 @@
+"""
+Snapshot Service for SafeIndy Assistant
+Exports the knowledge collection (ids, vectors, payloads) to compact files and
+restores it with streaming bulk upserts, so rebuilding a node or seeding a
+test environment costs no embedding calls
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+from qdrant_client.http.models import PointStruct
+
+from .vector_service import VectorService, get_vector_service
+
+MANIFEST_FILE = 'manifest.json'
+VECTORS_FILE = 'vectors.npy'  # float32 matrix, one row per point
+PAYLOADS_FILE = 'payloads.jsonl'  # {"id", "payload"} per line, same order as the rows
+
+class SnapshotService:
+    """Export and restore the knowledge collection as a snapshot directory"""
+
+    def __init__(self, vector_service: VectorService = None):
+        self.vector_service = vector_service or get_vector_service()
+
+    def export_collection(self, path: str) -> Dict:
+        """
+        Stream the collection into path/ (vectors.npy, payloads.jsonl, manifest.json)
+
+        Vectors are written into a memory-mapped .npy file as they are
+        scrolled, so memory use stays at one scroll page.
+
+        Returns:
+            Dict with success flag and the manifest
+        """
+        vs = self.vector_service
+        vs._ensure_initialized()
+        if not vs.client:
+            return {'success': False, 'error': 'Vector service not available'}
+
+        try:
+            os.makedirs(path, exist_ok=True)
+            total = vs.client.count(vs.collection_name, exact=True).count
+
+            vectors = np.lib.format.open_memmap(
+                os.path.join(path, VECTORS_FILE), mode='w+',
+                dtype=np.float32, shape=(total, vs.vector_dimensions)
+            )
+            written = 0
+            offset = None
+
+            with open(os.path.join(path, PAYLOADS_FILE), 'w', encoding='utf-8') as f:
+                while written < total:
+                    points, offset = vs.client.scroll(
+                        collection_name=vs.collection_name,
+                        limit=vs.upsert_batch_size,
+                        offset=offset,
+                        with_payload=True,
+                        with_vectors=True
+                    )
+                    # Points added after the count are left for the next export
+                    for point in points[:total - written]:
+                        vectors[written] = point.vector
+                        f.write(json.dumps({'id': point.id, 'payload': point.payload or {}}) + '\n')
+                        written += 1
+                    if offset is None:
+                        break
+
+            vectors.flush()
+            del vectors
+
+            manifest = {
+                'collection': vs.collection_name,
+                'embedding_model': vs.embedding_model,
+                'dimensions': vs.vector_dimensions,
+                'points': written,  # Rows past this (points deleted mid-export) are ignored
+                'created_at': datetime.now().isoformat()
+            }
+            with open(os.path.join(path, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            print(f"✅ Exported {written} points to {path}")
+            return {'success': True, **manifest}
+
+        except Exception as e:
+            print(f"❌ Snapshot export error: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def restore_collection(self, path: str, recreate: bool = False) -> Dict:
+        """
+        Bulk upsert a snapshot into the collection
+
+        Rows are read from a memory-mapped vectors.npy alongside the payload
+        JSONL and upserted in upsert_batch_size batches. In-process mirrors
+        are not refreshed here; callers sync them once afterwards.
+
+        Args:
+            path: Snapshot directory
+            recreate: Drop and recreate the collection first
+
+        Returns:
+            Dict with success flag and number of points restored
+        """
+        vs = self.vector_service
+        vs._ensure_initialized()
+        if not vs.client:
+            return {'success': False, 'error': 'Vector service not available'}
+
+        try:
+            manifest = self.read_manifest(path)
+
+            # Vectors from another model or size would silently ruin search quality
+            if manifest['dimensions'] != vs.vector_dimensions or manifest['embedding_model'] != vs.embedding_model:
+                raise Exception(
+                    f"Snapshot is {manifest['embedding_model']}/{manifest['dimensions']}d, "
+                    f"collection expects {vs.embedding_model}/{vs.vector_dimensions}d"
+                )
+
+            if recreate:
+                vs.recreate_collection()
+            else:
+                vs.ensure_collection()
+
+            vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode='r')
+            restored = 0
+            batch = []
+
+            with open(os.path.join(path, PAYLOADS_FILE), encoding='utf-8') as f:
+                for row, line in enumerate(f):
+                    if row >= manifest['points']:
+                        break
+                    record = json.loads(line)
+                    batch.append(PointStruct(id=record['id'], vector=vectors[row].tolist(), payload=record['payload']))
+                    if len(batch) >= vs.upsert_batch_size:
+                        restored += vs.upsert_points(batch)
+                        batch = []
+
+            if batch:
+                restored += vs.upsert_points(batch)
+
+            print(f"✅ Restored {restored} points from {path}")
+            return {'success': True, 'points': restored, 'snapshot': manifest}
+
+        except Exception as e:
+            print(f"❌ Snapshot restore error: {e}")
+            return {'success': False, 'error': str(e)}
+
+    def read_manifest(self, path: str) -> Dict:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def has_snapshot(self, path: str) -> bool:
+        return bool(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
@@ -7,11 +7,28 @@ from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct, PayloadSchemaType
 import cohere
+import hashlib
 import json
+import os
+import re
 from datetime import datetime
 from typing import Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 import uuid
 
+from app.utils.embedding_cache import get_embedding_cache
+from app.utils.cache_manager import get_retrieval_cache
+from app.utils.cache_decorator import cached
+from app.utils.local_vector_index import LocalVectorIndex
+from app.utils.bm25_index import BM25Index, reciprocal_rank_fusion
+from app.utils.embedding_providers import CohereEmbeddingProvider, HashingEmbeddingProvider
+from app.utils.geo_filter import GeoFilter, extract_point
+
+# Backends that only answer while the primary path is down
+DEGRADED_BACKENDS = ('bm25', 'local_fallback', 'offline_embedding')
+
 class VectorService:
     def __init__(self):
         self.client = None
@@ -19,46 +36,480 @@ class VectorService:
         self.collection_name = "safeindy_knowledge"
         self.embedding_model = "embed-english-v3.0"
         self.vector_dimensions = 1024  
+        self.embedding_cache = None
+        self.retrieval_cache = None  # Processed search results, invalidated by collection version
+        self.embedder = None  # Primary EmbeddingProvider
+        self.offline_embedder = None  # Local embedder used when the primary is down
+        self.offline_collection_name = None
+        self._embedder_down_until = 0
+        self.embedder_retry_interval = 30  # Seconds to skip a failing remote embedder
+        self.embed_batch_size = 96  # Cohere embed limit per request
+        self.embed_concurrency = 4
+        self.upsert_batch_size = 256
+        self.knowledge_categories = ['emergency', 'city_services', 'police', 'medical', 'weather']
+        
+        # Collection storage settings (see Config.QDRANT_* for descriptions)
+        self.storage = {
+            'quantization': 'none',
+            'quantization_always_ram': True,
+            'on_disk_vectors': False,
+            'hnsw_m': 16,
+            'hnsw_ef_construct': 100,
+            'search_hnsw_ef': None,
+            'rescore': True,
+            'oversampling': 2.0
+        }
+        
+        # In-process mirror of the collection ('fallback', 'primary' or 'off')
+        self.local_index = LocalVectorIndex(self.vector_dimensions)
+        self.local_index_mode = 'fallback'
+        self._sync_thread = None
+        self._mirror_digest = None  # Fingerprint of the mirrored points at the last resync
+        self.lexical_index = BM25Index()
+        self.retrieval_mode = 'hybrid'  # 'dense' or 'hybrid' (dense + BM25 with RRF)
+        self.rrf_k = 60
+        self.hybrid_candidates = 3  # Each retriever returns limit * this many candidates
+        self.geo_radius_km = 8.0  # Default radius around a session location
+        
         self._initialized = False
+        self._init_failed_at = 0
+        self.init_retry_interval = 60  # Seconds before retrying a failed init
+        self._qdrant_down_until = 0
+        self.qdrant_retry_interval = 30  # Seconds to skip Qdrant after a failed search
+        
+        # One-time collection setup, run at boot/CLI instead of inside a request
+        self.warmup_result = None
+        self.snapshot_path = None  # Snapshot restored instead of re-embedding on reset/recreate
+        self.qdrant_url = None
+        self.warmup_state_path = None
+        self.warmup_max_age = 86400
+        self._warmup_lock = threading.Lock()
+        self._warmup_thread = None
+        self.background_warmup = True  # False: never start warm_up() lazily (CLIs that manage the collection)
     
     def _ensure_initialized(self):
-        """Lazy initialization - only initialize when needed"""
+        """
+        Lazy client initialization - only initialize when needed
+        
+        Only creates the API clients. Collection checks, index creation and
+        mirror syncs happen in warm_up(), which runs from warmup_services.py
+        (or in create_app with VECTOR_WARMUP_ON_BOOT); if nothing warmed this
+        process yet it is started in the background rather than inside the
+        request, unless background_warmup is off.
+        """
         if self._initialized:
             return
+        
+        # Don't pay the failure path again on every request
+        if self._init_failed_at and time.time() - self._init_failed_at < self.init_retry_interval:
+            return
             
         try:
             from flask import current_app
             
-            # Initialize Qdrant client
-            qdrant_url = current_app.config.get('QDRANT_URL')
-            qdrant_key = current_app.config.get('QDRANT_API_KEY')
-            
-            if qdrant_key:
-                self.client = QdrantClient(url=qdrant_url, api_key=qdrant_key)
-            else:
-                self.client = QdrantClient(url=qdrant_url)
-            
-            # Initialize Cohere client for embeddings
+            # Initialize Cohere client for embeddings (usable even if Qdrant is down)
             cohere_key = current_app.config.get('COHERE_API_KEY')
             if cohere_key:
                 self.cohere_client = cohere.Client(cohere_key)
             
+            # Embedding backend: Cohere, or hashed n-grams with their own collection
+            self._configure_embedders(current_app.config)
+            
+            # Shared embedding cache (optionally backed by disk across workers)
+            self.embedding_cache = get_embedding_cache(
+                current_app.config.get('EMBEDDING_CACHE_SIZE'),
+                current_app.config.get('EMBEDDING_CACHE_PATH')
+            )
+            
+            # Search result cache
+            if current_app.config.get('RETRIEVAL_CACHE_ENABLED', True):
+                self.retrieval_cache = get_retrieval_cache()
+                self.retrieval_cache.default_ttl = current_app.config.get('RETRIEVAL_CACHE_TTL', 300)
+                self.retrieval_cache.max_cache_size = current_app.config.get('RETRIEVAL_CACHE_SIZE', 1000)
+            
+            # Bulk ingestion settings
+            self.embed_batch_size = current_app.config.get('EMBED_BATCH_SIZE', self.embed_batch_size)
+            self.embed_concurrency = current_app.config.get('EMBED_CONCURRENCY', self.embed_concurrency)
+            self.upsert_batch_size = current_app.config.get('QDRANT_UPSERT_BATCH_SIZE', self.upsert_batch_size)
+            
+            # Local index settings
+            self.local_index_mode = current_app.config.get('VECTOR_LOCAL_INDEX', self.local_index_mode)
+            self.local_index.sync_interval = current_app.config.get('LOCAL_INDEX_SYNC_INTERVAL', self.local_index.sync_interval)
+            self.lexical_index.sync_interval = self.local_index.sync_interval
+            
+            # Hybrid retrieval settings
+            self.retrieval_mode = current_app.config.get('VECTOR_RETRIEVAL_MODE', self.retrieval_mode)
+            self.geo_radius_km = current_app.config.get('KNOWLEDGE_GEO_RADIUS_KM', self.geo_radius_km)
+            self.rrf_k = current_app.config.get('RRF_K', self.rrf_k)
+            
+            self.snapshot_path = current_app.config.get('VECTOR_SNAPSHOT_PATH')
+            
+            # Warm-up record settings
+            self.warmup_state_path = current_app.config.get('VECTOR_WARMUP_STATE_PATH')
+            self.warmup_max_age = current_app.config.get('VECTOR_WARMUP_MAX_AGE', self.warmup_max_age)
+            
+            # Collection storage settings
+            self.storage.update({
+                'quantization': current_app.config.get('QDRANT_QUANTIZATION', 'none'),
+                'quantization_always_ram': current_app.config.get('QDRANT_QUANTIZATION_ALWAYS_RAM', True),
+                'on_disk_vectors': current_app.config.get('QDRANT_ON_DISK_VECTORS', False),
+                'hnsw_m': current_app.config.get('QDRANT_HNSW_M', 16),
+                'hnsw_ef_construct': current_app.config.get('QDRANT_HNSW_EF_CONSTRUCT', 100),
+                'search_hnsw_ef': current_app.config.get('QDRANT_SEARCH_HNSW_EF'),
+                'rescore': current_app.config.get('QDRANT_RESCORE', True),
+                'oversampling': current_app.config.get('QDRANT_OVERSAMPLING', 2.0)
+            })
+            
+            # Initialize Qdrant client
+            self.client = self._create_qdrant_client(current_app.config)
+            
             self._initialized = True
             print("✅ Vector service clients initialized successfully")
             
-            # Create collection if it doesn't exist
-            self.setup_collection()
+            # warm_up() holds the lock while it calls us; otherwise nothing warmed this process yet
+            if self.background_warmup and self.warmup_result is None \
+                    and not self._warmup_lock.locked() and self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=self.warm_up, daemon=True)
+                self._warmup_thread.start()
             
         except Exception as e:
             print(f"❌ Failed to initialize vector service: {e}")
             self.client = None
-            self.cohere_client = None
+            self._init_failed_at = time.time()
+    
+    def warm_up(self, force: bool = False, prime_embedding: bool = True) -> Dict:
+        """
+        Run one-time collection setup and record the result
+        
+        Checks the collection schema and payload indexes (skipped when a
+        recent matching record exists at VECTOR_WARMUP_STATE_PATH), syncs the
+        in-process mirrors and primes the Cohere connection.
+        
+        Args:
+            force: Re-run every step even if this process or a record says it is done
+            prime_embedding: Embed a common query to open the embedding API connection
+            
+        Returns:
+            Dict with success flag, per-step outcome and duration
+        """
+        with self._warmup_lock:
+            if self.warmup_result and self.warmup_result.get('success') and not force:
+                return self.warmup_result
+            
+            started = time.time()
+            result = {'success': False, 'steps': {}}
+            
+            try:
+                self._ensure_initialized()
+                if not self.client:
+                    raise Exception("Qdrant client not initialized")
+                
+                if not force and self._warmup_record_matches():
+                    result['steps']['collection'] = 'skipped (recent warm-up record)'
+                elif self.setup_collection():
+                    self._write_warmup_record()
+                    result['steps']['collection'] = 'checked'
+                else:
+                    raise Exception("Collection setup failed")
+                
+                self._sync_mirrors()
+                result['steps']['mirrors'] = {
+                    'local_index': self.local_index.size,
+                    'lexical_index': self.lexical_index.size
+                }
+                
+                # Opens the HTTPS connection and caches a common query embedding
+                if prime_embedding and self.embedder and self.embedder.remote:
+                    ready = self.generate_embedding("emergency contacts") is not None
+                    result['steps']['embedding'] = 'ready' if ready else 'unavailable'
+                
+                if self.offline_embedder:
+                    result['steps']['offline_collection'] = self.setup_offline_collection()
+                
+                result['success'] = True
+                print(f"✅ Vector service warmed up in {time.time() - started:.2f}s")
+                
+            except Exception as e:
+                print(f"❌ Vector service warm-up failed: {e}")
+                result['error'] = str(e)
+            
+            result['duration_ms'] = round((time.time() - started) * 1000, 1)
+            result['completed_at'] = datetime.now().isoformat()
+            self.warmup_result = result
+            return result
+    
+    def _create_qdrant_client(self, config) -> QdrantClient:
+        """
+        Build the Qdrant client for the configured transport
+        
+        QDRANT_PATH selects embedded on-disk mode (no server; one process
+        per path). Otherwise REST, or gRPC when QDRANT_PREFER_GRPC is set.
+        """
+        qdrant_path = config.get('QDRANT_PATH')
+        if qdrant_path:
+            self.qdrant_url = f"local://{qdrant_path}"
+            print(f"✅ Using embedded Qdrant at {qdrant_path}")
+            return QdrantClient(path=qdrant_path)
+        
+        self.qdrant_url = config.get('QDRANT_URL')
+        client_args = {
+            'url': self.qdrant_url,
+            'prefer_grpc': config.get('QDRANT_PREFER_GRPC', False),
+            'grpc_port': config.get('QDRANT_GRPC_PORT', 6334),
+            'timeout': config.get('QDRANT_TIMEOUT', 10)
+        }
+        
+        qdrant_key = config.get('QDRANT_API_KEY')
+        if qdrant_key:
+            client_args['api_key'] = qdrant_key
+        
+        return QdrantClient(**client_args)
+    
+    def _configure_embedders(self, config):
+        """Pick the primary embedding provider and the optional offline fallback"""
+        local_dimensions = config.get('LOCAL_EMBEDDING_DIMENSIONS', 512)
+        local_collection = config.get('LOCAL_EMBEDDING_COLLECTION', 'safeindy_knowledge_local')
+        
+        if config.get('EMBEDDING_BACKEND', 'cohere') == 'local':
+            # Fully offline: local vectors live in their own collection
+            self.embedder = HashingEmbeddingProvider(local_dimensions)
+            self.collection_name = local_collection
+            self.vector_dimensions = local_dimensions
+            self.local_index = LocalVectorIndex(local_dimensions, self.local_index.sync_interval)
+            self.offline_embedder = None
+        else:
+            if self.cohere_client:
+                self.embedder = CohereEmbeddingProvider(self.cohere_client, self.embedding_model, self.vector_dimensions)
+            if config.get('EMBEDDING_OFFLINE_FALLBACK', True):
+                self.offline_embedder = HashingEmbeddingProvider(local_dimensions)
+                self.offline_collection_name = local_collection
+        
+        if self.embedder:
+            self.embedding_model = self.embedder.name
+        print(f"✅ Embedding backend: {self.embedding_model if self.embedder else 'none'} "
+              f"(offline fallback: {bool(self.offline_embedder)})")
+    
+    def _warmup_fingerprint(self) -> str:
+        """Identify the collection settings a warm-up record applies to"""
+        settings = {
+            'collection': self.collection_name,
+            'dimensions': self.vector_dimensions,
+            'storage': {k: v for k, v in self.storage.items() if k not in ('search_hnsw_ef', 'rescore', 'oversampling')},
+            'url': self.qdrant_url
+        }
+        return hashlib.sha1(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _warmup_record_matches(self) -> bool:
+        """True if another process recently checked this exact collection setup"""
+        if not self.warmup_state_path or not os.path.exists(self.warmup_state_path):
+            return False
+        try:
+            with open(self.warmup_state_path) as f:
+                record = json.load(f)
+            return (
+                record.get('fingerprint') == self._warmup_fingerprint() and
+                time.time() - record.get('checked_at', 0) < self.warmup_max_age
+            )
+        except Exception as e:
+            print(f"⚠️ Could not read warm-up record: {e}")
+            return False
+    
+    def _write_warmup_record(self):
+        if not self.warmup_state_path:
+            return
+        try:
+            with open(self.warmup_state_path, 'w') as f:
+                json.dump({
+                    'fingerprint': self._warmup_fingerprint(),
+                    'collection': self.collection_name,
+                    'checked_at': time.time()
+                }, f)
+        except Exception as e:
+            print(f"⚠️ Could not write warm-up record: {e}")
+    
+    def _qdrant_available(self) -> bool:
+        """True if Qdrant is configured and not in a post-failure cool-down"""
+        return self.client is not None and time.time() >= self._qdrant_down_until
+    
+    def _sync_mirrors(self):
+        """Refresh the in-process vector mirror and BM25 index from Qdrant"""
+        if self.local_index_mode != 'off':
+            previous_sync = self.local_index.last_synced
+            self.local_index.sync_from_qdrant(self.client, self.collection_name)
+            if self.local_index.last_synced != previous_sync:
+                # Reuse the scrolled payloads instead of scrolling twice
+                self.lexical_index.load(*self.local_index.live_points())
+        elif self.retrieval_mode == 'hybrid':
+            self.lexical_index.sync_from_qdrant(self.client, self.collection_name)
+        
+        # Other workers' writes show up here; a resync that found none keeps the cached results
+        digest = self._mirror_fingerprint()
+        if digest is None or digest != self._mirror_digest:
+            self._mirror_digest = digest
+            self._bump_collection_version()
+    
+    def _mirror_fingerprint(self) -> Optional[str]:
+        """Point count plus a digest of each mirrored point's id and payload hashes (None without mirrors)"""
+        if self.local_index_mode != 'off':
+            ids, payloads = self.local_index.live_points()
+        elif self.retrieval_mode == 'hybrid':
+            points = list(self.lexical_index.payloads.items())
+            ids, payloads = [point[0] for point in points], [point[1] for point in points]
+        else:
+            return None
+        
+        digest = hashlib.sha256()
+        for point_id, payload in sorted(zip(map(str, ids), payloads), key=lambda item: item[0]):
+            digest.update(f"{point_id}|{payload.get('content_hash')}|{payload.get('payload_hash')}|"
+                          f"{payload.get('last_updated')}\n".encode())
+        return f"{len(ids)}:{digest.hexdigest()}"
+    
+    def _bump_collection_version(self):
+        """Make cached search results and collection info from before a collection change unreachable"""
+        if self.retrieval_cache:
+            self.retrieval_cache.bump_version()
+        VectorService.get_collection_info.invalidate(self)
+    
+    def _maybe_sync_local_index(self):
+        """Refresh the local mirrors in the background when they go stale"""
+        if not self._qdrant_available() or self.warmup_result is None:
+            return  # The warm-up syncs the mirrors first
+        stale = (
+            (self.local_index_mode != 'off' and self.local_index.needs_sync()) or
+            (self.retrieval_mode == 'hybrid' and self.lexical_index.needs_sync())
+        )
+        if not stale or (self._sync_thread and self._sync_thread.is_alive()):
+            return
+        
+        self._sync_thread = threading.Thread(target=self._sync_mirrors, daemon=True)
+        self._sync_thread.start()
+    
+    def _mirror_upsert(self, ids: List, vectors: List[List[float]], payloads: List[Dict]):
+        """
+        Apply a write to the in-process mirrors and the offline-embedding collection
+        
+        Called after the Qdrant write; the collection version is bumped last,
+        so a search racing the write can't cache pre-write results under the
+        new version.
+        """
+        try:
+            if self.local_index_mode != 'off':
+                self.local_index.upsert(ids, vectors, payloads)
+            if self.retrieval_mode == 'hybrid':
+                self.lexical_index.upsert(ids, payloads)
+            if self.offline_embedder:
+                self._offline_upsert(ids, payloads)
+        finally:
+            self._bump_collection_version()
+    
+    def _mirror_remove(self, ids: List):
+        """Apply a delete to the in-process mirrors and the offline-embedding collection (version bumped last)"""
+        try:
+            if self.local_index_mode != 'off':
+                self.local_index.remove(ids)
+            if self.retrieval_mode == 'hybrid':
+                self.lexical_index.remove(ids)
+            if self.offline_embedder:
+                try:
+                    self.client.delete(
+                        collection_name=self.offline_collection_name,
+                        points_selector=models.PointIdsList(points=list(ids))
+                    )
+                except Exception as e:
+                    print(f"⚠️ Offline collection delete error: {e}")
+        finally:
+            self._bump_collection_version()
     
-    def setup_collection(self):
+    def _offline_upsert(self, ids: List, payloads: List[Dict]):
+        """Embed payloads locally and write them to the offline collection (no network embedding)"""
+        try:
+            vectors = self.offline_embedder.embed([payload.get('content', '') for payload in payloads])
+            points = [
+                PointStruct(id=point_id, vector=vector, payload=payload)
+                for point_id, vector, payload in zip(ids, vectors, payloads)
+            ]
+            self.upsert_points(points, self.offline_collection_name)
+        except Exception as e:
+            print(f"⚠️ Offline collection write error: {e}")
+    
+    def _payload_signatures(self, collection_name: str) -> Dict:
+        """Point id -> payload hash for a collection, scrolled without vectors"""
+        signatures = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=self.upsert_batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False
+            )
+            for point in points:
+                payload = point.payload or {}
+                signatures[point.id] = payload.get('payload_hash') or self.payload_hash(payload)
+            if offset is None:
+                return signatures
+    
+    def setup_offline_collection(self) -> Dict:
+        """
+        Create the offline-embedding collection and backfill it from the primary one
+        
+        Ids and payload hashes of both collections are compared; only entries
+        that are missing or differ are embedded locally (no embedding API
+        calls), and offline points whose id left the primary are deleted.
+        """
+        try:
+            collection_names = [col.name for col in self.client.get_collections().collections]
+            if self.offline_collection_name not in collection_names:
+                self.client.create_collection(
+                    collection_name=self.offline_collection_name,
+                    vectors_config=VectorParams(size=self.offline_embedder.dimensions, distance=Distance.COSINE)
+                )
+                self.client.create_payload_index(
+                    collection_name=self.offline_collection_name,
+                    field_name="category",
+                    field_schema=PayloadSchemaType.KEYWORD
+                )
+                self.client.create_payload_index(
+                    collection_name=self.offline_collection_name,
+                    field_name="location",
+                    field_schema=PayloadSchemaType.GEO
+                )
+                print(f"✅ Created offline collection: {self.offline_collection_name}")
+            
+            primary = self._payload_signatures(self.collection_name)
+            offline = self._payload_signatures(self.offline_collection_name)
+            changed = [point_id for point_id, signature in primary.items() if offline.get(point_id) != signature]
+            removed = [point_id for point_id in offline if point_id not in primary]
+            if not changed and not removed:
+                return {'status': 'in_sync', 'points': len(offline)}
+            
+            if removed:
+                self.client.delete(
+                    collection_name=self.offline_collection_name,
+                    points_selector=models.PointIdsList(points=removed)
+                )
+            for start in range(0, len(changed), self.upsert_batch_size):
+                points = self.client.retrieve(
+                    collection_name=self.collection_name,
+                    ids=changed[start:start + self.upsert_batch_size],
+                    with_payload=True,
+                    with_vectors=False
+                )
+                self._offline_upsert([point.id for point in points], [point.payload or {} for point in points])
+            
+            print(f"✅ Backfilled offline collection: {len(changed)} re-embedded, {len(removed)} removed")
+            return {'status': 'backfilled', 'points': len(changed), 'removed': len(removed)}
+            
+        except Exception as e:
+            print(f"⚠️ Offline collection setup error: {e}")
+            return {'status': 'error', 'error': str(e)}
+    
+    def setup_collection(self) -> bool:
         """Create Qdrant collection with correct dimensions"""
         try:
             if not self.client:
-                return
+                return False
             
             # Check if collection exists
             collections = self.client.get_collections()
@@ -68,9 +519,10 @@ class VectorService:
                 # Create collection with correct dimensions
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(size=self.vector_dimensions, distance=Distance.COSINE),
+                    **self._collection_params()
                 )
-                print(f"✅ Created Qdrant collection: {self.collection_name} with {self.vector_dimensions} dimensions")
+                print(f"✅ Created Qdrant collection: {self.collection_name} with {self.vector_dimensions} dimensions "
+                      f"(quantization: {self.storage['quantization']})")
             else:
                 # IMPORTANT: Check existing collection dimensions
                 collection_info = self.client.get_collection(self.collection_name)
@@ -84,21 +536,170 @@ class VectorService:
                     self.client.delete_collection(self.collection_name)
                     self.client.create_collection(
                         collection_name=self.collection_name,
-                        vectors_config=VectorParams(size=self.vector_dimensions, distance=Distance.COSINE),
+                        **self._collection_params()
                     )
                     print(f"✅ Recreated collection with {self.vector_dimensions} dimensions")
                 else:
                     print(f"✅ Collection dimensions correct: {self.vector_dimensions}")
+                    self._apply_storage_settings(collection_info)
             
             # Create payload indexes
             self.create_payload_indexes()
             
-            # Populate with initial knowledge if new collection
+            # Populate new collections from a snapshot, or with initial knowledge
             if self.collection_name not in collection_names or existing_dim != self.vector_dimensions:
-                self.populate_initial_knowledge()
+                if not self._restore_snapshot():
+                    self.populate_initial_knowledge()
+            
+            return True
                 
         except Exception as e:
             print(f"❌ Error setting up Qdrant collection: {e}")
+            return False
+    
+    def ensure_collection(self):
+        """Create the collection and its payload indexes if missing"""
+        if self.collection_name not in [col.name for col in self.client.get_collections().collections]:
+            self.client.create_collection(collection_name=self.collection_name, **self._collection_params())
+            self.create_payload_indexes()
+            print(f"✅ Created Qdrant collection: {self.collection_name}")
+    
+    def recreate_collection(self):
+        """Drop the collection (if present) and create it empty with payload indexes"""
+        if self.collection_name in [col.name for col in self.client.get_collections().collections]:
+            self.client.delete_collection(self.collection_name)
+        self.ensure_collection()
+    
+    def reset_collection(self, snapshot_path: str = None) -> bool:
+        """
+        Drop and rebuild the knowledge collection
+        
+        Restores from snapshot_path (or VECTOR_SNAPSHOT_PATH) when a snapshot
+        exists there, otherwise re-populates the initial knowledge.
+        """
+        self._ensure_initialized()
+        
+        try:
+            if not self.client:
+                return False
+            
+            print("🔄 Resetting knowledge collection...")
+            self.recreate_collection()
+            
+            if self.offline_embedder:
+                try:
+                    self.client.delete_collection(self.offline_collection_name)
+                except Exception as e:
+                    print(f"⚠️ Could not drop offline collection: {e}")
+            
+            if not self._restore_snapshot(snapshot_path):
+                self.populate_initial_knowledge()
+            
+            self._sync_mirrors()
+            if self.offline_embedder:
+                self.setup_offline_collection()
+            
+            print("✅ Knowledge collection reset")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error resetting collection: {e}")
+            return False
+    
+    def _restore_snapshot(self, snapshot_path: str = None) -> bool:
+        """Restore a snapshot into the (empty) collection; False if none usable"""
+        from app.services.snapshot_service import SnapshotService
+        
+        snapshot = SnapshotService(self)
+        snapshot_path = snapshot_path or self.snapshot_path
+        if not snapshot.has_snapshot(snapshot_path):
+            return False
+        return snapshot.restore_collection(snapshot_path).get('success', False)
+    
+    def _collection_params(self) -> Dict:
+        """Build vectors, quantization and HNSW config from storage settings"""
+        return {
+            'vectors_config': VectorParams(
+                size=self.vector_dimensions,
+                distance=Distance.COSINE,
+                on_disk=self.storage['on_disk_vectors']
+            ),
+            'quantization_config': self._quantization_config(),
+            'hnsw_config': models.HnswConfigDiff(
+                m=self.storage['hnsw_m'],
+                ef_construct=self.storage['hnsw_ef_construct']
+            )
+        }
+    
+    def _quantization_config(self):
+        """Scalar (int8) or binary quantization with the quantized copy kept in RAM"""
+        mode = self.storage['quantization']
+        always_ram = self.storage['quantization_always_ram']
+        
+        if mode == 'scalar':
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=always_ram
+                )
+            )
+        if mode == 'binary':
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        return None
+    
+    def _apply_storage_settings(self, collection_info):
+        """Bring an existing collection in line with configured quantization/HNSW settings"""
+        try:
+            params = collection_info.config
+            current_quantization = getattr(params, 'quantization_config', None)
+            wanted_quantization = self._quantization_config()
+            hnsw = getattr(params, 'hnsw_config', None)
+            
+            quantization_changed = type(current_quantization) != type(wanted_quantization)
+            hnsw_changed = hnsw is not None and (
+                hnsw.m != self.storage['hnsw_m'] or hnsw.ef_construct != self.storage['hnsw_ef_construct']
+            )
+            on_disk_changed = bool(getattr(params.params.vectors, 'on_disk', False)) != self.storage['on_disk_vectors']
+            
+            if not (quantization_changed or hnsw_changed or on_disk_changed):
+                return
+            
+            update = {'collection_name': self.collection_name}
+            if quantization_changed:
+                update['quantization_config'] = wanted_quantization or models.Disabled.DISABLED
+            if hnsw_changed:
+                update['hnsw_config'] = models.HnswConfigDiff(
+                    m=self.storage['hnsw_m'],
+                    ef_construct=self.storage['hnsw_ef_construct']
+                )
+            if on_disk_changed:
+                update['vectors_config'] = {'': models.VectorParamsDiff(on_disk=self.storage['on_disk_vectors'])}
+            
+            self.client.update_collection(**update)
+            print(f"✅ Updated collection storage settings (quantization: {self.storage['quantization']})")
+            
+        except Exception as e:
+            print(f"⚠️ Could not apply collection storage settings: {e}")
+    
+    def _search_params(self):
+        """Search-time HNSW ef and quantization rescoring"""
+        quantization = None
+        if self.storage['quantization'] in ('scalar', 'binary'):
+            quantization = models.QuantizationSearchParams(
+                rescore=self.storage['rescore'],
+                oversampling=self.storage['oversampling']
+            )
+        
+        if quantization is None and not self.storage['search_hnsw_ef']:
+            return None
+        
+        return models.SearchParams(
+            hnsw_ef=self.storage['search_hnsw_ef'],
+            quantization=quantization
+        )
     
     def create_payload_indexes(self):
         """Create necessary payload indexes for filtering"""
@@ -147,6 +748,20 @@ class VectorService:
                     print("✅ 'timestamp' index already exists")
                 else:
                     print(f"⚠️ Could not create 'timestamp' index: {e}")
+            
+            # Create geo index for radius/bounding-box filtering
+            try:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name="location",
+                    field_schema=PayloadSchemaType.GEO
+                )
+                print("✅ Created 'location' payload index")
+            except Exception as e:
+                if "already exists" in str(e).lower():
+                    print("✅ 'location' index already exists")
+                else:
+                    print(f"⚠️ Could not create 'location' index: {e}")
                     
         except Exception as e:
             print(f"❌ Error creating payload indexes: {e}")
@@ -198,97 +813,224 @@ class VectorService:
         except Exception as e:
             print(f"❌ Error populating initial knowledge: {e}")
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding with correct dimensions"""
-        try:
-            if not self.cohere_client:
-                print("⚠️ Cohere client not available, returning zero vector")
-                return [0.0] * self.vector_dimensions
-            
-            response = self.cohere_client.embed(
-                texts=[text],
-                model=self.embedding_model,
-                input_type="search_query"
-            )
-            
-            embedding = response.embeddings[0]
-            
-            # Verify dimensions
-            if len(embedding) != self.vector_dimensions:
-                print(f"⚠️ Embedding dimension mismatch: got {len(embedding)}, expected {self.vector_dimensions}")
-                # Pad or truncate if needed
-                if len(embedding) < self.vector_dimensions:
-                    embedding.extend([0.0] * (self.vector_dimensions - len(embedding)))
-                else:
-                    embedding = embedding[:self.vector_dimensions]
-            
-            return embedding
+    def embed_query(self, text: str) -> Optional[List[float]]:
+        """Query embedding from the primary embedder (cached), None if unavailable"""
+        self._ensure_initialized()
+        return self.generate_embedding(text, input_type="search_query")
+    
+    def generate_embedding(self, text: str, input_type: str = "search_query") -> Optional[List[float]]:
+        """Generate embedding with correct dimensions (queries cached by normalized text), None on failure"""
+        return self.generate_embeddings_batch([text], input_type)[0]
+    
+    def generate_embeddings_batch(self, texts: List[str], input_type: str = "search_document") -> List[Optional[List[float]]]:
+        """
+        Generate embeddings for many texts with chunked multi-text requests
+        
+        Cached texts are skipped; the rest are sent in chunks of
+        embed_batch_size, with up to embed_concurrency chunks in flight.
+        Only query embeddings are cached: add_knowledge_batch already skips
+        unchanged documents, and a bulk load would evict every hot query.
+        Returns embeddings in input order, None for texts that could not be
+        embedded (never a zero vector).
+        """
+        embeddings = [None] * len(texts)
+        
+        if not self.embedder:
+            print("⚠️ No embedding backend available")
+            return embeddings
+        if self.embedder.remote and time.time() < self._embedder_down_until:
+            return embeddings  # Don't wait on a backend that just failed
+        
+        use_cache = self.embedding_cache is not None and self.embedder.remote and input_type == "search_query"
+        pending = []
+        
+        for i, text in enumerate(texts):
+            cached = None
+            if use_cache:
+                cached = self.embedding_cache.get(text, self.embedding_model, input_type)
+            if cached is not None:
+                embeddings[i] = cached
+            else:
+                pending.append(i)
+        
+        chunks = [pending[i:i + self.embed_batch_size] for i in range(0, len(pending), self.embed_batch_size)]
+        
+        def embed_chunk(indexes: List[int]) -> List[List[float]]:
+            return [self._fit_dimensions(e) for e in self.embedder.embed([texts[i] for i in indexes], input_type)]
+        
+        if chunks:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.embed_concurrency, len(chunks)))) as executor:
+                futures = [(indexes, executor.submit(embed_chunk, indexes)) for indexes in chunks]
+                
+                for indexes, future in futures:
+                    try:
+                        chunk_embeddings = future.result()
+                    except Exception as e:
+                        print(f"❌ Embedding error ({len(indexes)} texts): {e}")
+                        if self.embedder.remote:
+                            self._embedder_down_until = time.time() + self.embedder_retry_interval
+                        continue
+                    
+                    for i, embedding in zip(indexes, chunk_embeddings):
+                        embeddings[i] = embedding
+                        if use_cache:
+                            self.embedding_cache.set(texts[i], self.embedding_model, input_type, embedding)
             
-        except Exception as e:
-            print(f"❌ Embedding generation error: {e}")
-            return [0.0] * self.vector_dimensions
+            if len(texts) > 1:
+                print(f"✅ Embedded {len(pending)} texts in {len(chunks)} requests ({len(texts) - len(pending)} cached)")
+        
+        return embeddings
+    
+    def _fit_dimensions(self, embedding: List[float]) -> List[float]:
+        """Pad or truncate an embedding to the collection dimensions"""
+        embedding = list(embedding)
+        if len(embedding) != self.vector_dimensions:
+            print(f"⚠️ Embedding dimension mismatch: got {len(embedding)}, expected {self.vector_dimensions}")
+            if len(embedding) < self.vector_dimensions:
+                embedding.extend([0.0] * (self.vector_dimensions - len(embedding)))
+            else:
+                embedding = embedding[:self.vector_dimensions]
+        return embedding
+    
+    def upsert_points(self, points: List[PointStruct], collection_name: str = None) -> int:
+        """Upsert points to Qdrant in sized batches, returns number written"""
+        written = 0
+        for i in range(0, len(points), self.upsert_batch_size):
+            batch = points[i:i + self.upsert_batch_size]
+            self.client.upsert(
+                collection_name=collection_name or self.collection_name,
+                points=batch
+            )
+            written += len(batch)
+        return written
+        
+    def content_hash(self, content: str) -> str:
+        """Hash of whitespace/case-normalized content and the embedding model"""
+        normalized = re.sub(r'\s+', ' ', content or '').strip().lower()
+        return hashlib.sha256(f"{self.embedding_model}|{normalized}".encode()).hexdigest()
+    
+    def content_point_id(self, content: str) -> str:
+        """Content-addressed point id: re-adding the same text overwrites, never duplicates"""
+        return str(uuid.UUID(self.content_hash(content)[:32]))
+    
+    def _point_id(self, explicit_id, content: str):
+        """Use a caller's id if Qdrant accepts it, map slugs to stable UUIDs, else address by content"""
+        if explicit_id is None:
+            return self.content_point_id(content)
+        if isinstance(explicit_id, int):
+            return explicit_id
+        try:
+            return str(uuid.UUID(str(explicit_id)))
+        except ValueError:
+            return str(uuid.uuid5(uuid.NAMESPACE_URL, f"safeindy:{explicit_id}"))
+    
+    def payload_hash(self, entry: Dict) -> str:
+        """Hash of everything an entry stores besides its vector (exact content, category, source, metadata)"""
+        fields = {key: value for key, value in entry.items() if key not in ('id', 'content_hash')}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _stored_hashes(self, point_ids: List) -> Dict:
+        """(content hash, payload hash) already stored for these ids, in one retrieve call"""
+        if not point_ids:
+            return {}
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=['content_hash', 'payload_hash'],
+            with_vectors=False
+        )
+        return {
+            point.id: ((point.payload or {}).get('content_hash'), (point.payload or {}).get('payload_hash'))
+            for point in points
+        }
+    
+    def _stored_vectors(self, point_ids: List) -> Dict:
+        """Vectors already stored for these ids, in one retrieve call"""
+        if not point_ids:
+            return {}
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=False,
+            with_vectors=True
+        )
+        return {point.id: point.vector for point in points}
+    
+    def _set_geo_payload(self, payload: Dict, entry: Dict):
+        """
+        Store the entry's point as payload['location'] = {'lat', 'lon'} (Qdrant geo format)
         
+        Accepts lat/lng fields on the entry or a 'location' dict; a
+        non-coordinate 'location' (e.g. an address string) is kept as
+        'location_name' so it does not break the geo index.
+        """
+        point = extract_point(entry.get('location')) or extract_point(entry)
+        if point:
+            payload['location'] = {'lat': point[0], 'lon': point[1]}
+        elif 'location' in entry and not isinstance(entry['location'], dict):
+            payload['location_name'] = payload.pop('location')
+    
     def add_knowledge(self, content: str, category: str, source: str = None, metadata: Dict = None) -> str:
-        """Add knowledge entry to vector database"""
+        """Add knowledge entry to vector database (skipped if the same content is already stored)"""
         self._ensure_initialized()
         
+        entry = {'content': content, 'category': category, 'source': source or "SafeIndy Assistant"}
+        if metadata:
+            entry.update(metadata)
+        
+        point_ids = self.add_knowledge_batch([entry])
+        return point_ids[0] if point_ids else None
+    
+    def add_knowledge_batch(self, knowledge_entries: List[Dict]) -> List[str]:
+        """
+        Add multiple knowledge entries efficiently
+        
+        Point ids are the entry's 'id' (slugs mapped to stable UUIDs) or
+        derived from the content. One retrieve call fetches the stored
+        content and payload hashes; unchanged entries are skipped and only
+        new or changed content is embedded. Entries whose content is the
+        same but whose category, source or other metadata changed are
+        rewritten with their stored vector.
+        
+        Returns:
+            Point ids of all stored entries (written or already up to date)
+        """
         try:
-            if not self.client or not self.cohere_client:
+            if not self.client or not self.embedder:
                 raise Exception("Vector service not properly initialized")
             
-            # Generate embedding
-            embedding = self.generate_embedding(content)
-            
-            # Create point ID
-            point_id = str(uuid.uuid4())
-            
-            # Prepare payload
-            payload = {
-                "content": content,
-                "category": category,
-                "source": source or "SafeIndy Assistant",
-                "timestamp": datetime.now().isoformat(),
-                "id": point_id
-            }
+            # Later duplicates of the same id win
+            entries_by_id = {}
+            for entry in knowledge_entries:
+                entries_by_id[self._point_id(entry.get('id'), entry['content'])] = entry
             
-            if metadata:
-                payload.update(metadata)
+            hashes = {point_id: self.content_hash(entry['content']) for point_id, entry in entries_by_id.items()}
+            payload_hashes = {point_id: self.payload_hash(entry) for point_id, entry in entries_by_id.items()}
+            stored = self._stored_hashes(list(entries_by_id))
+            changed = [point_id for point_id in entries_by_id if stored.get(point_id, (None,))[0] != hashes[point_id]]
+            relabeled = [
+                point_id for point_id in entries_by_id
+                if point_id in stored and stored[point_id][0] == hashes[point_id]
+                and stored[point_id][1] != payload_hashes[point_id]
+            ]
             
-            # Insert into Qdrant
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    PointStruct(
-                        id=point_id,
-                        vector=embedding,
-                        payload=payload
-                    )
-                ]
+            # One multi-text request per chunk instead of one per entry
+            embeddings = self.generate_embeddings_batch(
+                [entries_by_id[point_id]['content'] for point_id in changed],
+                input_type="search_document"
             )
-            
-            print(f"✅ Added knowledge entry: {point_id}")
-            return point_id
-            
-        except Exception as e:
-            print(f"❌ Error adding knowledge: {e}")
-            return None
-    
-    def add_knowledge_batch(self, knowledge_entries: List[Dict]) -> List[str]:
-        """Add multiple knowledge entries efficiently"""
-        try:
-            if not self.client or not self.cohere_client:
-                raise Exception("Vector service not properly initialized")
+            stored_vectors = self._stored_vectors(relabeled)
             
             points = []
-            point_ids = []
+            failed = set()
             
-            for entry in knowledge_entries:
-                # Generate embedding
-                embedding = self.generate_embedding(entry['content'])
+            updates = list(zip(changed, embeddings)) + [(point_id, stored_vectors.get(point_id)) for point_id in relabeled]
+            for point_id, embedding in updates:
+                if embedding is None:
+                    failed.add(point_id)
+                    continue  # Left out rather than stored with a meaningless vector
                 
-                # Use provided ID or generate new one
-                point_id = entry.get('id', str(uuid.uuid4()))
-                point_ids.append(point_id)
+                entry = entries_by_id[point_id]
                 
                 # Prepare payload
                 payload = {
@@ -304,107 +1046,313 @@ class VectorService:
                     if key not in ['content', 'category', 'source', 'id']:
                         payload[key] = value
                 
+                self._set_geo_payload(payload, entry)
+                payload['content_hash'] = hashes[point_id]
+                payload['payload_hash'] = payload_hashes[point_id]
+                
                 points.append(PointStruct(
                     id=point_id,
                     vector=embedding,
                     payload=payload
                 ))
             
-            # Batch insert
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
+            # Batch insert, streamed in sized upserts
+            written = self.upsert_points(points)
+            
+            if points:
+                self._mirror_upsert([p.id for p in points], [p.vector for p in points], [p.payload for p in points])
             
-            print(f"✅ Added {len(points)} knowledge entries in batch")
-            return point_ids
+            print(f"✅ Added {written} knowledge entries in batch "
+                  f"({len(relabeled)} metadata-only, {len(entries_by_id) - len(changed) - len(relabeled)} unchanged, "
+                  f"{len(failed)} failed)")
+            return [point_id for point_id in entries_by_id if point_id not in failed]
             
         except Exception as e:
             print(f"❌ Error adding knowledge batch: {e}")
             return []
     
-    def search_knowledge(self, query: str, intent: str = None, limit: int = 5) -> Dict:
-        """FIXED: Search knowledge base with proper filtering"""
-        self._ensure_initialized()
+    def search_knowledge(self, query: str, intent: str = None, limit: int = 5,
+                         location: Union[Dict, GeoFilter] = None) -> Dict:
+        """
+        Search knowledge base with proper filtering
         
-        try:
-            if not self.client or not self.cohere_client:
-                return {
-                    'results': [],
-                    'sources': [],
-                    'error': 'Vector service not available'
-                }
-            
-            # Generate query embedding
-            query_embedding = self.generate_embedding(query)
-            
-            # Build search filter based on intent (FIXED)
-            query_filter = None
-            if intent and intent in ['emergency', 'city_services', 'police', 'medical', 'weather']:
-                query_filter = models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="category",
-                            match=models.MatchValue(value=intent)
-                        )
-                    ]
-                )
+        Dense retrieval uses the in-process mirror when it is the primary
+        path, otherwise Qdrant, and falls back to the mirror if Qdrant is
+        unreachable. In hybrid mode a BM25 ranking over the same payloads is
+        merged in with reciprocal-rank fusion.
+        
+        With a location (session location dict or GeoFilter), entries tagged
+        with a point outside the radius/box are filtered out before ranking;
+        untagged city-wide entries are always eligible.
+        """
+        return self.search_knowledge_batch([query], [intent], limit, location)[0]
+    
+    def search_knowledge_batch(self, queries: List[str], intents: List[str] = None, limit: int = 5,
+                               location: Union[Dict, GeoFilter] = None) -> List[Dict]:
+        """
+        Search the knowledge base for several queries in one round trip
+        
+        All queries are embedded in one Cohere request and searched with one
+        Qdrant batch search.
+        
+        Args:
+            queries: Query strings
+            intents: Optional intent per query (used as category filter)
+            limit: Results per query
+            location: Optional session location or GeoFilter shared by all queries
             
-            # Perform vector search
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_embedding,
-                query_filter=query_filter,
-                limit=limit,
-                with_payload=True,
-                with_vectors=False
+        Returns:
+            One search_knowledge-shaped dict per query, in order
+        """
+        if not queries:
+            return []
+        
+        self._ensure_initialized()
+        intents = list(intents) if intents else [None] * len(queries)
+        geo = self._geo_filter(location)
+        scope = geo.cache_key() if geo else None
+        
+        self._maybe_sync_local_index()
+        
+        # Repeat queries skip embedding and search entirely
+        responses = [None] * len(queries)
+        if self.retrieval_cache:
+            for i, (query, intent) in enumerate(zip(queries, intents)):
+                responses[i] = self.retrieval_cache.get_results(query, intent, limit, scope)
+        
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if misses:
+            searched = self._search_knowledge_uncached(
+                [queries[i] for i in misses], [intents[i] for i in misses], limit, geo
             )
+            for i, response in zip(misses, searched):
+                responses[i] = response
+                # Outage answers are not kept past the outage
+                if self.retrieval_cache and not str(response.get('backend')).startswith(DEGRADED_BACKENDS):
+                    self.retrieval_cache.cache_results(queries[i], intents[i], limit, response, scope)
+        
+        return responses
+    
+    def _geo_filter(self, location: Union[Dict, GeoFilter] = None) -> Optional[GeoFilter]:
+        """GeoFilter as given, or a default-radius one around a location dict"""
+        if location is None or isinstance(location, GeoFilter):
+            return location
+        return GeoFilter.from_location(location, self.geo_radius_km)
+    
+    def _search_knowledge_uncached(self, queries: List[str], intents: List[str], limit: int,
+                                   geo: GeoFilter = None) -> List[Dict]:
+        """Embed, search and fuse results for queries not found in the retrieval cache"""
+        try:
+            # Only known categories are filtered on
+            categories = [intent if intent in self.knowledge_categories else None for intent in intents]
+            hybrid = self.retrieval_mode == 'hybrid' and self.lexical_index.is_ready()
+            candidates = limit * self.hybrid_candidates if hybrid else limit
             
-            # Process results
-            results = []
-            sources = []
+            dense_hits, dense_backends = self._dense_search_batch(queries, categories, candidates, geo)
             
-            for result in search_results:
-                payload = result.payload
-                
-                results.append({
-                    'content': payload.get('content', ''),
-                    'category': payload.get('category', ''),
-                    'score': result.score,
-                    'source': payload.get('source', ''),
-                    'timestamp': payload.get('timestamp', '')
-                })
-                
-                # Add unique sources
-                source_info = {
-                    'title': payload.get('source', 'SafeIndy Knowledge Base'),
-                    'category': payload.get('category', 'general'),
-                    'type': 'knowledge_base',
-                    'score': result.score
-                }
+            responses = []
+            for query, intent, category, hits, backend in zip(queries, intents, categories, dense_hits, dense_backends):
+                if hybrid:
+                    lexical_hits = self.lexical_index.search(query, category, candidates, geo)
+                    if hits is None:
+                        # Exact-token matches still answer when dense search is down
+                        hits, backend = lexical_hits[:limit], 'bm25'
+                    else:
+                        hits = reciprocal_rank_fusion([hits, lexical_hits], k=self.rrf_k, limit=limit)
+                        backend = f"{backend}+bm25"
                 
-                if source_info not in sources:
-                    sources.append(source_info)
+                if hits is None:
+                    responses.append({
+                        'results': [],
+                        'sources': [],
+                        'error': 'Vector service not available'
+                    })
+                else:
+                    responses.append(self._format_search_results(hits, query, intent, backend))
             
-            return {
-                'results': results,
-                'sources': sources,
-                'query': query,
-                'intent_filter': intent,
-                'total_results': len(results),
-                'timestamp': datetime.now().isoformat()
-            }
+            return responses
             
         except Exception as e:
             print(f"❌ Knowledge search error: {e}")
-            return {
+            return [{
                 'results': [],
                 'sources': [],
                 'error': str(e)
+            } for _ in queries]
+    
+    def _dense_search_batch(self, queries: List[str], categories: List[str], limit: int = 5,
+                            geo: GeoFilter = None) -> tuple:
+        """
+        Embedding search for every query over the best available backend
+        
+        Queries the primary embedder cannot serve are embedded locally and
+        searched in the offline collection instead of running a search
+        with a meaningless vector.
+        
+        Returns:
+            (hits, backends) per query, hits as (score, payload) tuples or
+            None when no dense backend could answer
+        """
+        hits = [None] * len(queries)
+        backends = [None] * len(queries)
+        
+        embeddings = self.generate_embeddings_batch(queries, input_type="search_query")
+        usable = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        
+        if usable:
+            results, backend = self._search_vectors(
+                [embeddings[i] for i in usable], [categories[i] for i in usable], limit, geo
+            )
+            if results is not None:
+                for i, query_hits in zip(usable, results):
+                    hits[i] = query_hits
+                    backends[i] = backend
+        
+        missing = [i for i in range(len(queries)) if hits[i] is None]
+        if missing and self.offline_embedder and self._qdrant_available():
+            try:
+                vectors = self.offline_embedder.embed([queries[i] for i in missing], "search_query")
+                results = self._search_qdrant_batch(
+                    vectors, [categories[i] for i in missing], limit, self.offline_collection_name, geo
+                )
+                for i, query_hits in zip(missing, results):
+                    hits[i] = query_hits
+                    backends[i] = 'offline_embedding'
+            except Exception as e:
+                print(f"⚠️ Offline collection search failed: {e}")
+        
+        return hits, backends
+    
+    def _search_vectors(self, vectors: List[List[float]], categories: List[str], limit: int = 5,
+                        geo: GeoFilter = None) -> tuple:
+        """
+        Search primary-space vectors in the local mirror or Qdrant
+        
+        Returns:
+            (hits per vector, backend) or (None, None) if nothing is available
+        """
+        if self.local_index_mode == 'primary' and self.local_index.is_ready():
+            return [self.local_index.search(v, c, limit, geo) for v, c in zip(vectors, categories)], 'local'
+        
+        if self._qdrant_available():
+            try:
+                return self._search_qdrant_batch(vectors, categories, limit, geo=geo), 'qdrant'
+            except Exception as e:
+                print(f"⚠️ Qdrant search failed, skipping it for {self.qdrant_retry_interval}s: {e}")
+                self._qdrant_down_until = time.time() + self.qdrant_retry_interval
+        
+        if self.local_index_mode != 'off' and self.local_index.is_ready():
+            return [self.local_index.search(v, c, limit, geo) for v, c in zip(vectors, categories)], 'local_fallback'
+        
+        return None, None
+    
+    def _search_qdrant_batch(self, query_embeddings: List[List[float]], categories: List[str], limit: int = 5,
+                             collection_name: str = None, geo: GeoFilter = None) -> List[List[tuple]]:
+        """Run filtered vector searches in one Qdrant request, returns (score, payload) tuples per query"""
+        search_params = self._search_params()
+        requests = [
+            models.SearchRequest(
+                vector=embedding,
+                filter=self._search_filter(category, geo),
+                params=search_params,
+                limit=limit,
+                with_payload=True,
+                with_vector=False
+            )
+            for embedding, category in zip(query_embeddings, categories)
+        ]
+        
+        batch_results = self.client.search_batch(
+            collection_name=collection_name or self.collection_name,
+            requests=requests
+        )
+        
+        return [[(result.score, result.payload) for result in search_results] for search_results in batch_results]
+    
+    def _search_filter(self, category: str = None, geo: GeoFilter = None):
+        """Payload filter on the indexed category and location fields"""
+        conditions = []
+        if category:
+            conditions.append(models.FieldCondition(
+                key="category",
+                match=models.MatchValue(value=category)
+            ))
+        if geo:
+            conditions.append(self._geo_condition(geo))
+        
+        if not conditions:
+            return None
+        return models.Filter(must=conditions)
+    
+    def _geo_condition(self, geo: GeoFilter):
+        """Inside the radius/box, or no location at all (city-wide entries)"""
+        if geo.bounding_box:
+            box = geo.bounding_box
+            inside = models.FieldCondition(
+                key="location",
+                geo_bounding_box=models.GeoBoundingBox(
+                    top_left=models.GeoPoint(lat=box['north'], lon=box['west']),
+                    bottom_right=models.GeoPoint(lat=box['south'], lon=box['east'])
+                )
+            )
+        else:
+            inside = models.FieldCondition(
+                key="location",
+                geo_radius=models.GeoRadius(
+                    center=models.GeoPoint(lat=geo.lat, lon=geo.lng),
+                    radius=geo.radius_km * 1000
+                )
+            )
+        
+        return models.Filter(should=[
+            inside,
+            models.IsEmptyCondition(is_empty=models.PayloadField(key="location"))
+        ])
+    
+    def _format_search_results(self, hits: List[tuple], query: str, intent: str = None, backend: str = None) -> Dict:
+        """Build the results/sources response from (score, payload) hits"""
+        results = []
+        sources = []
+        
+        for score, payload in hits:
+            results.append({
+                'content': payload.get('content', ''),
+                'category': payload.get('category', ''),
+                'score': score,
+                'source': payload.get('source', ''),
+                'timestamp': payload.get('timestamp', '')
+            })
+            
+            # Add unique sources
+            source_info = {
+                'title': payload.get('source', 'SafeIndy Knowledge Base'),
+                'category': payload.get('category', 'general'),
+                'type': 'knowledge_base',
+                'score': score
             }
+            
+            if source_info not in sources:
+                sources.append(source_info)
+        
+        return {
+            'results': results,
+            'sources': sources,
+            'query': query,
+            'intent_filter': intent,
+            'total_results': len(results),
+            'backend': backend,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def update_knowledge(self, point_id: str, new_content: str = None, new_metadata: Dict = None) -> bool:
-        """Update existing knowledge entry"""
+        """
+        Update existing knowledge entry
+        
+        A content-addressed point moves to the id of its new content (and
+        the old id is deleted), so re-adding either text later matches the
+        stored point instead of duplicating it. Caller-supplied ids (slugs
+        or UUIDs) are stable and kept.
+        """
         self._ensure_initialized()
         
         try:
@@ -425,33 +1373,53 @@ class VectorService:
             
             existing_point = existing[0]
             updated_payload = existing_point.payload.copy()
+            old_content = updated_payload.get('content', '')
+            content_addressed = str(existing_point.id) == self.content_point_id(old_content)
             
-            # Update content and regenerate embedding if needed
-            if new_content:
-                updated_payload['content'] = new_content
-                new_embedding = self.generate_embedding(new_content)
+            # Re-embed only if the normalized content actually changed
+            if new_content and self.content_hash(new_content) != self.content_hash(old_content):
+                new_embedding = self.generate_embedding(new_content, input_type="search_document")
+                if new_embedding is None:
+                    raise Exception("Embedding failed")
             else:
                 new_embedding = existing_point.vector
+            if new_content:
+                updated_payload['content'] = new_content
+            updated_payload['content_hash'] = self.content_hash(updated_payload.get('content', ''))
+            updated_payload.pop('payload_hash', None)  # No longer the payload of any batch entry
             
             # Update metadata
             if new_metadata:
                 updated_payload.update(new_metadata)
+                self._set_geo_payload(updated_payload, new_metadata)
             
             updated_payload['last_updated'] = datetime.now().isoformat()
             
+            new_id = self.content_point_id(updated_payload['content']) if content_addressed else existing_point.id
+            updated_payload['id'] = new_id
+            
             # Upsert updated point
             self.client.upsert(
                 collection_name=self.collection_name,
                 points=[
                     PointStruct(
-                        id=point_id,
+                        id=new_id,
                         vector=new_embedding,
                         payload=updated_payload
                     )
                 ]
             )
             
-            print(f"✅ Updated knowledge entry: {point_id}")
+            if str(new_id) != str(existing_point.id):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(points=[existing_point.id])
+                )
+                self._mirror_remove([existing_point.id])
+            
+            self._mirror_upsert([new_id], [new_embedding], [updated_payload])
+            
+            print(f"✅ Updated knowledge entry: {new_id}")
             return True
             
         except Exception as e:
@@ -460,28 +1428,37 @@ class VectorService:
     
     def delete_knowledge(self, point_id: str) -> bool:
         """Delete knowledge entry"""
+        return self.delete_knowledge_batch([point_id])
+    
+    def delete_knowledge_batch(self, point_ids: List) -> bool:
+        """Delete knowledge entries in one call"""
         self._ensure_initialized()
         
         try:
             if not self.client:
                 return False
+            if not point_ids:
+                return True
             
             self.client.delete(
                 collection_name=self.collection_name,
                 points_selector=models.PointIdsList(
-                    points=[point_id]
+                    points=list(point_ids)
                 )
             )
             
-            print(f"✅ Deleted knowledge entry: {point_id}")
+            self._mirror_remove(point_ids)
+            
+            print(f"✅ Deleted {len(point_ids)} knowledge entries")
             return True
             
         except Exception as e:
             print(f"❌ Error deleting knowledge: {e}")
             return False
     
+    @cached(ttl=30, is_failure=lambda info: 'error' in info)
     def get_collection_info(self) -> Dict:
-        """Get information about the knowledge collection"""
+        """Get information about the knowledge collection (cached briefly; status pages poll it)"""
         self._ensure_initialized()
         
         try:
@@ -523,7 +1500,8 @@ class VectorService:
         
         try:
             if not self.client:
-                return 'error'
+                # Searches can still be served from the local mirror
+                return 'degraded' if self.local_index.is_ready() or self.lexical_index.is_ready() else 'error'
             
             # Test collection access
             collections = self.client.get_collections()
@@ -539,22 +1517,25 @@ class VectorService:
     
     def get_similar_queries(self, query: str, limit: int = 3) -> List[str]:
         """Get similar queries from knowledge base"""
-        self._ensure_initialized()
-        
+        return self.get_similar_queries_batch([query], limit)[0]
+    
+    def get_similar_queries_batch(self, queries: List[str], limit: int = 3) -> List[List[str]]:
+        """Get similar queries for many inputs with one batched search"""
         try:
-            search_results = self.search_knowledge(query, limit=limit)
+            similar = []
+            for search_results in self.search_knowledge_batch(queries, limit=limit):
+                similar_queries = []
+                for result in search_results.get('results', []):
+                    content = result.get('content', '')
+                    if content and len(content) < 100:  # Short content might be queries
+                        similar_queries.append(content)
+                similar.append(similar_queries[:limit])
             
-            similar_queries = []
-            for result in search_results.get('results', []):
-                content = result.get('content', '')
-                if content and len(content) < 100:  # Short content might be queries
-                    similar_queries.append(content)
-            
-            return similar_queries[:limit]
+            return similar
             
         except Exception as e:
             print(f"❌ Error getting similar queries: {e}")
-            return []
+            return [[] for _ in queries]
 
     def rebuild_indexes(self):
         """Utility method to rebuild all payload indexes"""
@@ -568,3 +1549,13 @@ class VectorService:
         except Exception as e:
             print(f"❌ Error rebuilding indexes: {e}")
             return False
+
+# Global vector service instance
+_vector_service = None
+
+def get_vector_service():
+    """Get global vector service instance (shares clients, mirrors and warm-up state)"""
+    global _vector_service
+    if _vector_service is None:
+        _vector_service = VectorService()
+    return _vector_service
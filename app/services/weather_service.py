@@ -9,6 +9,29 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from app.utils import geohash
+from app.utils.cache_decorator import cached
+from app.utils.cache_manager import get_weather_cache
+
+def _tile_key(lat: float = None, lng: float = None, *args, **kwargs) -> Dict:
+    """Requests in the same weather tile share an entry; None means Indianapolis"""
+    return {
+        'tile': geohash.tile_for(lat, lng, 'weather') if lat is not None and lng is not None else None,
+        'args': list(args),
+        'kwargs': kwargs
+    }
+
+def _neighbor_tile_keys(lat: float = None, lng: float = None, *args, **kwargs) -> List[Dict]:
+    """Keys of the surrounding weather tiles, closest first"""
+    if lat is None or lng is None:
+        return []
+    return [{'tile': tile, 'args': list(args), 'kwargs': kwargs}
+            for tile in geohash.nearest_neighbors(lat, lng, 'weather')]
+
+def _is_mock(result: Dict) -> bool:
+    """Mock data stands in for failed API calls"""
+    return 'note' in result
+
 class WeatherService:
     def __init__(self):
         self.api_key = None
@@ -28,6 +51,8 @@ class WeatherService:
         except Exception as e:
             print(f"❌ Failed to initialize weather service: {e}")
     
+    @cached(ttl=600, stale_ttl=600, negative_ttl=60, key=_tile_key, neighbors=_neighbor_tile_keys,
+            is_failure=_is_mock, cache=get_weather_cache)
     def get_current_weather(self, lat: float = None, lng: float = None) -> Dict:
         """
         Get current weather conditions
@@ -85,6 +110,8 @@ class WeatherService:
             print(f"❌ Weather service error: {e}")
             return self._get_mock_weather()
     
+    @cached(ttl=300, negative_ttl=60, key=_tile_key, is_failure=_is_mock,
+            cache=get_weather_cache)  # No stale or neighbor serving: alerts are safety information
     def get_weather_alerts(self, lat: float = None, lng: float = None) -> Dict:
         """
         Get weather alerts and warnings
@@ -148,6 +175,8 @@ class WeatherService:
             print(f"❌ Weather alerts error: {e}")
             return self._get_mock_alerts()
     
+    @cached(ttl=1800, stale_ttl=1800, negative_ttl=60, key=_tile_key, neighbors=_neighbor_tile_keys,
+            is_failure=_is_mock, cache=get_weather_cache)
     def get_forecast(self, lat: float = None, lng: float = None, days: int = 3) -> Dict:
         """
         Get weather forecast
@@ -0,0 +1,208 @@
+"""
+BM25 Index for SafeIndy Assistant
+In-process lexical index over the knowledge base payloads so exact tokens
+(phone numbers, "IMPD", "RequestIndy", street names) are matched even when
+the dense embedding misses them
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Phone numbers in any punctuation style also index as one digit token
+PHONE_DIGITS_PATTERN = re.compile(r'(?<!\d)(\d{3})\D{0,2}(\d{3})\D?(\d{4})(?!\d)')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'for', 'from', 'how',
+    'i', 'if', 'in', 'is', 'it', 'me', 'my', 'of', 'on', 'or', 'the', 'to', 'what',
+    'when', 'where', 'which', 'who', 'with', 'you', 'your'
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/number tokens without stopwords, plus joined phone digits"""
+    text = (text or '').lower()
+    tokens = [token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS]
+    tokens.extend(''.join(groups) for groups in PHONE_DIGITS_PATTERN.findall(text))
+    return tokens
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index keyed by point id
+
+    Postings map term -> {point_id: term frequency}. The index is small
+    (one entry per knowledge chunk) so a single lock around reads and
+    writes is cheaper than copy-on-write here.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, sync_interval: int = 300):
+        self.k1 = k1
+        self.b = b
+        self.sync_interval = sync_interval
+        self.postings = {}  # term -> {point_id: tf}
+        self.doc_lengths = {}  # point_id -> token count
+        self.doc_terms = {}  # point_id -> set of terms (for removal)
+        self.payloads = {}  # point_id -> payload
+        self.total_length = 0
+        self.last_synced = 0
+        self._lock = threading.RLock()
+
+    @property
+    def size(self) -> int:
+        return len(self.doc_lengths)
+
+    def is_ready(self) -> bool:
+        return self.size > 0
+
+    def needs_sync(self) -> bool:
+        return time.time() - self.last_synced > self.sync_interval
+
+    def load(self, ids: List, payloads: List[Dict]):
+        """Replace the whole index"""
+        with self._lock:
+            self.postings.clear()
+            self.doc_lengths.clear()
+            self.doc_terms.clear()
+            self.payloads.clear()
+            self.total_length = 0
+            self._add(ids, payloads)
+            self.last_synced = time.time()
+
+    def sync_from_qdrant(self, client, collection_name: str, batch_size: int = 256) -> int:
+        """Rebuild from the collection payloads (vectors are not fetched)"""
+        try:
+            ids, payloads = [], []
+            offset = None
+
+            while True:
+                points, offset = client.scroll(
+                    collection_name=collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False
+                )
+                for point in points:
+                    ids.append(point.id)
+                    payloads.append(point.payload or {})
+                if offset is None:
+                    break
+
+            self.load(ids, payloads)
+            print(f"✅ BM25 index synced: {len(ids)} documents")
+            return len(ids)
+
+        except Exception as e:
+            print(f"❌ BM25 index sync error: {e}")
+            return 0
+
+    def upsert(self, ids: List, payloads: List[Dict]):
+        """Insert or replace documents"""
+        with self._lock:
+            self._remove(ids)
+            self._add(ids, payloads)
+
+    def remove(self, ids: List):
+        """Remove documents by id"""
+        with self._lock:
+            self._remove(ids)
+
+    def search(self, query: str, category: str = None, limit: int = 5,
+               geo=None) -> List[Tuple[float, Dict]]:
+        """
+        Score documents containing any query term
+
+        Args:
+            geo: Optional GeoFilter; documents outside it are dropped
+
+        Returns:
+            List of (bm25_score, payload) tuples, best first
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            doc_count = self.size
+            if not doc_count:
+                return []
+
+            average_length = self.total_length / doc_count
+            scores = {}
+
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for point_id, tf in postings.items():
+                    length_norm = 1 - self.b + self.b * self.doc_lengths[point_id] / average_length
+                    scores[point_id] = scores.get(point_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+            if category:
+                scores = {point_id: score for point_id, score in scores.items()
+                          if self.payloads[point_id].get('category') == category}
+            if geo is not None:
+                scores = {point_id: score for point_id, score in scores.items()
+                          if geo.matches(self.payloads[point_id])}
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(score, self.payloads[point_id]) for point_id, score in top]
+
+    def get_stats(self) -> Dict:
+        """Get index statistics"""
+        return {
+            'documents': self.size,
+            'terms': len(self.postings),
+            'average_length': round(self.total_length / self.size, 1) if self.size else 0,
+            'last_synced': datetime.fromtimestamp(self.last_synced).isoformat() if self.last_synced else None
+        }
+
+    def _add(self, ids: List, payloads: List[Dict]):
+        for point_id, payload in zip(ids, payloads):
+            counts = Counter(tokenize(payload.get('content', '')))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, {})[point_id] = tf
+            length = sum(counts.values())
+            self.doc_lengths[point_id] = length
+            self.doc_terms[point_id] = set(counts)
+            self.payloads[point_id] = payload
+            self.total_length += length
+
+    def _remove(self, ids: List):
+        for point_id in ids:
+            terms = self.doc_terms.pop(point_id, None)
+            if terms is None:
+                continue
+            for term in terms:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(point_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(point_id)
+            self.payloads.pop(point_id, None)
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Tuple[float, Dict]]], k: int = 60,
+                           limit: int = 5) -> List[Tuple[float, Dict]]:
+    """
+    Merge (score, payload) rankings with RRF: sum of 1 / (k + rank)
+
+    Documents are matched across lists by their content, since the dense
+    backends return payloads without point ids.
+    """
+    fused = {}
+    for ranking in ranked_lists:
+        for rank, (_, payload) in enumerate(ranking, 1):
+            key = payload.get('content_hash') or payload.get('content', '')
+            score, _ = fused.get(key, (0.0, payload))
+            fused[key] = (score + 1.0 / (k + rank), payload)
+
+    return sorted(fused.values(), key=lambda item: item[0], reverse=True)[:limit]
@@ -0,0 +1,568 @@
+"""
+Cache Backends for SafeIndy Assistant
+Storage behind CacheManager: a per-process striped LRU, a SQLite store shared
+by every worker on the host, or an optional Redis store shared across hosts
+"""
+
+import heapq
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+def _empty_stats() -> Dict:
+    return {
+        'hits': 0,
+        'misses': 0,
+        'evictions': 0,
+        'total_requests': 0
+    }
+
+def entry_size(key: str, data: Any) -> int:
+    """Approximate size of an entry, measured once when it is stored"""
+    try:
+        return len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)) + len(key)
+    except Exception:
+        return sys.getsizeof(data) + len(key)
+
+class CacheBackend:
+    """
+    Interface for cache storage
+
+    get/set/delete may raise; CacheManager handles and logs errors.
+
+    Attributes:
+        name: Backend identifier shown in stats
+        max_entries: Entry limit
+        max_bytes: Total size limit
+        shared: True if other processes see the same entries
+        listener: Optional callable(event, key, size), called with 'store'
+            and 'evict' events (CacheManager feeds them to telemetry)
+    """
+
+    name = 'base'
+    shared = False
+    listener = None
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _notify(self, event: str, key: str, size: int):
+        if self.listener:
+            self.listener(event, key, size)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Stored value, or None if missing or expired"""
+        raise NotImplementedError
+
+    def peek_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Live values of whichever keys are stored, in one call; not counted in stats, recency untouched"""
+        raise NotImplementedError
+
+    def set(self, key: str, data: Any, ttl: float) -> bool:
+        """Store a value for ttl seconds; False if it was not stored"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+        raise NotImplementedError
+
+    def cleanup_expired(self) -> int:
+        """Remove expired entries, returns how many"""
+        return 0
+
+    def get_stats(self) -> Dict:
+        """Counters plus cache_size and memory_bytes"""
+        raise NotImplementedError
+
+    def export_entries(self) -> List[Tuple[str, Any, float]]:
+        """Live (key, value, expires_at) entries for a snapshot; shared stores outlive restarts on their own"""
+        return []
+
+    def import_entries(self, entries: Iterable[Tuple[str, Any, float]]) -> int:
+        """Restore unexpired snapshot entries, returns how many"""
+        return 0
+
+class CacheShard:
+    """
+    One lock stripe of a MemoryCacheBackend
+
+    Entries live in an OrderedDict kept in access order, so get, set and
+    evicting the least recently used entry are all O(1). Expiry times sit
+    in a min-heap of (expires_at, key); expired entries are popped off its
+    top instead of scanning the shard. Heap entries left behind by
+    overwritten or deleted keys are skipped when popped and compacted away
+    once they outnumber the live ones. Each item carries its size, measured
+    once at insert, and the shard keeps a running byte total.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> cache item, least recently used first
+        self.expiry_heap = []  # (expires_at, key)
+        self.bytes = 0  # Sum of entry sizes
+        self.stats = _empty_stats()
+
+    def purge_expired(self, now: float) -> int:
+        """Pop expired entries off the expiry heap (caller holds the lock)"""
+        heap = self.expiry_heap
+        removed = 0
+
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            cache_item = self.entries.get(key)
+            # Skip heap entries of keys overwritten or deleted since
+            if cache_item is not None and cache_item['expires_at'] == expires_at:
+                self.remove(key)
+                removed += 1
+
+        return removed
+
+    def remove(self, key: str) -> Optional[Dict]:
+        """Drop an entry and its bytes (caller holds the lock)"""
+        cache_item = self.entries.pop(key, None)
+        if cache_item is not None:
+            self.bytes -= cache_item['size']
+        return cache_item
+
+    def maybe_compact_heap(self):
+        """Rebuild the heap from live entries once stale ones dominate (caller holds the lock)"""
+        if len(self.expiry_heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [(item['expires_at'], key) for key, item in self.entries.items()]
+            heapq.heapify(self.expiry_heap)
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Thread-safe in-process TTL cache with LRU eviction
+
+    Keys are spread over lock stripes by hash, so threads of a threaded WSGI
+    server only contend when they touch the same stripe. max_entries and
+    max_bytes are split into per-stripe limits that add up to them exactly,
+    and each stripe evicts its own least recently used entries once it hits
+    its share. The totals are therefore never exceeded, but a stripe can
+    evict while others have room, and an entry larger than one stripe's byte
+    share is not cached. This approximates a global LRU closely once the
+    cache is larger than a few entries per stripe.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, stripes: int = 16):
+        super().__init__(max_entries, max_bytes)
+        self._shards = [CacheShard() for _ in range(stripes)]
+
+    def _shard_index(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+
+    def _shard(self, key: str) -> CacheShard:
+        return self._shards[self._shard_index(key)]
+
+    def _shard_capacity(self, index: int) -> tuple:
+        """
+        (max entries, max bytes) of one stripe
+
+        The first max_entries % stripes stripes take one extra entry (and
+        likewise for bytes), so the limits sum to max_entries and max_bytes.
+        Every stripe keeps room for at least one entry, so only a cache with
+        fewer entries than stripes can hold more than max_entries.
+        """
+        stripes = len(self._shards)
+        entries = self.max_entries // stripes + (index < self.max_entries % stripes)
+        return max(1, entries), self.max_bytes // stripes + (index < self.max_bytes % stripes)
+
+    def get(self, key: str) -> Optional[Any]:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.stats['total_requests'] += 1
+
+            cache_item = shard.entries.get(key)
+            if cache_item is None:
+                shard.stats['misses'] += 1
+                return None
+
+            # Check if expired
+            now = time.time()
+            if cache_item['expires_at'] < now:
+                shard.remove(key)
+                shard.stats['misses'] += 1
+                return None
+
+            # Update access order for LRU
+            cache_item['last_accessed'] = now
+            shard.entries.move_to_end(key)
+            shard.stats['hits'] += 1
+
+            return cache_item['data']
+
+    def peek_many(self, keys: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        found = {}
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:
+                cache_item = shard.entries.get(key)
+                if cache_item is not None and cache_item['expires_at'] >= now:
+                    found[key] = cache_item['data']
+        return found
+
+    def set(self, key: str, data: Any, ttl: float) -> bool:
+        now = time.time()
+        cache_item = {
+            'data': data,
+            'created_at': now,
+            'last_accessed': now,
+            'expires_at': now + ttl,
+            'ttl': ttl,
+            'size': entry_size(key, data)
+        }
+        index = self._shard_index(key)
+        max_entries, max_bytes = self._shard_capacity(index)
+
+        if cache_item['size'] > max_bytes:
+            print(f"⚠️ Not caching {key[:40]}: {cache_item['size']} bytes exceeds the per-stripe limit")
+            self.delete(key)  # Don't keep serving the older value
+            return False
+
+        shard = self._shards[index]
+        with shard.lock:
+            # Expired entries go first, then least recently used ones
+            shard.purge_expired(now)
+            shard.remove(key)
+            while shard.entries and (len(shard.entries) >= max_entries
+                                     or shard.bytes + cache_item['size'] > max_bytes):
+                self._evict_lru(shard)
+
+            shard.entries[key] = cache_item
+            shard.bytes += cache_item['size']
+            heapq.heappush(shard.expiry_heap, (cache_item['expires_at'], key))
+            shard.maybe_compact_heap()
+        self._notify('store', key, cache_item['size'])
+        return True
+
+    def delete(self, key: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.remove(key) is not None
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_heap = []
+                shard.bytes = 0
+                shard.stats = _empty_stats()
+
+    def cleanup_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.purge_expired(now)
+        return removed
+
+    def _evict_lru(self, shard: CacheShard):
+        """Evict least recently used item of a stripe (caller holds its lock)"""
+        if not shard.entries:
+            return
+
+        key, cache_item = shard.entries.popitem(last=False)
+        shard.bytes -= cache_item['size']
+        shard.stats['evictions'] += 1
+        self._notify('evict', key, cache_item['size'])
+
+    def export_entries(self) -> List[Tuple[str, Any, float]]:
+        now = time.time()
+        entries = []
+        for shard in self._shards:
+            with shard.lock:
+                # Least recently used first, so restoring in order keeps recency
+                entries.extend((key, item['data'], item['expires_at'])
+                               for key, item in shard.entries.items() if item['expires_at'] > now)
+        return entries
+
+    def import_entries(self, entries: Iterable[Tuple[str, Any, float]]) -> int:
+        restored = 0
+        for key, data, expires_at in entries:
+            remaining = expires_at - time.time()
+            if remaining <= 0:
+                continue
+
+            shard = self._shard(key)
+            with shard.lock:
+                present = key in shard.entries
+            # Entries written since boot are newer than the snapshot's
+            if not present and self.set(key, data, remaining):
+                restored += 1
+        return restored
+
+    def get_stats(self) -> Dict:
+        totals = _empty_stats()
+        for shard in self._shards:
+            with shard.lock:
+                for name, value in shard.stats.items():
+                    totals[name] += value
+        totals['cache_size'] = sum(len(shard.entries) for shard in self._shards)
+        totals['memory_bytes'] = sum(shard.bytes for shard in self._shards)
+        return totals
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache table in a SQLite file (WAL mode) shared by all workers on a host
+
+    Each cache uses its own namespace in one table. Values are pickled, so
+    the file must only be writable by the app. Recency is refreshed at most
+    every touch_interval seconds per entry to keep hits read-only, and the
+    size limits are enforced every prune_every writes by dropping expired
+    entries and then the least recently used ones.
+    """
+
+    name = 'sqlite'
+    shared = True
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 1000,
+                 max_bytes: int = 32 * 1024 * 1024, prune_every: int = 100, touch_interval: int = 30):
+        super().__init__(max_entries, max_bytes)
+        self.path = path
+        self.namespace = namespace
+        self.prune_every = prune_every
+        self.touch_interval = touch_interval
+        self._local = threading.local()  # One connection per thread
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+        self.stats = _empty_stats()
+
+        db = self._db()
+        db.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, '
+            'expires_at REAL NOT NULL, last_accessed REAL NOT NULL, size INTEGER NOT NULL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        db.execute('CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, last_accessed)')
+        db.commit()
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    def _count(self, *stats: str):
+        with self._stats_lock:
+            for stat in stats:
+                self.stats[stat] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        db = self._db()
+        now = time.time()
+        row = db.execute(
+            'SELECT value, expires_at, last_accessed FROM cache_entries WHERE namespace = ? AND key = ?',
+            (self.namespace, key)
+        ).fetchone()
+
+        if row is None or row[1] < now:
+            self._count('total_requests', 'misses')
+            return None
+
+        if now - row[2] > self.touch_interval:
+            db.execute('UPDATE cache_entries SET last_accessed = ? WHERE namespace = ? AND key = ?',
+                       (now, self.namespace, key))
+            db.commit()
+
+        self._count('total_requests', 'hits')
+        return pickle.loads(row[0])
+
+    def peek_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        rows = self._db().execute(
+            f"SELECT key, value FROM cache_entries WHERE namespace = ? AND expires_at >= ? "
+            f"AND key IN ({', '.join('?' * len(keys))})",
+            (self.namespace, time.time(), *keys)
+        ).fetchall()
+        return {key: pickle.loads(value) for key, value in rows}
+
+    def set(self, key: str, data: Any, ttl: float) -> bool:
+        value = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        size = len(value) + len(key)
+        if size > self.max_bytes:
+            print(f"⚠️ Not caching {key[:40]}: {size} bytes exceeds the cache limit")
+            self.delete(key)
+            return False
+
+        now = time.time()
+        db = self._db()
+        db.execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, last_accessed, size) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (self.namespace, key, value, now + ttl, now, size)
+        )
+        db.commit()
+
+        with self._stats_lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        self._notify('store', key, size)
+        if prune:
+            self._prune()
+        return True
+
+    def delete(self, key: str) -> bool:
+        db = self._db()
+        deleted = db.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+                             (self.namespace, key)).rowcount
+        db.commit()
+        return deleted > 0
+
+    def clear(self):
+        db = self._db()
+        db.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+        db.commit()
+        with self._stats_lock:
+            self.stats = _empty_stats()
+
+    def cleanup_expired(self) -> int:
+        db = self._db()
+        removed = db.execute('DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?',
+                             (self.namespace, time.time())).rowcount
+        db.commit()
+        return removed
+
+    def _prune(self):
+        """Drop expired entries, then least recently used ones over the limits"""
+        self.cleanup_expired()
+        db = self._db()
+        count, total = self._totals(db)
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from the oldest entry until both limits are met
+        drop, over_count, over_bytes = [], count - self.max_entries, total - self.max_bytes
+        for key, size in db.execute(
+            'SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY last_accessed',
+            (self.namespace,)
+        ):
+            if over_count <= 0 and over_bytes <= 0:
+                break
+            drop.append((self.namespace, key, size))
+            over_count -= 1
+            over_bytes -= size
+
+        db.executemany('DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+                       [(namespace, key) for namespace, key, _ in drop])
+        db.commit()
+        with self._stats_lock:
+            self.stats['evictions'] += len(drop)
+        for _, key, size in drop:
+            self._notify('evict', key, size)
+
+    def _totals(self, db) -> tuple:
+        count, total = db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?',
+            (self.namespace,)
+        ).fetchone()
+        return count, total
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['cache_size'], stats['memory_bytes'] = self._totals(self._db())
+        return stats
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache entries in Redis, shared across hosts (needs the redis package)
+
+    TTLs are native Redis expirations. Size limits are left to the server's
+    maxmemory policy (allkeys-lru is the matching choice); max_bytes only
+    rejects single oversized entries.
+    """
+
+    name = 'redis'
+    shared = True
+
+    def __init__(self, url: str, namespace: str, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024):
+        super().__init__(max_entries, max_bytes)
+        import redis  # Optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"safeindy:{namespace}:"
+        self._stats_lock = threading.Lock()
+        self.stats = _empty_stats()
+
+    def _count(self, *stats: str):
+        with self._stats_lock:
+            for stat in stats:
+                self.stats[stat] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self._count('total_requests', 'misses')
+            return None
+        self._count('total_requests', 'hits')
+        return pickle.loads(value)
+
+    def peek_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+        values = self.client.mget([self.prefix + key for key in keys])
+        return {key: pickle.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set(self, key: str, data: Any, ttl: float) -> bool:
+        value = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            print(f"⚠️ Not caching {key[:40]}: {len(value)} bytes exceeds the cache limit")
+            self.delete(key)
+            return False
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+        self._notify('store', key, len(value) + len(key))
+        return True
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.delete(self.prefix + key))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*', count=500))
+        for start in range(0, len(keys), 500):
+            self.client.delete(*keys[start:start + 500])
+        with self._stats_lock:
+            self.stats = _empty_stats()
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['cache_size'] = None  # Counting keys means a full SCAN
+        stats['memory_bytes'] = None
+        return stats
+
+def create_cache_backend(kind: str, namespace: str, max_entries: int = 1000,
+                         max_bytes: int = 32 * 1024 * 1024, sqlite_path: str = None,
+                         redis_url: str = None) -> CacheBackend:
+    """
+    Build a backend by name ('memory', 'sqlite' or 'redis')
+
+    Falls back to memory if the shared store cannot be opened, so a missing
+    file permission or Redis server never takes caching down entirely.
+    """
+    try:
+        if kind == 'sqlite':
+            return SQLiteCacheBackend(sqlite_path or 'safeindy_cache.db', namespace, max_entries, max_bytes)
+        if kind == 'redis':
+            backend = RedisCacheBackend(redis_url or 'redis://localhost:6379/0', namespace, max_entries, max_bytes)
+            backend.client.ping()
+            return backend
+    except Exception as e:
+        print(f"⚠️ {kind} cache backend unavailable for {namespace}, using memory: {e}")
+
+    return MemoryCacheBackend(max_entries, max_bytes)
@@ -0,0 +1,219 @@
+"""
+Cache Decorator for SafeIndy Assistant
+Declarative result caching for service methods with negative caching and
+stale-while-revalidate
+"""
+
+import copy
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from app.utils.cache_manager import get_function_cache
+from app.utils.cache_telemetry import get_cache_telemetry
+
+_registry = set()  # Names of @cached functions
+_registry_lock = threading.Lock()
+
+def _new_counters() -> Dict:
+    return {
+        'hits': 0,
+        'stale_hits': 0,
+        'misses': 0,
+        'negative_hits': 0,
+        'neighbor_hits': 0,
+        'failures': 0,
+        'refreshes': 0,
+        'refresh_failures': 0,
+        'seconds_saved': 0  # Call time of the results served from cache
+    }
+
+def cached(ttl: int = 300, key: Callable = None, negative_ttl: int = 0, stale_ttl: int = 0,
+           is_failure: Callable[[Any], bool] = None, cache: Callable = None, name: str = None,
+           neighbors: Callable = None, adapt: Callable = None):
+    """
+    Cache a function's results
+
+    Args:
+        ttl: Seconds a result is fresh
+        key: Builds the cache key from the call's arguments (same signature
+            as the function, self excluded for methods); defaults to all
+            arguments
+        negative_ttl: Seconds to remember a failed result (0 = don't cache failures)
+        stale_ttl: Seconds past ttl a result is still served while one
+            background call refreshes it (0 = no stale-while-revalidate)
+        is_failure: Marks results that should not be cached as successes
+            (e.g. fallback responses); exceptions always propagate uncached
+        cache: Accessor for the CacheManager to store results in
+            (default: the shared function result cache)
+        name: Counter/key name (default: module.qualname)
+        neighbors: Builds key data for nearby entries to try on a miss, in
+            order (e.g. neighboring map tiles); only fresh successes are used
+        adapt: adapt(result, *args, **kwargs) fits a cached result to this
+            call's own arguments (e.g. distances from the caller's point)
+
+    The wrapper exposes .invalidate(*args, **kwargs), .cache_stats() and
+    .uncached (the original function).
+    """
+    def decorator(func):
+        func_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+        params = list(inspect.signature(func).parameters)
+        is_method = bool(params) and params[0] == 'self'
+        get_cache = cache or get_function_cache
+        refreshing = set()  # Keys with a background refresh in flight
+        refreshing_lock = threading.Lock()
+
+        telemetry = get_cache_telemetry()
+
+        with _registry_lock:
+            _registry.add(func_name)
+
+        def count(counter: str, amount: float = 1):
+            telemetry.record('cached_functions', func_name, counter, amount)  # Lock-free
+
+        def call_args(args):
+            return args[1:] if is_method else args
+
+        def make_key(args, kwargs, key_data=None) -> str:
+            if key_data is None:
+                key_data = key(*call_args(args), **kwargs) if key else {
+                    'args': [repr(arg) for arg in call_args(args)],
+                    'kwargs': {k: repr(v) for k, v in sorted(kwargs.items())}
+                }
+            return get_cache().get_cache_key(key_data, f"fn_{func_name}")
+
+        def serve(entry, args, kwargs):
+            count('seconds_saved', entry.get('cost', 0))
+            value = copy.deepcopy(entry['value'])
+            return adapt(value, *call_args(args), **kwargs) if adapt and not entry['failure'] else value
+
+        def find_neighbor(args, kwargs):
+            """
+            First fresh successful entry among the neighboring keys, fetched
+            in one uncounted batch (the caller's own miss is the one counted)
+            """
+            keys = [make_key(args, kwargs, key_data) for key_data in neighbors(*call_args(args), **kwargs)]
+            found = get_cache().peek_many(keys)
+            for cache_key in keys:
+                entry = found.get(cache_key)
+                if entry is not None and not entry['failure'] and time.time() < entry['fresh_until']:
+                    return entry
+            return None
+
+        def store(cache_key: str, result: Any, cost: float) -> bool:
+            """Cache a result and how long it took; False if it was a failure"""
+            failed = bool(is_failure and is_failure(result))
+            if failed:
+                count('failures')
+                if negative_ttl:
+                    get_cache().set(cache_key, {'value': result, 'fresh_until': time.time() + negative_ttl,
+                                                'failure': True, 'cost': cost}, ttl=negative_ttl)
+            else:
+                get_cache().set(cache_key, {'value': result, 'fresh_until': time.time() + ttl,
+                                            'failure': False, 'cost': cost}, ttl=ttl + stale_ttl)
+            return not failed
+
+        def refresh(cache_key: str, app, args, kwargs):
+            """Recompute in the background; a failed refresh keeps the stale entry"""
+            try:
+                started = time.perf_counter()
+                if app is not None:
+                    with app.app_context():
+                        result = func(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+
+                if is_failure and is_failure(result):
+                    count('refresh_failures')
+                else:
+                    store(cache_key, result, time.perf_counter() - started)
+                    count('refreshes')
+            except Exception as e:
+                count('refresh_failures')
+                print(f"⚠️ Background refresh of {func_name} failed: {e}")
+            finally:
+                with refreshing_lock:
+                    refreshing.discard(cache_key)
+
+        def start_refresh(cache_key: str, args, kwargs):
+            with refreshing_lock:
+                if cache_key in refreshing:
+                    return
+                refreshing.add(cache_key)
+
+            try:
+                from flask import current_app
+                app = current_app._get_current_object()
+            except Exception:
+                app = None  # No app context to carry into the refresh thread
+
+            threading.Thread(target=refresh, args=(cache_key, app, args, kwargs), daemon=True).start()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                cache_key = make_key(args, kwargs)
+                entry = get_cache().get(cache_key)
+            except Exception as e:
+                print(f"⚠️ Cache lookup for {func_name} failed: {e}")
+                return func(*args, **kwargs)
+
+            if entry is not None:
+                if entry['failure']:
+                    count('negative_hits')
+                    return serve(entry, args, kwargs)
+                if time.time() < entry['fresh_until']:
+                    count('hits')
+                    return serve(entry, args, kwargs)
+
+                # Past ttl but within stale_ttl: answer now, refresh behind
+                count('stale_hits')
+                start_refresh(cache_key, args, kwargs)
+                return serve(entry, args, kwargs)
+
+            if neighbors:
+                try:
+                    entry = find_neighbor(args, kwargs)
+                except Exception as e:
+                    print(f"⚠️ Neighbor lookup for {func_name} failed: {e}")
+                    entry = None
+                if entry is not None:
+                    count('neighbor_hits')
+                    return serve(entry, args, kwargs)
+
+            count('misses')
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            store(cache_key, copy.deepcopy(result), time.perf_counter() - started)
+            return result
+
+        def invalidate(*args, **kwargs) -> bool:
+            """Drop the cached result for these arguments (pass self for methods)"""
+            return get_cache().delete(make_key(args, kwargs))
+
+        def cache_stats() -> Dict:
+            return get_cached_function_stats()[func_name]
+
+        wrapper.invalidate = invalidate
+        wrapper.cache_stats = cache_stats
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+def get_cached_function_stats() -> Dict:
+    """Hit/miss counters for every @cached function, with hit rates"""
+    with _registry_lock:
+        names = sorted(_registry)
+    recorded = get_cache_telemetry().report('cached_functions')['caches'].get('cached_functions', {})
+
+    stats = {}
+    for name in names:
+        counters = stats[name] = _new_counters()
+        counters.update({field: value for field, value in recorded.get(name, {}).items() if field != 'hit_rate'})
+        served = counters['hits'] + counters['stale_hits'] + counters['negative_hits'] + counters['neighbor_hits']
+        total = served + counters['misses']
+        counters['hit_rate'] = round(served / total * 100, 2) if total else 0
+    return stats
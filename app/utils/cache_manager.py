@@ -5,25 +5,74 @@ Implements intelligent caching for API responses and AI generations
 
 import hashlib
 import json
+import re
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from flask import current_app
-import pickle
+
+from app.utils import geohash
+from app.utils.cache_backends import CacheBackend, MemoryCacheBackend, create_cache_backend
+from app.utils.cache_telemetry import get_cache_telemetry, key_label
 
 class CacheManager:
-    def __init__(self):
-        self.cache = {}  # In-memory cache
-        self.cache_stats = {
-            'hits': 0,
-            'misses': 0,
-            'evictions': 0,
-            'total_requests': 0
-        }
-        self.max_cache_size = 1000  # Maximum number of cached items
+    """
+    TTL cache with LRU eviction over a pluggable storage backend
+    
+    Defaults to a thread-safe in-process MemoryCacheBackend; configure_caches
+    can switch a cache to a backend shared by all workers (SQLite on the
+    host, or Redis). Callers only use get/set/delete and the specialized
+    helpers below, whatever the backend. Every lookup, store and eviction
+    is also counted per key prefix in the cache telemetry.
+    """
+    
+    namespace = 'general'  # Separates caches sharing one backend store
+    
+    def __init__(self, backend: CacheBackend = None):
+        self.telemetry = get_cache_telemetry()
+        self.backend = backend or MemoryCacheBackend()
+        self.backend.listener = self._on_backend_event
         self.default_ttl = 300  # 5 minutes default TTL
         print("✅ Cache manager initialized")
     
+    @property
+    def max_cache_size(self) -> int:
+        """Maximum number of cached items"""
+        return self.backend.max_entries
+    
+    @max_cache_size.setter
+    def max_cache_size(self, value: int):
+        self.backend.max_entries = value
+    
+    @property
+    def max_cache_bytes(self) -> int:
+        """Maximum total size of cached items"""
+        return self.backend.max_bytes
+    
+    @max_cache_bytes.setter
+    def max_cache_bytes(self, value: int):
+        self.backend.max_bytes = value
+    
+    def use_backend(self, backend: CacheBackend):
+        """Switch storage, keeping the current limits"""
+        backend.max_entries = self.backend.max_entries
+        backend.max_bytes = self.backend.max_bytes
+        backend.listener = self._on_backend_event
+        self.backend = backend
+    
+    def _on_backend_event(self, event: str, key: str, size: int):
+        """Count stores and evictions per key prefix"""
+        if event == 'store':
+            self.telemetry.record_key(self.namespace, key, 'sets')
+            self.telemetry.record_key(self.namespace, key, 'bytes_stored', size)
+        elif event == 'evict':
+            self.telemetry.record_key(self.namespace, key, 'evictions')
+            self.telemetry.record_key(self.namespace, key, 'bytes_evicted', size)
+    
+    def record_saved(self, key: str, seconds: float):
+        """Count the upstream time a cache hit avoided"""
+        self.telemetry.record_key(self.namespace, key, 'seconds_saved', seconds)
+    
     def get_cache_key(self, data: Any, prefix: str = '') -> str:
         """Generate cache key from data"""
         try:
@@ -46,52 +95,35 @@ class CacheManager:
     def get(self, key: str) -> Optional[Dict]:
         """Retrieve item from cache"""
         try:
-            self.cache_stats['total_requests'] += 1
-            
-            if key not in self.cache:
-                self.cache_stats['misses'] += 1
-                return None
-            
-            cache_item = self.cache[key]
-            
-            # Check if expired
-            if cache_item['expires_at'] < time.time():
-                del self.cache[key]
-                self.cache_stats['misses'] += 1
-                return None
-            
-            # Update access time for LRU
-            cache_item['last_accessed'] = time.time()
-            self.cache_stats['hits'] += 1
-            
-            return cache_item['data']
-            
+            data = self.backend.get(key)
         except Exception as e:
             print(f"❌ Cache get error: {e}")
-            self.cache_stats['misses'] += 1
             return None
+        
+        self.telemetry.record_key(self.namespace, key, 'misses' if data is None else 'hits')
+        return data
+    
+    def peek_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Cached values of whichever keys are present, in one backend call
+        
+        Not counted as hits or misses: meant for fallback lookups (e.g.
+        neighboring tiles) after the real lookup already counted its miss.
+        """
+        if not keys:
+            return {}
+        try:
+            return self.backend.peek_many(keys)
+        except Exception as e:
+            print(f"❌ Cache peek error: {e}")
+            return {}
     
     def set(self, key: str, data: Any, ttl: int = None) -> bool:
         """Store item in cache"""
         try:
             if ttl is None:
                 ttl = self.default_ttl
-            
-            # Check cache size and evict if necessary
-            if len(self.cache) >= self.max_cache_size:
-                self._evict_lru()
-            
-            cache_item = {
-                'data': data,
-                'created_at': time.time(),
-                'last_accessed': time.time(),
-                'expires_at': time.time() + ttl,
-                'ttl': ttl
-            }
-            
-            self.cache[key] = cache_item
-            return True
-            
+            return self.backend.set(key, data, ttl)
         except Exception as e:
             print(f"❌ Cache set error: {e}")
             return False
@@ -99,10 +131,7 @@ class CacheManager:
     def delete(self, key: str) -> bool:
         """Delete item from cache"""
         try:
-            if key in self.cache:
-                del self.cache[key]
-                return True
-            return False
+            return self.backend.delete(key)
         except Exception as e:
             print(f"❌ Cache delete error: {e}")
             return False
@@ -110,85 +139,56 @@ class CacheManager:
     def clear(self) -> bool:
         """Clear all cache"""
         try:
-            self.cache.clear()
-            self.cache_stats = {
-                'hits': 0,
-                'misses': 0,
-                'evictions': 0,
-                'total_requests': 0
-            }
+            self.backend.clear()
             print("✅ Cache cleared")
             return True
         except Exception as e:
             print(f"❌ Cache clear error: {e}")
             return False
     
-    def _evict_lru(self):
-        """Evict least recently used item"""
-        try:
-            if not self.cache:
-                return
-            
-            # Find LRU item
-            lru_key = min(self.cache.keys(), 
-                         key=lambda k: self.cache[k]['last_accessed'])
-            
-            del self.cache[lru_key]
-            self.cache_stats['evictions'] += 1
-            
-        except Exception as e:
-            print(f"❌ Cache eviction error: {e}")
-    
     def get_stats(self) -> Dict:
         """Get cache statistics"""
+        try:
+            cache_stats = self.backend.get_stats()
+        except Exception as e:
+            return {'backend': self.backend.name, 'error': str(e)}
+        
         hit_rate = 0
-        if self.cache_stats['total_requests'] > 0:
-            hit_rate = (self.cache_stats['hits'] / self.cache_stats['total_requests']) * 100
+        if cache_stats['total_requests'] > 0:
+            hit_rate = (cache_stats['hits'] / cache_stats['total_requests']) * 100
         
         return {
-            'cache_size': len(self.cache),
+            'backend': self.backend.name,
+            'cache_size': cache_stats['cache_size'],
             'max_size': self.max_cache_size,
             'hit_rate': round(hit_rate, 2),
-            'total_requests': self.cache_stats['total_requests'],
-            'hits': self.cache_stats['hits'],
-            'misses': self.cache_stats['misses'],
-            'evictions': self.cache_stats['evictions'],
-            'memory_usage': self._estimate_memory_usage()
+            'total_requests': cache_stats['total_requests'],
+            'hits': cache_stats['hits'],
+            'misses': cache_stats['misses'],
+            'evictions': cache_stats['evictions'],
+            'memory_bytes': cache_stats['memory_bytes'],
+            'max_bytes': self.max_cache_bytes,
+            'memory_usage': self._format_bytes(cache_stats['memory_bytes'])
         }
     
-    def _estimate_memory_usage(self) -> str:
-        """Estimate cache memory usage"""
-        try:
-            total_size = 0
-            for item in self.cache.values():
-                # Rough estimate using pickle
-                total_size += len(pickle.dumps(item))
-            
-            if total_size < 1024:
-                return f"{total_size} bytes"
-            elif total_size < 1024 * 1024:
-                return f"{total_size / 1024:.1f} KB"
-            else:
-                return f"{total_size / (1024 * 1024):.1f} MB"
-                
-        except Exception as e:
+    def _format_bytes(self, total_size: Optional[int]) -> str:
+        """Human-readable cache size"""
+        if total_size is None:
             return "Unknown"
+        if total_size < 1024:
+            return f"{total_size} bytes"
+        elif total_size < 1024 * 1024:
+            return f"{total_size / 1024:.1f} KB"
+        else:
+            return f"{total_size / (1024 * 1024):.1f} MB"
     
     def cleanup_expired(self):
         """Remove expired items from cache"""
         try:
-            current_time = time.time()
-            expired_keys = []
-            
-            for key, item in self.cache.items():
-                if item['expires_at'] < current_time:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                del self.cache[key]
+            removed = self.backend.cleanup_expired()
             
-            if expired_keys:
-                print(f"🧹 Cleaned up {len(expired_keys)} expired cache items")
+            if removed:
+                print(f"🧹 Cleaned up {removed} expired cache items")
             
         except Exception as e:
             print(f"❌ Cache cleanup error: {e}")
@@ -196,33 +196,82 @@ class CacheManager:
 # Specialized cache classes for different types of data
 
 class AIResponseCache(CacheManager):
-    """Specialized cache for AI responses"""
+    """
+    Specialized cache for AI responses
+    
+    Only intents whose answers don't depend on the moment or the user's
+    position are cached, each for its own TTL. Emergency, medical, police,
+    location and weather answers are always generated fresh, and RAGService
+    only uses this cache for sessions without a location or chat history.
+    """
+    
+    namespace = 'ai_response'
+    
+    # Seconds a response stays valid per intent; unlisted intents are never cached
+    # (bot_capabilities is a static answer, so there is nothing to save; weather
+    # answers carry live alerts, which must not be replayed)
+    INTENT_TTLS = {
+        'information': 3600,
+        'city_services': 3600,
+        'multiple_questions': 1800,
+        'community': 1800,
+        'greeting': 3600,
+        'general': 600
+    }
+    
+    # Misspellings and shorthand folded together before keying
+    COMMON_TYPOS = {
+        'pothol': 'pothole', 'pothoel': 'pothole', 'pothold': 'pothole', 'potholle': 'pothole',
+        'wether': 'weather', 'weahter': 'weather', 'wheather': 'weather',
+        'emergancy': 'emergency', 'emergeny': 'emergency', 'emergecy': 'emergency',
+        'tornadoe': 'tornado', 'neighbourhood': 'neighborhood', 'neighborhod': 'neighborhood',
+        'garbadge': 'garbage', 'recylcing': 'recycling', 'recyling': 'recycling',
+        'adress': 'address', 'reprot': 'report', 'repot': 'report', 'informaton': 'information',
+        'pls': 'please', 'plz': 'please', 'u': 'you', 'r': 'are', 'ur': 'your',
+        'whats': 'what is', 'hows': 'how is', 'im': 'i am', 'dont': 'do not', 'cant': 'cannot'
+    }
     
     def __init__(self):
         super().__init__()
         self.default_ttl = 600  # 10 minutes for AI responses
     
-    def cache_ai_response(self, user_message: str, intent: str, response_data: Dict) -> str:
+    def normalize_message(self, user_message: str) -> str:
+        """Fold case, punctuation, whitespace and common typos"""
+        text = re.sub(r"['’]", '', (user_message or '').lower())
+        text = re.sub(r'[^\w\s]', ' ', text)
+        return ' '.join(self.COMMON_TYPOS.get(word, word) for word in text.split())
+    
+    def ttl_for_intent(self, intent: str) -> int:
+        """Seconds to cache a response for this intent (0 = don't cache)"""
+        return self.INTENT_TTLS.get(intent, 0)
+    
+    def _response_key(self, user_message: str, intent: str) -> str:
+        cache_data = {
+            'message_normalized': self.normalize_message(user_message),
+            'intent': intent
+        }
+        return self.get_cache_key(cache_data, f"ai_response:{intent}")  # Intent in the prefix for telemetry
+    
+    def cache_ai_response(self, user_message: str, intent: str, response_data: Dict,
+                          generation_time: float = 0.0) -> str:
         """Cache AI response with intelligent key generation"""
         try:
-            # Don't cache emergency responses
-            if response_data.get('emergency', False):
-                return None
+            ttl = self.ttl_for_intent(intent)
             
-            # Create cache key from message and intent
-            cache_data = {
-                'message_normalized': user_message.lower().strip(),
-                'intent': intent
-            }
+            # Don't cache emergency, map or fallback responses
+            if not ttl or response_data.get('emergency', False) or response_data.get('map_html') \
+                    or response_data.get('error'):
+                return None
             
-            cache_key = self.get_cache_key(cache_data, 'ai_response')
+            cache_key = self._response_key(user_message, intent)
             
             # Add metadata to cached response
             cached_data = response_data.copy()
             cached_data['cached_at'] = datetime.now().isoformat()
             cached_data['cache_key'] = cache_key
+            cached_data['generation_time'] = round(generation_time, 3)
             
-            self.set(cache_key, cached_data, ttl=self.default_ttl)
+            self.set(cache_key, cached_data, ttl=ttl)
             return cache_key
             
         except Exception as e:
@@ -232,28 +281,44 @@ class AIResponseCache(CacheManager):
     def get_ai_response(self, user_message: str, intent: str) -> Optional[Dict]:
         """Retrieve cached AI response"""
         try:
-            cache_data = {
-                'message_normalized': user_message.lower().strip(),
-                'intent': intent
-            }
+            if not self.ttl_for_intent(intent):
+                return None
             
-            cache_key = self.get_cache_key(cache_data, 'ai_response')
-            cached_response = self.get(cache_key)
+            cached_response = self.get(self._response_key(user_message, intent))
             
             if cached_response:
                 # Add cache hit indicator
+                cached_response = cached_response.copy()
                 cached_response['from_cache'] = True
-                print(f"✅ Cache hit for AI response: {intent}")
+                
+                self.record_served(key_label(cached_response['cache_key']), cached_response.get('generation_time', 0.0))
+                print(f"✅ Cache hit for AI response: {intent} "
+                      f"(saved ~{cached_response.get('generation_time', 0.0):.2f}s)")
             
             return cached_response
             
         except Exception as e:
             print(f"❌ AI response retrieval error: {e}")
             return None
+    
+    def record_served(self, label: str, generation_time: float):
+        """Count a response answered from cache (here or by the semantic cache) and the time it saved"""
+        self.telemetry.record(self.namespace, label, 'responses_served')
+        self.telemetry.record(self.namespace, label, 'seconds_saved', generation_time)
+    
+    def get_stats(self) -> Dict:
+        """Cache statistics plus the work saved by serving cached responses"""
+        stats = super().get_stats()
+        labels = self.telemetry.report(self.namespace)['caches'].get(self.namespace, {})
+        stats['responses_served'] = sum(row.get('responses_served', 0) for row in labels.values())
+        stats['seconds_saved'] = round(sum(row.get('seconds_saved', 0) for row in labels.values()), 2)
+        return stats
 
 class LocationCache(CacheManager):
     """Specialized cache for location data"""
     
+    namespace = 'location'
+    
     def __init__(self):
         super().__init__()
         self.default_ttl = 3600  # 1 hour for location data
@@ -285,18 +350,17 @@ class LocationCache(CacheManager):
 class WeatherCache(CacheManager):
     """Specialized cache for weather data"""
     
+    namespace = 'weather'
+    
     def __init__(self):
         super().__init__()
         self.default_ttl = 900  # 15 minutes for weather data
     
     def cache_weather_data(self, lat: float, lng: float, weather_data: Dict) -> str:
-        """Cache weather data for coordinates"""
+        """Cache weather data for the tile containing the coordinates"""
         try:
-            # Round coordinates to reduce cache fragmentation
-            lat_rounded = round(lat, 3)
-            lng_rounded = round(lng, 3)
-            
-            cache_key = self.get_cache_key(f"{lat_rounded},{lng_rounded}", 'weather')
+            # Everyone in the same weather tile shares the entry
+            cache_key = self.get_cache_key(geohash.tile_for(lat, lng, 'weather'), 'weather')
             
             cached_data = weather_data.copy()
             cached_data['cached_at'] = datetime.now().isoformat()
@@ -308,21 +372,97 @@ class WeatherCache(CacheManager):
             print(f"❌ Weather caching error: {e}")
             return None
     
-    def get_weather_data(self, lat: float, lng: float) -> Optional[Dict]:
-        """Retrieve cached weather data"""
+    def get_weather_data(self, lat: float, lng: float, use_neighbors: bool = True) -> Optional[Dict]:
+        """Retrieve cached weather data for the coordinates' tile, else the nearest neighboring tile"""
         try:
-            lat_rounded = round(lat, 3)
-            lng_rounded = round(lng, 3)
-            cache_key = self.get_cache_key(f"{lat_rounded},{lng_rounded}", 'weather')
-            return self.get(cache_key)
+            cached = self.get(self.get_cache_key(geohash.tile_for(lat, lng, 'weather'), 'weather'))
+            if cached is not None or not use_neighbors:
+                return cached
+            
+            # One uncounted batch lookup; the miss above is the only one recorded
+            keys = [self.get_cache_key(tile, 'weather') for tile in geohash.nearest_neighbors(lat, lng, 'weather')]
+            found = self.peek_many(keys)
+            return next((found[key] for key in keys if key in found), None)
         except Exception as e:
             print(f"❌ Weather retrieval error: {e}")
             return None
 
+class RetrievalCache(CacheManager):
+    """
+    Specialized cache for processed knowledge search results
+    
+    Keys include the collection version, which VectorService bumps on every
+    write and mirror resync, so results from before a change are never
+    served again; they simply age out.
+    """
+    
+    namespace = 'retrieval'
+    
+    def __init__(self):
+        super().__init__()
+        self.default_ttl = 300  # 5 minutes bounds staleness from other workers' writes
+        self.collection_version = 0
+    
+    def bump_version(self):
+        """Invalidate all cached results after a collection change"""
+        self.collection_version += 1
+    
+    def _results_key(self, query: str, intent: str, limit: int, scope: str = None) -> str:
+        normalized = re.sub(r'\s+', ' ', (query or '').lower()).strip(' ?!.,;:')
+        cache_data = {
+            'query_normalized': normalized,
+            'intent': intent,
+            'limit': limit,
+            'scope': scope,  # e.g. the geo filter key
+            'version': self.collection_version
+        }
+        return self.get_cache_key(cache_data, f"retrieval:{intent}")  # Intent in the prefix for telemetry
+    
+    def cache_results(self, query: str, intent: str, limit: int, results: Dict, scope: str = None) -> str:
+        """Cache a successful search_knowledge response"""
+        try:
+            if results.get('error'):
+                return None
+            
+            cache_key = self._results_key(query, intent, limit, scope)
+            self.set(cache_key, results, ttl=self.default_ttl)
+            return cache_key
+            
+        except Exception as e:
+            print(f"❌ Retrieval caching error: {e}")
+            return None
+    
+    def get_results(self, query: str, intent: str, limit: int, scope: str = None) -> Optional[Dict]:
+        """Retrieve cached search results for the current collection version"""
+        try:
+            cached = self.get(self._results_key(query, intent, limit, scope))
+            if cached is None:
+                return None
+            
+            response = cached.copy()
+            response['from_cache'] = True
+            return response
+            
+        except Exception as e:
+            print(f"❌ Retrieval cache error: {e}")
+            return None
+
+class FunctionResultCache(CacheManager):
+    """Results of service methods decorated with @cached (see cache_decorator)"""
+    
+    namespace = 'function'
+    
+    def __init__(self):
+        super().__init__()
+        self.default_ttl = 300
+        self.max_cache_size = 2000
+
 # Global cache instances
 ai_cache = None
 location_cache = None  
 weather_cache = None
+retrieval_cache = None
+function_cache = None
 
 def get_ai_cache():
     """Get global AI response cache instance"""
@@ -345,10 +485,64 @@ def get_weather_cache():
         weather_cache = WeatherCache()
     return weather_cache
 
+def get_retrieval_cache():
+    """Get global knowledge retrieval cache instance"""
+    global retrieval_cache
+    if retrieval_cache is None:
+        retrieval_cache = RetrievalCache()
+    return retrieval_cache
+
+def get_function_cache():
+    """Get global @cached function result cache instance"""
+    global function_cache
+    if function_cache is None:
+        function_cache = FunctionResultCache()
+    return function_cache
+
+def configure_caches(config):
+    """
+    Apply app config to the global caches (called once from create_app)
+    
+    CACHE_BACKEND moves the AI, location, weather and function result caches
+    to a store shared by all workers. The retrieval cache stays per process: its keys carry
+    this worker's collection version, which other workers don't share.
+    """
+    shared = (get_ai_cache(), get_location_cache(), get_weather_cache(), get_function_cache())
+    backend = config.get('CACHE_BACKEND', 'memory')
+    
+    geohash.TILE_PRECISIONS['weather'] = config.get('WEATHER_TILE_PRECISION', geohash.TILE_PRECISIONS['weather'])
+    geohash.TILE_PRECISIONS['places'] = config.get('PLACES_TILE_PRECISION', geohash.TILE_PRECISIONS['places'])
+    
+    for cache in shared + (get_retrieval_cache(),):
+        cache.max_cache_bytes = config.get('CACHE_MAX_BYTES', cache.max_cache_bytes)
+        
+        if backend != 'memory' and cache in shared:
+            cache.use_backend(create_cache_backend(
+                backend,
+                cache.namespace,
+                max_entries=cache.max_cache_size,
+                max_bytes=cache.max_cache_bytes,
+                sqlite_path=config.get('CACHE_SQLITE_PATH'),
+                redis_url=config.get('CACHE_REDIS_URL')
+            ))
+    
+    if backend != 'memory':
+        print(f"✅ Shared cache backend: {shared[0].backend.name}")
+    
+    from app.utils.semantic_cache import get_semantic_cache
+    get_semantic_cache(config.get('SEMANTIC_CACHE_SIZE'))
+
 def get_all_cache_stats() -> Dict:
     """Get statistics from all cache instances"""
+    from app.utils.cache_decorator import get_cached_function_stats
+    from app.utils.semantic_cache import get_semantic_cache
+    
     return {
         'ai_cache': get_ai_cache().get_stats(),
+        'semantic_cache': get_semantic_cache().get_stats(),
         'location_cache': get_location_cache().get_stats(),
-        'weather_cache': get_weather_cache().get_stats()
+        'weather_cache': get_weather_cache().get_stats(),
+        'retrieval_cache': get_retrieval_cache().get_stats(),
+        'function_cache': get_function_cache().get_stats(),
+        'cached_functions': get_cached_function_stats()
     }
\ No newline at end of file
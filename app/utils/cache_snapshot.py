@@ -0,0 +1,154 @@
+"""
+Cache Snapshots for SafeIndy Assistant
+Saves the in-memory caches to disk periodically and at shutdown, and
+restores unexpired entries at boot so a restart doesn't start cold
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Tuple
+
+from app.utils.cache_manager import get_function_cache, get_location_cache, get_weather_cache
+
+SNAPSHOT_VERSION = 2
+
+_started = False
+_restored = threading.Event()  # Set once the boot restore finished; saves wait for it
+
+def _snapshot_caches() -> Dict:
+    """
+    Caches worth carrying across restarts, by namespace
+
+    The AI response caches are left out, since answers may be shaped by one
+    user's session. So is the retrieval cache: its keys carry a collection
+    version that starts over in every process.
+    """
+    caches = (get_location_cache(), get_weather_cache(), get_function_cache())
+    return {cache.namespace: cache for cache in caches}
+
+def _read_entries(path: str) -> Iterator[Tuple[str, str, object, float]]:
+    """(namespace, key, value, expires_at) of a snapshot file, nothing if it is missing or from another version"""
+    if not os.path.exists(path):
+        return
+
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(f.readline() or '{}')
+        if header.get('version') != SNAPSHOT_VERSION:
+            print(f"⚠️ Ignoring cache snapshot with version {header.get('version')}")
+            return
+
+        for line in f:
+            try:
+                entry = json.loads(line)
+                yield entry['cache'], entry['key'], entry['value'], entry['expires_at']
+            except (ValueError, KeyError):
+                continue  # Torn or hand-edited line
+
+def save_snapshot(path: str) -> int:
+    """
+    Write live entries of the in-memory caches to path as JSON lines
+
+    Entries already in the file (e.g. saved by other workers) are kept
+    unless they expired or this worker has a newer copy, and the file is
+    replaced atomically through a per-worker temp file, so workers sharing
+    a path add to one snapshot instead of overwriting each other. Values
+    that aren't JSON-serializable are skipped.
+
+    Returns:
+        Number of entries saved (0 and no file written if there were none)
+    """
+    try:
+        now = time.time()
+        merged = {}  # (namespace, key) -> (value, expires_at), least recently used first
+        try:
+            for namespace, key, value, expires_at in _read_entries(path):
+                if expires_at > now:
+                    merged[(namespace, key)] = (value, expires_at)
+        except Exception as e:
+            print(f"⚠️ Could not merge existing cache snapshot: {e}")
+
+        own = 0
+        for namespace, cache in _snapshot_caches().items():
+            for key, value, expires_at in cache.backend.export_entries():
+                previous = merged.pop((namespace, key), None)
+                merged[(namespace, key)] = previous if previous and previous[1] > expires_at else (value, expires_at)
+                own += 1
+        if not own:
+            return 0  # Shared backends persist themselves; keep any older snapshot
+
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        saved = 0
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': SNAPSHOT_VERSION, 'saved_at': now}) + '\n')
+            for (namespace, key), (value, expires_at) in merged.items():
+                try:
+                    line = json.dumps({'cache': namespace, 'key': key, 'value': value, 'expires_at': expires_at})
+                except (TypeError, ValueError):
+                    continue
+                f.write(line + '\n')
+                saved += 1
+        os.replace(temp_path, path)
+
+        print(f"💾 Cache snapshot saved: {saved} entries")
+        return saved
+
+    except Exception as e:
+        print(f"❌ Cache snapshot save error: {e}")
+        return 0
+
+def restore_snapshot(path: str) -> int:
+    """
+    Load unexpired entries from a snapshot into the caches
+
+    Returns:
+        Number of entries restored
+    """
+    try:
+        caches = _snapshot_caches()
+        entries = {namespace: [] for namespace in caches}
+        for namespace, key, value, expires_at in _read_entries(path):
+            if namespace in entries:
+                entries[namespace].append((key, value, expires_at))
+
+        restored = sum(caches[namespace].backend.import_entries(items) for namespace, items in entries.items())
+        if restored:
+            print(f"✅ Cache snapshot restored: {restored} entries")
+        return restored
+
+    except Exception as e:
+        print(f"❌ Cache snapshot restore error: {e}")
+        return 0
+
+def _snapshot_loop(path: str, interval: int):
+    """Restore once, then save every interval seconds"""
+    try:
+        restore_snapshot(path)
+    finally:
+        _restored.set()
+
+    while interval > 0:
+        time.sleep(interval)
+        save_snapshot(path)
+
+def _save_on_exit(path: str):
+    # A snapshot taken before the restore finished would drop its entries
+    if _restored.is_set():
+        save_snapshot(path)
+
+def start_cache_snapshots(config):
+    """
+    Restore the last snapshot in the background and keep saving new ones
+    (called once from create_app; off unless CACHE_SNAPSHOT_PATH is set)
+    """
+    global _started
+    path = config.get('CACHE_SNAPSHOT_PATH')
+    if _started or not path:
+        return
+    _started = True
+
+    interval = config.get('CACHE_SNAPSHOT_INTERVAL', 300)
+    threading.Thread(target=_snapshot_loop, args=(path, interval), daemon=True).start()
+    atexit.register(_save_on_exit, path)
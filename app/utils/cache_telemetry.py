@@ -0,0 +1,126 @@
+"""
+Cache Telemetry for SafeIndy Assistant
+Hit, miss, eviction, byte and time-saved counters per cache key prefix and
+intent, cheap enough to record on every cache access
+"""
+
+import threading
+from typing import Dict
+
+def key_label(key: str) -> str:
+    """
+    Prefix of a cache key, e.g. 'ai_response:city_services' for
+    'ai_response:city_services_<hash>' (the part before ':' is the key
+    prefix, the part after it the intent, if any)
+    """
+    return key.rsplit('_', 1)[0]
+
+class CacheTelemetry:
+    """
+    Counters keyed by (cache, label, field)
+
+    Each thread increments its own dict, so recording never takes a lock or
+    contends with other threads; a thread's dict is registered once, on its
+    first event. Readers sum all the dicts. Dicts of threads that have
+    exited (one per request under a threaded server) are folded into a
+    single retired dict on every read and whenever registrations double,
+    so memory follows the number of live threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._thread_counters = []  # (thread, counters)
+        self._retired = {}  # Summed counters of exited threads
+        self._prune_at = 64
+        self._register_lock = threading.Lock()  # Only taken once per thread and by readers
+
+    def _counters(self) -> Dict:
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            counters = self._local.counters = {}
+            with self._register_lock:
+                self._thread_counters.append((threading.current_thread(), counters))
+                if len(self._thread_counters) >= self._prune_at:
+                    self._prune()
+                    self._prune_at = max(64, 2 * len(self._thread_counters))
+        return counters
+
+    def _prune(self):
+        """Fold the dicts of exited threads into the retired dict (caller holds the register lock)"""
+        live = []
+        for thread, counters in self._thread_counters:
+            if thread.is_alive():
+                live.append((thread, counters))
+                continue
+            for counter_key, value in counters.items():  # No more writers
+                self._retired[counter_key] = self._retired.get(counter_key, 0) + value
+        self._thread_counters = live
+
+    def record(self, cache: str, label: str, field: str, amount: float = 1):
+        """Add to a counter (lock-free)"""
+        counters = self._counters()
+        counter_key = (cache, label, field)
+        counters[counter_key] = counters.get(counter_key, 0) + amount
+
+    def record_key(self, cache: str, key: str, field: str, amount: float = 1):
+        """Add to a counter of the cache key's prefix"""
+        self.record(cache, key_label(key), field, amount)
+
+    def totals(self) -> Dict:
+        """Summed (cache, label, field) -> value across threads"""
+        with self._register_lock:
+            self._prune()
+            totals = dict(self._retired)
+            thread_counters = [counters for _, counters in self._thread_counters]
+
+        for counters in thread_counters:
+            while True:
+                try:
+                    items = list(counters.items())
+                    break
+                except RuntimeError:
+                    continue  # Its thread added a key mid-copy; try again
+            for counter_key, value in items:
+                totals[counter_key] = totals.get(counter_key, 0) + value
+        return totals
+
+    def report(self, cache: str = None) -> Dict:
+        """
+        Counters per cache and label, plus a rollup per intent
+
+        Returns:
+            {'caches': {cache: {label: counters}}, 'intents': {intent: counters}}
+        """
+        caches, intents = {}, {}
+        for (cache_name, label, field), value in self.totals().items():
+            if cache and cache_name != cache:
+                continue
+            row = caches.setdefault(cache_name, {}).setdefault(label, {})
+            row[field] = row.get(field, 0) + value
+
+            _, _, intent = label.partition(':')
+            if intent:
+                rollup = intents.setdefault(intent, {})
+                rollup[field] = rollup.get(field, 0) + value
+
+        for row in [row for labels in caches.values() for row in labels.values()] + list(intents.values()):
+            lookups = row.get('hits', 0) + row.get('misses', 0)
+            row['hit_rate'] = round(row.get('hits', 0) / lookups * 100, 2) if lookups else 0
+            if 'seconds_saved' in row:
+                row['seconds_saved'] = round(row['seconds_saved'], 3)
+
+        return {'caches': caches, 'intents': intents}
+
+    def reset(self):
+        """Zero every counter"""
+        with self._register_lock:
+            self._retired.clear()
+            for _, counters in self._thread_counters:
+                counters.clear()
+
+# Global telemetry instance
+_telemetry = CacheTelemetry()
+
+def get_cache_telemetry() -> CacheTelemetry:
+    """Get global cache telemetry instance"""
+    return _telemetry
@@ -0,0 +1,271 @@
+"""
+Contact Extractor for SafeIndy Assistant
+Parses phone numbers, addresses and facility names out of live search results
+into a small structured index keyed by category
+"""
+
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# 10-digit North American numbers: 317-327-3811, (317) 327-3811, 1-800-222-1222
+PHONE_PATTERN = re.compile(
+    r'(?<![\d-])(?:\+?1[\s.-]?)?\(?([2-9]\d{2})\)?[\s.-]?(\d{3})[\s.-]?(\d{4})(?![\d-])'
+)
+
+# Street addresses: "1701 N Senate Blvd, Indianapolis, IN 46202"
+ADDRESS_PATTERN = re.compile(
+    r"\b\d{1,5}\s+(?:[NSEW]\.?\s+)?(?:[A-Z0-9][\w.'-]*\s+){0,4}?"
+    r"(?:St|Street|Ave|Avenue|Blvd|Boulevard|Rd|Road|Dr|Drive|Ln|Lane|Way|Pkwy|Parkway|"
+    r"Ct|Court|Pl|Place|Pike|Hwy|Highway|Cir|Circle)\b\.?"
+    r"(?:,?\s+(?:Indianapolis|Speedway|Beech Grove|Lawrence)(?:,?\s+(?:IN|Indiana))?(?:\s+\d{5})?)?"
+)
+
+# Named facilities: "IU Health Methodist Hospital", "IMPD North District", "Mayor's Action Center"
+FACILITY_PATTERN = re.compile(
+    r"((?:[A-Z][\w'&.-]*\s+){1,6}"
+    r"(?:Hospital|Medical Center|Health Center|Clinic|Fire Station|Station(?:\s+\d+)?|District|"
+    r"Action Center|Center|Shelter|Food Bank|Department|Control))\b"
+)
+
+# Headings and filler words Perplexity likes to put in front of names
+NAME_NOISE = re.compile(r"^(?:The|For|Call|Contact|Visit|Main|Current|Emergency:?)\s+")
+
+class ContactExtractor:
+    """Turns free-form search text into contact records"""
+
+    def extract(self, text: str) -> List[Dict]:
+        """
+        Extract contact records from search result text
+
+        Each record is a dict with 'name', 'phones' and 'address'. A line
+        only becomes a record if it names a facility or carries a phone
+        number, so prose paragraphs are skipped.
+
+        Args:
+            text: Free-form search result text
+
+        Returns:
+            List of contact records in the order they appear
+        """
+        if not text or not isinstance(text, str):
+            return []
+
+        records = []
+        current = None
+
+        for raw_line in text.splitlines():
+            line = self._clean_line(raw_line)
+            if not line:
+                continue
+
+            name = self._extract_facility(line)
+            phones = self.extract_phones(line)
+            address = self._extract_address(line)
+
+            if name:
+                # A new facility starts a new record
+                current = {'name': name, 'phones': phones, 'address': address}
+                records.append(current)
+            elif current and (phones or address) and self._is_continuation(raw_line):
+                # Indented/bulleted detail lines belong to the facility above
+                for phone in phones:
+                    if phone not in current['phones']:
+                        current['phones'].append(phone)
+                if address and not current['address']:
+                    current['address'] = address
+            elif phones:
+                current = None
+                records.append({
+                    'name': self._label_from_line(line),
+                    'phones': phones,
+                    'address': address
+                })
+
+        return records
+
+    def extract_phones(self, text: str) -> List[str]:
+        """Extract normalized phone numbers (317-327-3811 / 1-800-222-1222)"""
+        phones = []
+        for area, exchange, number in PHONE_PATTERN.findall(text or ''):
+            phone = f"{area}-{exchange}-{number}"
+            if area.startswith('8') and area[1] == area[2]:
+                phone = f"1-{phone}"  # Toll-free numbers (800, 888, 877...)
+            if phone not in phones:
+                phones.append(phone)
+        return phones
+
+    def _extract_address(self, line: str) -> Optional[str]:
+        match = ADDRESS_PATTERN.search(line)
+        return match.group(0).strip(' ,.') if match else None
+
+    def _extract_facility(self, line: str) -> Optional[str]:
+        match = FACILITY_PATTERN.search(line)
+        if not match:
+            return None
+        name = NAME_NOISE.sub('', match.group(1).strip())
+        # Reject names that are really the start of an address
+        if not name or name[0].isdigit() or len(name) < 4:
+            return None
+        return name
+
+    def _label_from_line(self, line: str) -> str:
+        """
+        Use the text before the first phone number as the record label,
+        cut at the first ':' or where a street address starts
+        """
+        label = PHONE_PATTERN.split(line, maxsplit=1)[0].split(':', 1)[0]
+        address = ADDRESS_PATTERN.search(label)
+        if address:
+            label = label[:address.start()]
+        label = re.sub(r'[\s,:–—-]+$', '', label).strip()
+        return label[:80] or 'Contact'
+
+    def _clean_line(self, line: str) -> str:
+        """Strip markdown bullets, emphasis and citation markers"""
+        line = re.sub(r'\[\d+\]', '', line)
+        line = line.replace('**', '').replace('__', '')
+        # List numbers ("1.", "2)") go, street numbers ("1701 N Senate") stay
+        line = re.sub(r'^[\s\-*•#>]*(?:\d{1,2}[.)]\s+)?', '', line)
+        return line.strip()
+
+    def _is_continuation(self, raw_line: str) -> bool:
+        stripped = raw_line.lstrip()
+        return raw_line != stripped or stripped[:1] in ('-', '*', '•')
+
+class ContactIndex:
+    """
+    In-memory index of extracted contacts keyed by category
+
+    Categories follow the search service vocabulary ('medical', 'police',
+    'fire', 'city_services', ...). Records are merged by facility name so
+    repeated searches refresh entries instead of duplicating them.
+    """
+
+    def __init__(self, max_age: int = 86400, max_per_category: int = 50):
+        self.extractor = ContactExtractor()
+        self.index = {}  # category -> {name_key: record}
+        self.max_age = max_age  # Drop records not seen for a day
+        self.max_per_category = max_per_category
+        print("✅ Contact index initialized")
+
+    def index_text(self, category: str, text: str, source: str = None) -> List[Dict]:
+        """
+        Extract contacts from text and merge them into the index
+
+        Returns:
+            The records extracted from this text
+        """
+        try:
+            records = self.extractor.extract(text)
+            if not records:
+                return []
+
+            bucket = self.index.setdefault(category, {})
+            now = time.time()
+
+            for record in records:
+                key = self._name_key(record['name'])
+                existing = bucket.get(key)
+                if existing:
+                    for phone in record['phones']:
+                        if phone not in existing['phones']:
+                            existing['phones'].append(phone)
+                    existing['address'] = record['address'] or existing['address']
+                    existing['indexed_at'] = now
+                else:
+                    bucket[key] = {
+                        'name': record['name'],
+                        'phones': list(record['phones']),
+                        'address': record['address'],
+                        'category': category,
+                        'source': source or 'live_search',
+                        'indexed_at': now
+                    }
+
+            self._trim(bucket)
+            return records
+
+        except Exception as e:
+            print(f"❌ Contact indexing error: {e}")
+            return []
+
+    def get_contacts(self, category: str, limit: int = None) -> List[Dict]:
+        """Get fresh contacts for a category, most recently seen first"""
+        cutoff = time.time() - self.max_age
+        records = [r for r in self.index.get(category, {}).values() if r['indexed_at'] >= cutoff]
+        records.sort(key=lambda r: r['indexed_at'], reverse=True)
+        return records[:limit] if limit else records
+
+    def find(self, name_query: str, category: str = None) -> List[Dict]:
+        """Find contacts whose name contains every word of the query"""
+        words = self._name_key(name_query).split()
+        if not words:
+            return []
+
+        categories = [category] if category else list(self.index.keys())
+        matches = []
+        for cat in categories:
+            for record in self.get_contacts(cat):
+                key = self._name_key(record['name'])
+                if all(word in key for word in words):
+                    matches.append(record)
+        return matches
+
+    def find_phone(self, name_query: str, category: str = None) -> Optional[str]:
+        """Get the first known phone number for a named facility"""
+        for record in self.find(name_query, category):
+            if record['phones']:
+                return record['phones'][0]
+        return None
+
+    def format_facts(self, category: str, limit: int = 5) -> List[str]:
+        """Render a category's indexed contacts as compact one-line facts"""
+        return self.format_records(self.get_contacts(category, limit))
+
+    def format_records(self, records: List[Dict], limit: int = 5) -> List[str]:
+        """Render contact records (e.g. those of one search result) as compact one-line facts"""
+        facts = []
+        for record in records[:limit]:
+            parts = [record['name']]
+            if record['address']:
+                parts.append(record['address'])
+            if record['phones']:
+                parts.append(', '.join(record['phones']))
+            facts.append(' | '.join(parts))
+        return facts
+
+    def get_stats(self) -> Dict:
+        """Get index statistics"""
+        return {
+            'categories': {cat: len(bucket) for cat, bucket in self.index.items()},
+            'total_contacts': sum(len(bucket) for bucket in self.index.values()),
+            'max_age_seconds': self.max_age,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def clear(self):
+        """Clear all indexed contacts"""
+        self.index.clear()
+
+    def _trim(self, bucket: Dict):
+        """Keep only the most recently seen records per category"""
+        if len(bucket) <= self.max_per_category:
+            return
+        oldest = sorted(bucket, key=lambda k: bucket[k]['indexed_at'])
+        for key in oldest[:len(bucket) - self.max_per_category]:
+            del bucket[key]
+
+    def _name_key(self, name: str) -> str:
+        return re.sub(r'[^a-z0-9 ]', '', (name or '').lower()).strip()
+
+# Global contact index instance
+_contact_index = None
+
+def get_contact_index():
+    """Get global contact index instance"""
+    global _contact_index
+    if _contact_index is None:
+        _contact_index = ContactIndex()
+    return _contact_index
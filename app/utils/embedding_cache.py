@@ -0,0 +1,186 @@
+"""
+Embedding Cache for SafeIndy Assistant
+Bounded LRU cache for query embeddings with an optional on-disk store
+shared across worker processes
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings keyed by normalized text, model and input type
+
+    Vectors are stored as float32 arrays (4 KB for a 1024-dim embedding
+    instead of ~32 KB as a Python list of floats). When db_path is set,
+    misses fall through to a SQLite store in WAL mode so every gunicorn
+    worker on the host shares the same warm entries.
+    """
+
+    def __init__(self, max_size: int = 5000, db_path: str = None, disk_max_entries: int = 100000):
+        self.cache = OrderedDict()  # key -> np.ndarray(float32)
+        self.max_size = max_size
+        self.db_path = db_path
+        self.disk_max_entries = disk_max_entries
+        self.db = None
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.stats = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'total_requests': 0
+        }
+
+        if db_path:
+            self._open_disk_store()
+
+        print(f"✅ Embedding cache initialized (max {max_size} entries, disk: {bool(self.db)})")
+
+    def _open_disk_store(self):
+        """Open the shared SQLite store; fall back to memory-only on failure"""
+        try:
+            self.db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute('PRAGMA synchronous=NORMAL')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings ('
+                'key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)'
+            )
+            self.db.commit()
+        except Exception as e:
+            print(f"⚠️ Embedding disk cache unavailable ({self.db_path}): {e}")
+            self.db = None
+
+    def normalize_text(self, text: str) -> str:
+        """Normalize text so trivially different queries share an entry"""
+        text = (text or '').lower().strip()
+        text = re.sub(r'\s+', ' ', text)
+        return text.strip(' ?!.,;:')
+
+    def make_key(self, text: str, model: str, input_type: str) -> str:
+        """Build cache key from normalized text, model name and input type"""
+        raw = f"{model}|{input_type}|{self.normalize_text(text)}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, text: str, model: str, input_type: str) -> Optional[List[float]]:
+        """Get a cached embedding as a list of floats, or None on miss"""
+        key = self.make_key(text, model, input_type)
+
+        with self._lock:
+            self.stats['total_requests'] += 1
+
+            vector = self.cache.get(key)
+            if vector is not None:
+                self.cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return vector.tolist()
+
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._memory_set(key, vector)
+                self.stats['disk_hits'] += 1
+                return vector.tolist()
+
+            self.stats['misses'] += 1
+            return None
+
+    def set(self, text: str, model: str, input_type: str, embedding: List[float]) -> bool:
+        """Store an embedding in memory and, if enabled, on disk"""
+        try:
+            key = self.make_key(text, model, input_type)
+            vector = np.asarray(embedding, dtype=np.float32)
+
+            with self._lock:
+                self._memory_set(key, vector)
+                self._disk_set(key, vector)
+            return True
+
+        except Exception as e:
+            print(f"❌ Embedding cache set error: {e}")
+            return False
+
+    def _memory_set(self, key: str, vector: np.ndarray):
+        self.cache[key] = vector
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _disk_get(self, key: str) -> Optional[np.ndarray]:
+        if not self.db:
+            return None
+        try:
+            row = self.db.execute('SELECT vector FROM embeddings WHERE key = ?', (key,)).fetchone()
+            return np.frombuffer(row[0], dtype=np.float32).copy() if row else None
+        except Exception as e:
+            print(f"⚠️ Embedding disk cache read error: {e}")
+            return None
+
+    def _disk_set(self, key: str, vector: np.ndarray):
+        if not self.db:
+            return
+        try:
+            self.db.execute(
+                'INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)',
+                (key, vector.tobytes(), time.time())
+            )
+            self.db.commit()
+
+            # Prune the oldest rows every few hundred writes
+            self._disk_writes += 1
+            if self._disk_writes % 500 == 0:
+                self._prune_disk()
+        except Exception as e:
+            print(f"⚠️ Embedding disk cache write error: {e}")
+
+    def _prune_disk(self):
+        self.db.execute(
+            'DELETE FROM embeddings WHERE key IN ('
+            'SELECT key FROM embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+            (self.disk_max_entries,)
+        )
+        self.db.commit()
+
+    def clear(self):
+        """Clear in-memory entries and reset statistics (disk store is kept)"""
+        with self._lock:
+            self.cache.clear()
+            for stat in self.stats:
+                self.stats[stat] = 0
+
+    def get_stats(self) -> Dict:
+        """Get embedding cache statistics"""
+        total = self.stats['total_requests']
+        hit_rate = ((self.stats['hits'] + self.stats['disk_hits']) / total * 100) if total else 0
+
+        return {
+            'cache_size': len(self.cache),
+            'max_size': self.max_size,
+            'hit_rate': round(hit_rate, 2),
+            'total_requests': total,
+            'hits': self.stats['hits'],
+            'disk_hits': self.stats['disk_hits'],
+            'misses': self.stats['misses'],
+            'evictions': self.stats['evictions'],
+            'memory_bytes': sum(vector.nbytes for vector in self.cache.values()),
+            'disk_enabled': self.db is not None
+        }
+
+# Global embedding cache instance
+_embedding_cache = None
+
+def get_embedding_cache(max_size: int = None, db_path: str = None):
+    """Get global embedding cache instance (settings apply on first call)"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(max_size=max_size or 5000, db_path=db_path)
+    return _embedding_cache
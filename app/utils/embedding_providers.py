@@ -0,0 +1,89 @@
+"""
+Embedding Providers for SafeIndy Assistant
+Pluggable text embedders: Cohere over the network, or a NumPy feature-hashing
+embedder that needs no network or API key
+"""
+
+import re
+import zlib
+from typing import List
+
+import numpy as np
+
+class EmbeddingProvider:
+    """
+    Interface for embedding backends
+
+    Attributes:
+        name: Model identifier (part of embedding cache keys)
+        dimensions: Length of every returned vector
+        remote: True if embed() calls a network API (cached, cooled down on failure)
+    """
+
+    name = 'base'
+    dimensions = 0
+    remote = False
+
+    def embed(self, texts: List[str], input_type: str = 'search_document') -> List[List[float]]:
+        """Embed texts in one call; raise on failure"""
+        raise NotImplementedError
+
+class CohereEmbeddingProvider(EmbeddingProvider):
+    """Cohere embed API (input_type separates queries from documents)"""
+
+    remote = True
+
+    def __init__(self, client, model: str = 'embed-english-v3.0', dimensions: int = 1024):
+        self.client = client
+        self.name = model
+        self.dimensions = dimensions
+
+    def embed(self, texts: List[str], input_type: str = 'search_document') -> List[List[float]]:
+        response = self.client.embed(
+            texts=texts,
+            model=self.name,
+            input_type=input_type
+        )
+        return [list(embedding) for embedding in response.embeddings]
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Feature-hashed bag of words and character n-grams
+
+    Each word and each character n-gram of each word is hashed (crc32) to a
+    signed bucket; the vector is L2-normalized so cosine similarity works as
+    with model embeddings. Character n-grams give some robustness to typos
+    and word forms. Deterministic across processes, so vectors stored by one
+    worker match queries embedded by another.
+    """
+
+    def __init__(self, dimensions: int = 512, ngram_range: tuple = (3, 5)):
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+        self.name = f"hashing-{dimensions}-{ngram_range[0]}{ngram_range[1]}"
+
+    def embed(self, texts: List[str], input_type: str = 'search_document') -> List[List[float]]:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            buckets, weights = [], []
+            for feature, weight in self._features(text):
+                hashed = zlib.crc32(feature.encode())
+                buckets.append(hashed % self.dimensions)
+                weights.append(weight if hashed & 0x80000000 else -weight)
+            if buckets:
+                np.add.at(matrix[row], buckets, weights)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+    def _features(self, text: str):
+        """Yield (feature, weight): whole words weigh more than their n-grams"""
+        low, high = self.ngram_range
+        for word in re.findall(r'[a-z0-9]+', (text or '').lower()):
+            yield f"w:{word}", 1.0
+            padded = f" {word} "
+            for n in range(low, min(high, len(padded)) + 1):
+                for start in range(len(padded) - n + 1):
+                    yield f"c:{padded[start:start + n]}", 0.3
@@ -0,0 +1,92 @@
+"""
+Geo Filter for SafeIndy Assistant
+Radius or bounding-box restriction for knowledge search, applied the same way
+by Qdrant and by the in-process indexes
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+def extract_point(location: Dict) -> Optional[tuple]:
+    """
+    Get (lat, lng) from the location shapes used across the app
+
+    Accepts {'lat', 'lng'}, {'lat', 'lon'}, {'latitude', 'longitude'} and the
+    validator's {'coordinates': {'lat', 'lng'}}.
+    """
+    if not isinstance(location, dict):
+        return None
+    if isinstance(location.get('coordinates'), dict):
+        location = location['coordinates']
+
+    lat = location.get('lat', location.get('latitude'))
+    lng = location.get('lng', location.get('lon', location.get('longitude')))
+    try:
+        return float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+
+class GeoFilter:
+    """
+    Keeps entries near a point (radius) or inside a box
+
+    Entries without a location are city-wide and always pass, so general
+    knowledge still answers local questions.
+    """
+
+    def __init__(self, lat: float = None, lng: float = None, radius_km: float = None,
+                 bounding_box: Dict = None):
+        self.lat = lat
+        self.lng = lng
+        self.radius_km = radius_km
+        self.bounding_box = bounding_box  # {'north', 'south', 'east', 'west'}
+
+    @classmethod
+    def from_location(cls, location: Dict, radius_km: float) -> Optional['GeoFilter']:
+        """Radius filter around a session location, or None if it has no coordinates"""
+        point = extract_point(location)
+        if not point or not radius_km:
+            return None
+        return cls(lat=point[0], lng=point[1], radius_km=radius_km)
+
+    def cache_key(self) -> str:
+        """Stable key (~100 m precision) for result caching"""
+        if self.bounding_box:
+            box = self.bounding_box
+            return f"box:{box['north']:.3f},{box['south']:.3f},{box['east']:.3f},{box['west']:.3f}"
+        return f"radius:{self.lat:.3f},{self.lng:.3f},{self.radius_km}"
+
+    def matches(self, payload: Dict) -> bool:
+        """Check one payload's 'location' ({'lat', 'lon'})"""
+        point = extract_point(payload.get('location'))
+        if point is None:
+            return True
+
+        lat, lng = point
+        if self.bounding_box:
+            box = self.bounding_box
+            return box['south'] <= lat <= box['north'] and box['west'] <= lng <= box['east']
+        return haversine_km(self.lat, self.lng, lat, lng) <= self.radius_km
+
+    def mask(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """Vectorized matches() over coordinate arrays (NaN = no location)"""
+        missing = np.isnan(lats)
+        if self.bounding_box:
+            box = self.bounding_box
+            inside = (lats >= box['south']) & (lats <= box['north']) & (lngs >= box['west']) & (lngs <= box['east'])
+        else:
+            lat1, lng1 = math.radians(self.lat), math.radians(self.lng)
+            lat2, lng2 = np.radians(lats), np.radians(lngs)
+            a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+            inside = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0))) <= self.radius_km
+        return missing | inside
@@ -0,0 +1,89 @@
+"""
+Geohash Tiles for SafeIndy Assistant
+Grid tiles for spatial cache keys: nearby points share a tile, and a tile's
+eight neighbors cover requests near its edges
+"""
+
+from typing import Dict, List, Tuple
+
+from .geo_filter import haversine_km
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Data type -> geohash precision. 5 is a ~4.9 x 4.9 km tile, 6 is ~1.2 x 0.6 km.
+TILE_PRECISIONS = {
+    'weather': 5,  # Conditions are uniform across a few km
+    'places': 6  # Nearest-hospital lists change across town
+}
+
+def encode(lat: float, lng: float, precision: int) -> str:
+    """Geohash of a point"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(chars) < precision:
+        value, value_range = (lng, lng_range) if even else (lat, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits <<= 1
+            value_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return ''.join(chars)
+
+def bounds(geohash: str) -> Dict:
+    """Tile edges as {'south', 'north', 'west', 'east'}"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lng_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if (value >> shift) & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+
+    return {'south': lat_range[0], 'north': lat_range[1], 'west': lng_range[0], 'east': lng_range[1]}
+
+def center(geohash: str) -> Tuple[float, float]:
+    """(lat, lng) of the tile center"""
+    box = bounds(geohash)
+    return (box['south'] + box['north']) / 2, (box['west'] + box['east']) / 2
+
+def neighbors(geohash: str) -> List[str]:
+    """The eight surrounding tiles (fewer at the poles)"""
+    box = bounds(geohash)
+    lat, lng = center(geohash)
+    height = box['north'] - box['south']
+    width = box['east'] - box['west']
+
+    tiles = []
+    for d_lat in (-1, 0, 1):
+        for d_lng in (-1, 0, 1):
+            n_lat = lat + d_lat * height
+            if (d_lat or d_lng) and -90 < n_lat < 90:
+                n_lng = (lng + d_lng * width + 180) % 360 - 180
+                tiles.append(encode(n_lat, n_lng, len(geohash)))
+    return tiles
+
+def tile_for(lat: float, lng: float, kind: str) -> str:
+    """Tile of a point at the precision configured for a data type"""
+    return encode(lat, lng, TILE_PRECISIONS[kind])
+
+def nearest_neighbors(lat: float, lng: float, kind: str) -> List[str]:
+    """Neighbors of a point's tile, closest tile center first"""
+    return sorted(neighbors(tile_for(lat, lng, kind)),
+                  key=lambda tile: haversine_km(lat, lng, *center(tile)))
@@ -0,0 +1,278 @@
+"""
+Local Vector Index for SafeIndy Assistant
+In-process NumPy mirror of the Qdrant knowledge collection for fallback and
+low-latency retrieval
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .geo_filter import extract_point
+
+class LocalVectorIndex:
+    """
+    Float32 matrix of L2-normalized vectors with parallel payloads
+
+    Cosine similarity is a single matrix-vector product over the filled
+    rows. Each category gets a boolean bitmap over the rows so the intent
+    filter is a mask instead of a scan over payload dicts. Rows are
+    append-only: the arrays double when full, an upsert appends the new row
+    and clears the old row's bits, and a removal only clears bits, so a
+    write costs O(batch) and searches never see a half-written row. Cleared
+    rows are compacted away once they outnumber the live ones.
+    """
+
+    def __init__(self, dimensions: int = 1024, sync_interval: int = 300):
+        self.dimensions = dimensions
+        self.sync_interval = sync_interval  # Seconds between Qdrant syncs
+        self.matrix = np.zeros((0, dimensions), dtype=np.float32)  # Capacity rows, the first count filled
+        self.count = 0  # Filled rows, live or cleared
+        self.ids = []  # Point id per filled row
+        self.payloads = []  # Payload per filled row
+        self.rows = {}  # Point id -> its live row
+        self.live = np.zeros(0, dtype=bool)
+        self.category_bitmaps = {}  # category -> np.ndarray(bool), set for live rows only
+        self.coordinates = np.zeros((2, 0))  # Row lats/lngs, NaN where no location
+        self.last_synced = 0
+        self._lock = threading.Lock()  # Guards publishing/reading the arrays
+        self._write_lock = threading.Lock()  # Serializes incremental writers
+
+    @property
+    def size(self) -> int:
+        return len(self.rows)
+
+    def is_ready(self) -> bool:
+        """True once the index holds at least one vector"""
+        return self.size > 0
+
+    def needs_sync(self) -> bool:
+        """True when the mirror is older than the sync interval"""
+        return time.time() - self.last_synced > self.sync_interval
+
+    def live_points(self) -> Tuple[List, List[Dict]]:
+        """(ids, payloads) of the live rows, in row order"""
+        with self._lock:
+            count, live, ids, payloads = self.count, self.live, self.ids, self.payloads
+        rows = np.flatnonzero(live[:count])
+        return [ids[i] for i in rows], [payloads[i] for i in rows]
+
+    def load(self, ids: List, vectors: List[List[float]], payloads: List[Dict]):
+        """Replace the whole index with the given points"""
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions))
+        with self._write_lock:
+            self._swap(list(ids), matrix, list(payloads))
+
+    def sync_from_qdrant(self, client, collection_name: str, batch_size: int = 256) -> int:
+        """
+        Mirror the full collection from Qdrant using scroll
+
+        Returns:
+            Number of points mirrored (0 and the old index kept on failure)
+        """
+        try:
+            ids, vectors, payloads = [], [], []
+            offset = None
+
+            while True:
+                points, offset = client.scroll(
+                    collection_name=collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True
+                )
+                for point in points:
+                    ids.append(point.id)
+                    vectors.append(point.vector)
+                    payloads.append(point.payload or {})
+                if offset is None:
+                    break
+
+            self.load(ids, vectors, payloads)
+            print(f"✅ Local vector index synced: {len(ids)} points")
+            return len(ids)
+
+        except Exception as e:
+            print(f"❌ Local vector index sync error: {e}")
+            return 0
+
+    def upsert(self, ids: List, vectors: List[List[float]], payloads: List[Dict]):
+        """Insert or replace points without a full resync (amortized O(batch))"""
+        new_rows = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions))
+
+        # Later duplicates of an id in the batch win
+        last = {point_id: i for i, point_id in enumerate(ids)}
+        keep = sorted(last.values())
+        ids = [ids[i] for i in keep]
+        payloads = [payloads[i] for i in keep]
+        new_rows = new_rows[keep]
+
+        with self._write_lock:
+            start, end = self.count, self.count + len(ids)
+            if end > len(self.matrix):
+                self._grow(end)
+
+            # Rows past count are invisible to searches until count is published
+            self.matrix[start:end] = new_rows
+            self.live[start:end] = True
+            for row, payload in enumerate(payloads, start):
+                category = payload.get('category', 'general')
+                if category not in self.category_bitmaps:
+                    self.category_bitmaps[category] = np.zeros(len(self.matrix), dtype=bool)
+                self.category_bitmaps[category][row] = True
+                point = extract_point(payload.get('location'))
+                self.coordinates[:, row] = point if point else np.nan
+            self.ids.extend(ids)
+            self.payloads.extend(payloads)
+
+            replaced = [self.rows[point_id] for point_id in ids if point_id in self.rows]
+            self.rows.update(zip(ids, range(start, end)))
+            with self._lock:
+                self.count = end
+                self._clear_rows(replaced)
+
+            self._maybe_compact()
+
+    def remove(self, ids: List):
+        """Remove points by id"""
+        with self._write_lock:
+            removed = [self.rows.pop(point_id) for point_id in ids if point_id in self.rows]
+            with self._lock:
+                self._clear_rows(removed)
+            self._maybe_compact()
+
+    def search(self, query_vector: List[float], category: str = None, limit: int = 5,
+               geo=None) -> List[Tuple[float, Dict]]:
+        """
+        Vectorized cosine search
+
+        Args:
+            geo: Optional GeoFilter, applied as a mask like the category bitmap
+
+        Returns:
+            List of (score, payload) tuples, best first
+        """
+        with self._lock:
+            count, matrix, payloads, live = self.count, self.matrix, self.payloads, self.live
+            bitmaps, coordinates = self.category_bitmaps, self.coordinates
+        if not count:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []  # Zero vectors (embedding failures) match nothing meaningfully
+
+        scores = matrix[:count] @ (query / norm)
+
+        # Category bitmaps only have live rows set
+        mask = bitmaps.get(category) if category else live
+        if mask is None:
+            return []
+        scores = np.where(mask[:count], scores, -np.inf)
+
+        if geo is not None:
+            scores = np.where(geo.mask(coordinates[0, :count], coordinates[1, :count]), scores, -np.inf)
+
+        limit = min(limit, count)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        return [(float(scores[i]), payloads[i]) for i in top if np.isfinite(scores[i])]
+
+    def get_stats(self) -> Dict:
+        """Get index statistics"""
+        with self._lock:
+            count, bitmaps = self.count, dict(self.category_bitmaps)
+        return {
+            'points': self.size,
+            'rows': count,  # Including cleared rows awaiting compaction
+            'capacity': len(self.matrix),
+            'dimensions': self.dimensions,
+            'memory_bytes': int(self.matrix.nbytes),
+            'categories': {cat: int(mask[:count].sum()) for cat, mask in bitmaps.items() if mask[:count].any()},
+            'last_synced': datetime.fromtimestamp(self.last_synced).isoformat() if self.last_synced else None
+        }
+
+    def _grow(self, needed: int):
+        """Reallocate the arrays with at least double the capacity (caller holds the write lock)"""
+        capacity = max(needed, 2 * len(self.matrix), 64)
+        count = self.count
+
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[:count] = self.matrix[:count]
+        live = np.zeros(capacity, dtype=bool)
+        live[:count] = self.live[:count]
+        coordinates = np.full((2, capacity), np.nan)
+        coordinates[:, :count] = self.coordinates[:, :count]
+        bitmaps = {}
+        for category, mask in self.category_bitmaps.items():
+            bitmaps[category] = np.zeros(capacity, dtype=bool)
+            bitmaps[category][:count] = mask[:count]
+
+        # Searches holding the old arrays keep a consistent view of their rows
+        with self._lock:
+            self.matrix, self.live, self.coordinates, self.category_bitmaps = matrix, live, coordinates, bitmaps
+
+    def _clear_rows(self, rows: List[int]):
+        """Hide rows from searches (caller holds both locks)"""
+        for row in rows:
+            self.live[row] = False
+            self.category_bitmaps[self.payloads[row].get('category', 'general')][row] = False
+
+    def _maybe_compact(self):
+        """Rebuild from the live rows once cleared rows outnumber them (caller holds the write lock)"""
+        cleared = self.count - self.size
+        if cleared > max(self.size, 64):
+            rows = np.flatnonzero(self.live[:self.count])
+            ids = [self.ids[i] for i in rows]
+            payloads = [self.payloads[i] for i in rows]
+            self._swap(ids, self.matrix[rows], payloads, keep_sync_time=True, capacity=len(self.matrix))
+
+    def _swap(self, ids: List, matrix: np.ndarray, payloads: List[Dict], keep_sync_time: bool = False,
+              capacity: int = None):
+        """
+        Build category bitmaps and publish new arrays in one step
+
+        Args:
+            capacity: Rows to allocate (default: exactly the given points)
+        """
+        capacity = max(capacity or 0, len(ids))
+        bitmaps = {}
+        for i, payload in enumerate(payloads):
+            category = payload.get('category', 'general')
+            if category not in bitmaps:
+                bitmaps[category] = np.zeros(capacity, dtype=bool)
+            bitmaps[category][i] = True
+
+        coordinates = np.full((2, capacity), np.nan)
+        for i, payload in enumerate(payloads):
+            point = extract_point(payload.get('location'))
+            if point:
+                coordinates[:, i] = point
+
+        padded = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        padded[:len(ids)] = matrix
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(ids)] = True
+
+        with self._lock:
+            self.matrix = padded
+            self.count = len(ids)
+            self.ids = ids
+            self.payloads = payloads
+            self.rows = {point_id: row for row, point_id in enumerate(ids)}
+            self.live = live
+            self.category_bitmaps = bitmaps
+            self.coordinates = coordinates
+            if not keep_sync_time:
+                self.last_synced = time.time()
+
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
@@ -3,6 +3,7 @@ Rate Limiter for SafeIndy Assistant
 Prevents abuse and manages API usage limits
 """
 
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
@@ -15,6 +16,7 @@ class RateLimiter:
         self.requests = defaultdict(deque)  # Track requests per identifier
         self.blocked_ips = {}  # Temporarily blocked IPs
         self.request_counts = defaultdict(int)  # Total request counts
+        self._lock = threading.RLock()  # Guards the dicts above across request threads
         
         # Rate limiting rules
         self.rules = {
@@ -72,54 +74,55 @@ class RateLimiter:
             if identifier is None:
                 identifier = self.get_client_identifier()
             
-            # Check if IP is currently blocked
-            if self._is_blocked(identifier):
-                return False, self._get_block_info(identifier)
-            
-            # Get rate limiting rule
-            if rule_name not in self.rules:
-                return True, {'error': f'Unknown rule: {rule_name}'}
-            
-            rule = self.rules[rule_name]
-            current_time = time.time()
-            window_start = current_time - rule['window']
-            
-            # Get request history for this identifier and rule
-            key = f"{identifier}_{rule_name}"
-            request_times = self.requests[key]
-            
-            # Remove old requests outside the window
-            while request_times and request_times[0] < window_start:
-                request_times.popleft()
-            
-            # Check if limit exceeded
-            if len(request_times) >= rule['limit']:
-                self._block_client(identifier, rule_name, rule['block_duration'])
+            with self._lock:
+                # Check if IP is currently blocked
+                if self._is_blocked(identifier):
+                    return False, self._get_block_info(identifier)
+                
+                # Get rate limiting rule
+                if rule_name not in self.rules:
+                    return True, {'error': f'Unknown rule: {rule_name}'}
+                
+                rule = self.rules[rule_name]
+                current_time = time.time()
+                window_start = current_time - rule['window']
                 
-                return False, {
-                    'rate_limited': True,
+                # Get request history for this identifier and rule
+                key = f"{identifier}_{rule_name}"
+                request_times = self.requests[key]
+                
+                # Remove old requests outside the window
+                while request_times and request_times[0] < window_start:
+                    request_times.popleft()
+                
+                # Check if limit exceeded
+                if len(request_times) >= rule['limit']:
+                    self._block_client(identifier, rule_name, rule['block_duration'])
+                
+                    return False, {
+                        'rate_limited': True,
+                        'rule': rule_name,
+                        'limit': rule['limit'],
+                        'window_seconds': rule['window'],
+                        'retry_after': rule['block_duration'],
+                        'requests_made': len(request_times),
+                        'window_reset': window_start + rule['window']
+                    }
+                
+                # Request is allowed
+                request_times.append(current_time)
+                self.request_counts[key] += 1
+                
+                return True, {
+                    'rate_limited': False,
                     'rule': rule_name,
                     'limit': rule['limit'],
                     'window_seconds': rule['window'],
-                    'retry_after': rule['block_duration'],
                     'requests_made': len(request_times),
+                    'requests_remaining': rule['limit'] - len(request_times),
                     'window_reset': window_start + rule['window']
                 }
             
-            # Request is allowed
-            request_times.append(current_time)
-            self.request_counts[key] += 1
-            
-            return True, {
-                'rate_limited': False,
-                'rule': rule_name,
-                'limit': rule['limit'],
-                'window_seconds': rule['window'],
-                'requests_made': len(request_times),
-                'requests_remaining': rule['limit'] - len(request_times),
-                'window_reset': window_start + rule['window']
-            }
-            
         except Exception as e:
             print(f"❌ Rate limit check error: {e}")
             # Allow request if rate limiter fails
@@ -133,33 +136,36 @@ class RateLimiter:
             
             # This is called by is_allowed, but can be used independently
             key = f"{identifier}_{rule_name}"
-            self.requests[key].append(time.time())
-            self.request_counts[key] += 1
+            with self._lock:
+                self.requests[key].append(time.time())
+                self.request_counts[key] += 1
             
         except Exception as e:
             print(f"❌ Request recording error: {e}")
     
     def _is_blocked(self, identifier: str) -> bool:
         """Check if identifier is currently blocked"""
-        if identifier not in self.blocked_ips:
-            return False
-        
-        block_info = self.blocked_ips[identifier]
-        if time.time() > block_info['expires_at']:
-            del self.blocked_ips[identifier]
-            return False
-        
-        return True
+        with self._lock:
+            block_info = self.blocked_ips.get(identifier)
+            if block_info is None:
+                return False
+            
+            if time.time() > block_info['expires_at']:
+                del self.blocked_ips[identifier]
+                return False
+            
+            return True
     
     def _block_client(self, identifier: str, rule_name: str, duration: int):
         """Block a client for specified duration"""
         try:
-            self.blocked_ips[identifier] = {
-                'blocked_at': time.time(),
-                'expires_at': time.time() + duration,
-                'rule': rule_name,
-                'duration': duration
-            }
+            with self._lock:
+                self.blocked_ips[identifier] = {
+                    'blocked_at': time.time(),
+                    'expires_at': time.time() + duration,
+                    'rule': rule_name,
+                    'duration': duration
+                }
             
             print(f"🚫 Blocked client {identifier[:8]} for {duration}s (rule: {rule_name})")
             
@@ -168,10 +174,10 @@ class RateLimiter:
     
     def _get_block_info(self, identifier: str) -> Dict:
         """Get information about why client is blocked"""
-        if identifier not in self.blocked_ips:
+        block_info = self.blocked_ips.get(identifier)
+        if block_info is None:
             return {}
         
-        block_info = self.blocked_ips[identifier]
         remaining_time = max(0, block_info['expires_at'] - time.time())
         
         return {
@@ -186,8 +192,9 @@ class RateLimiter:
     def unblock_client(self, identifier: str) -> bool:
         """Manually unblock a client"""
         try:
-            if identifier in self.blocked_ips:
-                del self.blocked_ips[identifier]
+            with self._lock:
+                removed = self.blocked_ips.pop(identifier, None)
+            if removed is not None:
                 print(f"✅ Unblocked client {identifier[:8]}")
                 return True
             return False
@@ -214,7 +221,9 @@ class RateLimiter:
             # Get stats for each rule
             for rule_name, rule in self.rules.items():
                 key = f"{identifier}_{rule_name}"
-                request_times = self.requests[key]
+                with self._lock:
+                    request_times = list(self.requests.get(key, ()))
+                    total_requests = self.request_counts.get(key, 0)
                 
                 # Count requests in current window
                 current_time = time.time()
@@ -226,7 +235,7 @@ class RateLimiter:
                     'window_seconds': rule['window'],
                     'requests_in_window': len(recent_requests),
                     'requests_remaining': max(0, rule['limit'] - len(recent_requests)),
-                    'total_requests': self.request_counts[key],
+                    'total_requests': total_requests,
                     'next_reset': window_start + rule['window']
                 }
             
@@ -239,21 +248,24 @@ class RateLimiter:
         """Get global rate limiting statistics"""
         try:
             current_time = time.time()
+            with self._lock:
+                blocks = list(self.blocked_ips.values())
+                request_counts = list(self.request_counts.items())
             
             # Count active blocks
-            active_blocks = sum(1 for block_info in self.blocked_ips.values() 
+            active_blocks = sum(1 for block_info in blocks 
                               if block_info['expires_at'] > current_time)
             
             # Count total requests per rule
             rule_totals = defaultdict(int)
-            for key, count in self.request_counts.items():
+            for key, count in request_counts:
                 if '_' in key:
                     rule_name = key.split('_', 1)[1]
                     rule_totals[rule_name] += count
             
             return {
                 'active_blocks': active_blocks,
-                'total_blocked_clients': len(self.blocked_ips),
+                'total_blocked_clients': len(blocks),
                 'total_requests_by_rule': dict(rule_totals),
                 'rules_configured': list(self.rules.keys()),
                 'rate_limiter_uptime': 'Active'
@@ -268,33 +280,34 @@ class RateLimiter:
             current_time = time.time()
             cleanup_count = 0
             
-            # Clean up old requests (keep only last 24 hours)
-            cutoff_time = current_time - 86400  # 24 hours
-            
-            for key in list(self.requests.keys()):
-                request_times = self.requests[key]
-                original_length = len(request_times)
+            with self._lock:
+                # Clean up old requests (keep only last 24 hours)
+                cutoff_time = current_time - 86400  # 24 hours
                 
-                # Remove old requests
-                while request_times and request_times[0] < cutoff_time:
-                    request_times.popleft()
+                for key in list(self.requests.keys()):
+                    request_times = self.requests[key]
+                    original_length = len(request_times)
                 
-                # Remove empty deques
-                if not request_times:
-                    del self.requests[key]
-                    if key in self.request_counts:
-                        del self.request_counts[key]
+                    # Remove old requests
+                    while request_times and request_times[0] < cutoff_time:
+                        request_times.popleft()
                 
-                cleanup_count += original_length - len(request_times)
-            
-            # Clean up expired blocks
-            expired_blocks = []
-            for identifier, block_info in self.blocked_ips.items():
-                if current_time > block_info['expires_at']:
-                    expired_blocks.append(identifier)
-            
-            for identifier in expired_blocks:
-                del self.blocked_ips[identifier]
+                    # Remove empty deques
+                    if not request_times:
+                        del self.requests[key]
+                        if key in self.request_counts:
+                            del self.request_counts[key]
+                
+                    cleanup_count += original_length - len(request_times)
+                
+                # Clean up expired blocks
+                expired_blocks = []
+                for identifier, block_info in self.blocked_ips.items():
+                    if current_time > block_info['expires_at']:
+                        expired_blocks.append(identifier)
+                
+                for identifier in expired_blocks:
+                    del self.blocked_ips[identifier]
             
             if cleanup_count > 0 or expired_blocks:
                 print(f"🧹 Rate limiter cleanup: {cleanup_count} old requests, {len(expired_blocks)} expired blocks")
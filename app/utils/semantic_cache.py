@@ -0,0 +1,171 @@
+"""
+Semantic Response Cache for SafeIndy Assistant
+Reuses past chat answers for paraphrased questions by comparing query
+embeddings
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .cache_telemetry import get_cache_telemetry
+
+class SemanticResponseCache:
+    """
+    Fixed-capacity float32 matrix of L2-normalized query embeddings with the
+    answers given to them
+
+    A lookup is one matrix-vector product masked to live rows of the same
+    intent; the best row is reused only if its cosine similarity clears that
+    intent's threshold. Intents without a threshold are never cached. When
+    full, a new entry replaces the one closest to expiry (expired rows first).
+    """
+
+    # Minimum cosine similarity to reuse an answer, per intent. Broad FAQ
+    # intents tolerate looser paraphrases than open-ended ones. Weather
+    # answers carry live alerts and are never reused.
+    INTENT_THRESHOLDS = {
+        'greeting': 0.90,
+        'city_services': 0.92,
+        'information': 0.93,
+        'community': 0.94,
+        'general': 0.95
+    }
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self.model = None  # Embedding model the rows came from
+        self.matrix = None  # (max_entries, dims), allocated on first insert
+        self.intents = np.full(max_entries, -1, dtype=np.int16)  # Intent code per row, -1 = empty
+        self.expires_at = np.zeros(max_entries)
+        self.queries = [None] * max_entries
+        self.responses = [None] * max_entries
+        self.intent_codes = {intent: code for code, intent in enumerate(self.INTENT_THRESHOLDS)}
+        self._lock = threading.Lock()
+        self.telemetry = get_cache_telemetry()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'inserts': 0,
+            'replacements': 0,
+            'total_requests': 0
+        }
+        print(f"✅ Semantic response cache initialized (max {max_entries} entries)")
+
+    def threshold_for_intent(self, intent: str) -> Optional[float]:
+        """Similarity needed to reuse an answer for this intent (None = not cached)"""
+        return self.INTENT_THRESHOLDS.get(intent)
+
+    def _normalize(self, vector: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _reset(self, model: str, dimensions: int):
+        """Start over for a new embedding model (vectors aren't comparable across models)"""
+        self.model = model
+        self.matrix = np.zeros((self.max_entries, dimensions), dtype=np.float32)
+        self.intents.fill(-1)
+        self.expires_at.fill(0)
+        self.queries = [None] * self.max_entries
+        self.responses = [None] * self.max_entries
+
+    def lookup(self, query_vector: List[float], intent: str, model: str) -> Optional[Dict]:
+        """
+        Find a cached answer for a similar query of the same intent
+
+        Returns:
+            Copy of the cached response with the matched query and similarity,
+            or None
+        """
+        threshold = self.threshold_for_intent(intent)
+        vector = self._normalize(query_vector) if threshold else None
+        if vector is None:
+            return None
+
+        with self._lock:
+            self.stats['total_requests'] += 1
+            row, similarity = self._best_match(vector, intent, model)
+
+            if similarity < threshold:
+                self.stats['misses'] += 1
+                self.telemetry.record('semantic', f"semantic:{intent}", 'misses')
+                return None
+
+            self.stats['hits'] += 1
+            response = self.responses[row].copy()
+            matched_query = self.queries[row]
+
+        self.telemetry.record('semantic', f"semantic:{intent}", 'hits')
+        response['semantic_match'] = {'query': matched_query, 'similarity': round(similarity, 4)}
+        return response
+
+    def _best_match(self, vector: np.ndarray, intent: str, model: str) -> tuple:
+        """(row, similarity) of the closest live entry of the intent, similarity -1 if none (caller holds the lock)"""
+        if self.matrix is None or model != self.model or vector.shape[0] != self.matrix.shape[1]:
+            return None, -1.0
+
+        live = (self.intents == self.intent_codes[intent]) & (self.expires_at > time.time())
+        if not live.any():
+            return None, -1.0
+
+        similarities = np.where(live, self.matrix @ vector, -1.0)
+        row = int(np.argmax(similarities))
+        return row, float(similarities[row])
+
+    def add(self, query: str, query_vector: List[float], intent: str, model: str,
+            response: Dict, ttl: int) -> bool:
+        """Cache an answer for a query; False if the intent isn't cacheable"""
+        vector = self._normalize(query_vector)
+        if not self.threshold_for_intent(intent) or not ttl or vector is None:
+            return False
+
+        with self._lock:
+            if self.matrix is None or model != self.model or vector.shape[0] != self.matrix.shape[1]:
+                self._reset(model, vector.shape[0])
+
+            row = int(np.argmin(self.expires_at))  # Empty and expired rows sort first
+            if self.intents[row] >= 0 and self.expires_at[row] > time.time():
+                self.stats['replacements'] += 1
+                replaced_intent = list(self.intent_codes)[self.intents[row]]
+                self.telemetry.record('semantic', f"semantic:{replaced_intent}", 'evictions')
+
+            self.matrix[row] = vector
+            self.intents[row] = self.intent_codes[intent]
+            self.expires_at[row] = time.time() + ttl
+            self.queries[row] = query
+            self.responses[row] = response.copy()
+            self.stats['inserts'] += 1
+        self.telemetry.record('semantic', f"semantic:{intent}", 'sets')
+        return True
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self.intents.fill(-1)
+            self.expires_at.fill(0)
+            self.queries = [None] * self.max_entries
+            self.responses = [None] * self.max_entries
+
+    def get_stats(self) -> Dict:
+        """Get semantic cache statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['cache_size'] = int(((self.intents >= 0) & (self.expires_at > time.time())).sum())
+
+        stats['max_size'] = self.max_entries
+        stats['model'] = self.model
+        stats['hit_rate'] = round(stats['hits'] / stats['total_requests'] * 100, 2) if stats['total_requests'] else 0
+        return stats
+
+# Global semantic cache instance
+_semantic_cache = None
+
+def get_semantic_cache(max_entries: int = None):
+    """Get global semantic response cache instance (settings apply on first call)"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticResponseCache(max_entries=max_entries or 2000)
+    return _semantic_cache
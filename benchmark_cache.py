@@ -0,0 +1,81 @@
+"""
+Benchmark CacheManager for SafeIndy Assistant
+Measures get/set/evict cost as the cache grows, against the previous
+min()-scan LRU eviction
+
+Usage:
+    python benchmark_cache.py --sizes 10000 100000 1000000 --ops 50000
+"""
+
+import argparse
+import random
+import time
+
+from app.utils.cache_backends import MemoryCacheBackend
+from app.utils.cache_manager import CacheManager
+
+class ScanEvictionBackend(MemoryCacheBackend):
+    """Previous eviction strategy: scan every entry for the oldest last_accessed"""
+
+    def __init__(self):
+        super().__init__(stripes=1)
+
+    def _evict_lru(self, shard):
+        lru_key = min(shard.entries.keys(), key=lambda k: shard.entries[k]['last_accessed'])
+        shard.remove(lru_key)
+        shard.stats['evictions'] += 1
+
+def fill(cache: CacheManager, size: int):
+    cache.max_cache_size = size
+    for i in range(size):
+        cache.set(f"key_{i}", i, ttl=3600)
+
+def time_ops(label: str, ops: int, fn) -> float:
+    started = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    per_op = (time.perf_counter() - started) * 1e6 / ops
+    print(f"  {label:<26} {per_op:>10.2f} µs/op")
+    return per_op
+
+def bench(cache_class, size: int, ops: int):
+    cache = cache_class()
+    started = time.perf_counter()
+    fill(cache, size)
+    print(f"  {'fill':<26} {(time.perf_counter() - started) * 1e6 / size:>10.2f} µs/op")
+
+    rng = random.Random(7)
+    keys = [f"key_{rng.randrange(size)}" for _ in range(ops)]
+    time_ops('get (hit)', ops, lambda i: cache.get(keys[i]))
+    time_ops('set (overwrite)', ops, lambda i: cache.set(keys[i], i, ttl=3600))
+    time_ops('set (new key, evicts)', ops, lambda i: cache.set(f"new_{i}", i, ttl=3600))
+
+    # Short-lived entries expiring while new ones arrive
+    expiring = cache_class()
+    expiring.max_cache_size = size
+    for i in range(size):
+        expiring.set(f"key_{i}", i, ttl=0.5 if i % 2 else 3600)
+    time.sleep(0.6)
+    time_ops('set (with expiry)', ops, lambda i: expiring.set(f"new_{i}", i, ttl=3600))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CacheManager LRU/TTL operations')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000, 1000000])
+    parser.add_argument('--ops', type=int, default=50000)
+    parser.add_argument('--scan-max-size', type=int, default=100000,
+                        help='Largest size to run the min()-scan baseline at (it is O(n) per eviction)')
+    parser.add_argument('--scan-ops', type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(f"🔄 {size} entries, CacheManager")
+        bench(CacheManager, size, args.ops)
+
+        if size <= args.scan_max_size:
+            print(f"🔄 {size} entries, min()-scan eviction baseline")
+            cache = CacheManager(ScanEvictionBackend())
+            fill(cache, size)
+            time_ops('set (new key, evicts)', args.scan_ops, lambda i: cache.set(f"new_{i}", i, ttl=3600))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark Qdrant transports for SafeIndy Assistant
+Compares search latency over REST, gRPC and embedded on-disk mode on the
+same synthetic collection
+
+Usage:
+    python benchmark_qdrant_transport.py --points 5000 --queries 300
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from app.config import Config
+
+TRANSPORTS = ['rest', 'grpc', 'embedded']
+
+def make_client(transport: str, embedded_path: str) -> QdrantClient:
+    if transport == 'embedded':
+        return QdrantClient(path=embedded_path)
+    return QdrantClient(
+        url=Config.QDRANT_URL,
+        api_key=Config.QDRANT_API_KEY,
+        prefer_grpc=transport == 'grpc',
+        grpc_port=Config.QDRANT_GRPC_PORT,
+        timeout=120
+    )
+
+def load_collection(client: QdrantClient, name: str, data: np.ndarray, categories: list, batch_size: int):
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(size=data.shape[1], distance=models.Distance.COSINE)
+    )
+    client.create_payload_index(collection_name=name, field_name='category',
+                                field_schema=models.PayloadSchemaType.KEYWORD)
+    for start in range(0, len(data), batch_size):
+        chunk = data[start:start + batch_size]
+        client.upsert(
+            collection_name=name,
+            points=models.Batch(
+                ids=list(range(start, start + len(chunk))),
+                vectors=chunk.tolist(),
+                payloads=[{'category': categories[i], 'content': f'entry {i}'} for i in range(start, start + len(chunk))]
+            ),
+            wait=True
+        )
+
+def time_searches(client: QdrantClient, name: str, queries: np.ndarray, batch: int) -> np.ndarray:
+    """Per-query latency in ms, single searches (batch=1) or search_batch"""
+    category_filter = models.Filter(must=[
+        models.FieldCondition(key='category', match=models.MatchValue(value='police'))
+    ])
+    latencies = []
+
+    for start in range(0, len(queries), batch):
+        group = queries[start:start + batch]
+        started = time.perf_counter()
+        if batch == 1:
+            client.search(collection_name=name, query_vector=group[0].tolist(),
+                          query_filter=category_filter, limit=5, with_payload=True)
+        else:
+            client.search_batch(collection_name=name, requests=[
+                models.SearchRequest(vector=q.tolist(), filter=category_filter, limit=5, with_payload=True)
+                for q in group
+            ])
+        latencies.extend([(time.perf_counter() - started) * 1000 / len(group)] * len(group))
+
+    return np.array(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Qdrant REST vs gRPC vs embedded search latency')
+    parser.add_argument('--points', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--dimensions', type=int, default=1024)
+    parser.add_argument('--batch', type=int, default=8, help='Queries per search_batch call')
+    parser.add_argument('--transports', nargs='+', default=TRANSPORTS, choices=TRANSPORTS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    data = rng.normal(size=(args.points, args.dimensions)).astype(np.float32)
+    queries = rng.normal(size=(args.queries, args.dimensions)).astype(np.float32)
+    categories = [['police', 'medical', 'emergency', 'city_services'][i % 4] for i in range(args.points)]
+
+    print(f"🔄 {args.points} points, {args.queries} queries, {args.dimensions} dims")
+    print(f"{'transport':<10} {'single p50':>11} {'single p95':>11} {'batch p50':>10} {'batch p95':>10}")
+
+    embedded_path = tempfile.mkdtemp(prefix='qdrant_bench_')
+    try:
+        for transport in args.transports:
+            name = f"benchmark_transport_{uuid.uuid4().hex[:8]}"
+            client = None
+            try:
+                client = make_client(transport, embedded_path)
+                load_collection(client, name, data, categories, Config.QDRANT_UPSERT_BATCH_SIZE)
+                time_searches(client, name, queries[:20], 1)  # Warm connections and caches
+
+                single = time_searches(client, name, queries, 1)
+                batched = time_searches(client, name, queries, args.batch)
+
+                print(f"{transport:<10} {np.percentile(single, 50):>11.2f} {np.percentile(single, 95):>11.2f} "
+                      f"{np.percentile(batched, 50):>10.2f} {np.percentile(batched, 95):>10.2f}")
+
+            except Exception as e:
+                print(f"❌ {transport}: {e}")
+
+            finally:
+                if client is not None:
+                    try:
+                        client.delete_collection(name)
+                        client.close()
+                    except Exception:
+                        pass
+    finally:
+        shutil.rmtree(embedded_path, ignore_errors=True)
+
+    print("Latencies in ms per query (batch rows: call time / queries per call)")
+
+if __name__ == '__main__':
+    main()
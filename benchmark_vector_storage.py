@@ -0,0 +1,141 @@
+"""
+Benchmark Qdrant storage modes for SafeIndy Assistant
+Compares recall@5, search latency and estimated memory for full float32,
+scalar int8 and binary quantized collections
+
+Usage:
+    python benchmark_vector_storage.py --points 20000 --queries 200
+"""
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from app.config import Config
+
+MODES = ['none', 'scalar', 'binary']
+
+def make_dataset(points: int, queries: int, dimensions: int, seed: int = 42):
+    """Clustered unit vectors, closer to real embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(points // 200, 8), dimensions)).astype(np.float32)
+
+    def sample(n):
+        vectors = centers[rng.integers(len(centers), size=n)] + 0.35 * rng.normal(size=(n, dimensions)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(points), sample(queries)
+
+def exact_top_k(data: np.ndarray, query_vectors: np.ndarray, k: int):
+    """Brute-force cosine ground truth"""
+    scores = query_vectors @ data.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def estimate_memory(mode: str, points: int, dimensions: int, hnsw_m: int, on_disk: bool) -> int:
+    """RAM estimate: vectors held in memory plus HNSW graph links"""
+    full = 0 if on_disk and mode != 'none' else points * dimensions * 4
+    quantized = {'none': 0, 'scalar': points * dimensions, 'binary': points * dimensions // 8}[mode]
+    graph = points * hnsw_m * 2 * 4
+    return full + quantized + graph
+
+def build_collection(client, name: str, mode: str, data: np.ndarray, args):
+    quantization = None
+    if mode == 'scalar':
+        quantization = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif mode == 'binary':
+        quantization = models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=models.VectorParams(
+            size=data.shape[1],
+            distance=models.Distance.COSINE,
+            on_disk=args.on_disk and mode != 'none'
+        ),
+        quantization_config=quantization,
+        hnsw_config=models.HnswConfigDiff(m=args.hnsw_m, ef_construct=args.ef_construct)
+    )
+
+    for start in range(0, len(data), args.batch_size):
+        chunk = data[start:start + args.batch_size]
+        client.upsert(
+            collection_name=name,
+            points=models.Batch(ids=list(range(start, start + len(chunk))), vectors=chunk.tolist()),
+            wait=True
+        )
+
+def run_queries(client, name: str, mode: str, query_vectors: np.ndarray, args):
+    """Return (result ids per query, latencies in ms)"""
+    quantization = None
+    if mode != 'none':
+        quantization = models.QuantizationSearchParams(rescore=args.rescore, oversampling=args.oversampling)
+    params = models.SearchParams(hnsw_ef=args.hnsw_ef, quantization=quantization)
+
+    found, latencies = [], []
+    for query in query_vectors:
+        started = time.perf_counter()
+        hits = client.search(
+            collection_name=name,
+            query_vector=query.tolist(),
+            search_params=params,
+            limit=args.k,
+            with_payload=False
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append([hit.id for hit in hits])
+    return found, np.array(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Qdrant quantization modes')
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--dimensions', type=int, default=1024)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=Config.QDRANT_UPSERT_BATCH_SIZE)
+    parser.add_argument('--hnsw-m', type=int, default=Config.QDRANT_HNSW_M)
+    parser.add_argument('--ef-construct', type=int, default=Config.QDRANT_HNSW_EF_CONSTRUCT)
+    parser.add_argument('--hnsw-ef', type=int, default=Config.QDRANT_SEARCH_HNSW_EF or 128)
+    parser.add_argument('--oversampling', type=float, default=Config.QDRANT_OVERSAMPLING)
+    parser.add_argument('--no-rescore', dest='rescore', action='store_false')
+    parser.add_argument('--on-disk', action='store_true', help='Keep full vectors on disk for quantized modes')
+    parser.add_argument('--modes', nargs='+', default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    client = QdrantClient(url=Config.QDRANT_URL, api_key=Config.QDRANT_API_KEY, timeout=120)
+    data, query_vectors = make_dataset(args.points, args.queries, args.dimensions)
+    truth = exact_top_k(data, query_vectors, args.k)
+
+    print(f"🔄 {args.points} points, {args.queries} queries, {args.dimensions} dims, "
+          f"rescore={args.rescore}, oversampling={args.oversampling}")
+    print(f"{'mode':<8} {'recall@' + str(args.k):>9} {'p50 ms':>8} {'p95 ms':>8} {'est. RAM MB':>12}")
+
+    for mode in args.modes:
+        name = f"benchmark_{mode}_{uuid.uuid4().hex[:8]}"
+        try:
+            build_collection(client, name, mode, data, args)
+            found, latencies = run_queries(client, name, mode, query_vectors, args)
+
+            recall = np.mean([len(set(hits) & set(expected.tolist())) / args.k
+                              for hits, expected in zip(found, truth)])
+            memory = estimate_memory(mode, args.points, args.dimensions, args.hnsw_m, args.on_disk)
+
+            print(f"{mode:<8} {recall:>9.3f} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 95):>8.2f} {memory / 1024 / 1024:>12.1f}")
+
+        except Exception as e:
+            print(f"❌ {mode}: {e}")
+
+        finally:
+            try:
+                client.delete_collection(name)
+            except Exception:
+                pass
+
+if __name__ == '__main__':
+    main()
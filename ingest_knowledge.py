@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+SafeIndy Assistant - Knowledge Base Ingestion
+Streams Markdown, HTML, text and JSONL documents into the Qdrant knowledge base.
+
+Usage:
+    python ingest_knowledge.py docs/ordinances --category city_services --checkpoint ingest.db
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# A one-shot bulk load never searches, so don't mirror the collection in memory
+os.environ['VECTOR_LOCAL_INDEX'] = 'off'
+os.environ['VECTOR_RETRIEVAL_MODE'] = 'dense'
+
+from app import create_app
+from app.services.ingestion_service import IngestionService
+
+def main():
+    """Run the ingestion pipeline inside a Flask app context"""
+    parser = argparse.ArgumentParser(description='Load documents into the SafeIndy knowledge base')
+    parser.add_argument('paths', nargs='+', help='Files or directories to ingest')
+    parser.add_argument('--category', default='general', help='Knowledge category for the chunks')
+    parser.add_argument('--source', help='Source label (defaults to the file name)')
+    parser.add_argument('--checkpoint', help='Checkpoint file so interrupted runs can resume')
+    parser.add_argument('--chunk-size', type=int, default=1200, help='Characters per chunk')
+    parser.add_argument('--chunk-overlap', type=int, default=150, help='Characters of overlap between chunks')
+    args = parser.parse_args()
+    
+    print("🚀 Starting SafeIndy knowledge ingestion...")
+    
+    app = create_app()
+    
+    with app.app_context():
+        ingestion = IngestionService(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        stats = ingestion.ingest_paths(
+            args.paths,
+            category=args.category,
+            source=args.source,
+            checkpoint_path=args.checkpoint
+        )
+    
+    print("=" * 50)
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+    
+    if not stats.get('success'):
+        print("❌ Ingestion stopped early - rerun with the same --checkpoint to resume")
+        sys.exit(1)
+    
+    print("✅ Ingestion complete")
+
+if __name__ == "__main__":
+    main()
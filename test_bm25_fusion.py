@@ -0,0 +1,85 @@
+# test_bm25_fusion.py
+# Run this to check the BM25 lexical index and reciprocal rank fusion with dense results
+
+from app.utils.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    {'content': 'IMPD non-emergency line is 317-327-3811 for police reports', 'category': 'emergency_services'},
+    {'content': 'RequestIndy handles potholes, trash pickup and other city services', 'category': 'city_services'},
+    {'content': 'Indianapolis Fire Department stations serve every township', 'category': 'emergency_services'},
+    {'content': 'Trash pickup schedules vary by neighborhood in Indianapolis', 'category': 'city_services'},
+]
+
+def make_index():
+    index = BM25Index()
+    index.load(list(range(len(DOCS))), [dict(doc) for doc in DOCS])
+    return index
+
+def test_tokenize_phone_digits():
+    """Stopwords drop out and a phone number in any style also indexes as one digit token"""
+    tokens = tokenize('What is the IMPD number? (317) 327-3811')
+
+    assert 'the' not in tokens and 'impd' in tokens
+    assert '3173273811' in tokens
+    assert tokenize('317.327.3811')[-1] == '3173273811'
+
+def test_exact_tokens_rank_first():
+    """Exact names and phone numbers put their document at the top"""
+    index = make_index()
+
+    assert index.search('RequestIndy')[0][1] is index.payloads[1]
+    assert index.search('317 327 3811')[0][1]['content'].startswith('IMPD')
+    assert index.search('the of and') == []  # Only stopwords
+
+def test_category_filter():
+    """A category limits the results to that category's documents"""
+    index = make_index()
+    results = index.search('trash pickup Indianapolis', category='city_services')
+
+    assert [payload['category'] for _, payload in results] == ['city_services', 'city_services']
+    assert all(payload['category'] == 'emergency_services'
+               for _, payload in index.search('Indianapolis', category='emergency_services'))
+
+def test_upsert_and_remove():
+    """Upserted documents replace old terms and removed documents stop matching"""
+    index = make_index()
+    index.upsert([1], [{'content': 'Mayor Action Center takes city service requests', 'category': 'city_services'}])
+
+    assert index.search('RequestIndy') == []
+    assert index.search('Mayor Action Center')[0][1]['content'].startswith('Mayor')
+    assert index.size == 4
+
+    index.remove([0, 1])
+    assert index.search('IMPD') == [] and index.search('Mayor') == []
+    assert index.size == 2
+    assert index.total_length == sum(index.doc_lengths.values())
+
+def test_rrf_rewards_agreement():
+    """A document near the top of both lists beats one that is first in one and last in the other"""
+    a, b, c = ({'content': text} for text in ('a', 'b', 'c'))
+    dense = [(0.9, a), (0.8, b), (0.1, c)]
+    lexical = [(12.0, b), (7.0, c), (3.0, a)]
+    fused = reciprocal_rank_fusion([dense, lexical], k=60, limit=2)
+
+    assert [payload['content'] for _, payload in fused] == ['b', 'a']
+    assert abs(fused[0][0] - (1 / 61 + 1 / 62)) < 1e-9
+
+def test_rrf_matches_by_content_hash():
+    """Payloads are matched across lists by content_hash before content"""
+    dense = [(0.9, {'content': 'old text', 'content_hash': 'h1'}), (0.5, {'content': 'other', 'content_hash': 'h2'})]
+    lexical = [(4.0, {'content': 'new text', 'content_hash': 'h1'})]
+    fused = reciprocal_rank_fusion([dense, lexical], limit=5)
+
+    assert len(fused) == 2
+    assert fused[0][1]['content_hash'] == 'h1' and abs(fused[0][0] - 2 / 61) < 1e-9
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - BM25 Fusion Test\n")
+
+    for test in [test_tokenize_phone_digits, test_exact_tokens_rank_first, test_category_filter,
+                 test_upsert_and_remove, test_rrf_rewards_agreement, test_rrf_matches_by_content_hash]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
@@ -0,0 +1,180 @@
+# test_cache_concurrency.py
+# Run this to stress the cache, rate limiter and analytics counters from many threads
+
+import os
+import random
+import tempfile
+import threading
+
+from flask import Flask
+
+from app.services.analytics_service import AnalyticsService
+from app.utils.cache_backends import SQLiteCacheBackend
+from app.utils.cache_manager import CacheManager
+from app.utils.cache_telemetry import CacheTelemetry
+from app.utils.rate_limiter import RateLimiter
+
+THREADS = 16
+OPERATIONS = 5000
+
+def run_threads(worker):
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_cache_stats_consistent():
+    """Concurrent get/set/delete on a full cache keeps counters and size consistent"""
+    cache = CacheManager()
+    cache.max_cache_size = 500
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(OPERATIONS):
+                key = f"key_{rng.randrange(2000)}"
+                roll = rng.random()
+                if roll < 0.5:
+                    cache.get(key)
+                elif roll < 0.95:
+                    cache.set(key, {'value': key}, ttl=rng.choice([0.001, 60]))
+                else:
+                    cache.delete(key)
+        except Exception as e:
+            errors.append(e)
+
+    run_threads(worker)
+    stats = cache.get_stats()
+
+    print(f"📊 Cache: {stats['total_requests']} gets, {stats['hits']} hits, "
+          f"{stats['evictions']} evictions, {stats['cache_size']} entries")
+    assert not errors, errors
+    assert stats['hits'] + stats['misses'] == stats['total_requests']
+    assert stats['cache_size'] <= stats['max_size'] + len(cache.backend._shards)  # Stripes round their share up
+    for shard in cache.backend._shards:
+        live = set(shard.entries)
+        assert live <= {key for _, key in shard.expiry_heap}
+        assert shard.bytes == sum(item['size'] for item in shard.entries.values())
+
+def test_sqlite_backend_shared():
+    """Entries written through one SQLite backend are read through another (as by another worker)"""
+    path = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    writer = CacheManager(SQLiteCacheBackend(path, 'ai_response'))
+    reader = CacheManager(SQLiteCacheBackend(path, 'ai_response'))
+    other_namespace = CacheManager(SQLiteCacheBackend(path, 'weather'))
+    errors = []
+
+    def worker(seed):
+        try:
+            for i in range(50):
+                key = f"key_{seed}_{i}"
+                writer.set(key, {'response': key}, ttl=60)
+                assert reader.get(key) == {'response': key}
+                assert other_namespace.get(key) is None
+        except Exception as e:
+            errors.append(e)
+
+    run_threads(worker)
+    stats = reader.get_stats()
+
+    print(f"📊 SQLite backend: {stats['cache_size']} entries, {stats['hits']} cross-instance hits")
+    assert not errors, errors
+    assert stats['hits'] == THREADS * 50
+
+def test_telemetry_counts_consistent():
+    """Striped per-prefix counters add up to the backend's own totals"""
+    cache = CacheManager()
+    cache.telemetry = CacheTelemetry()
+    cache.backend.listener = cache._on_backend_event
+    cache.max_cache_size = 200
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(OPERATIONS):
+            key = f"{rng.choice(['ai_response:city_services', 'ai_response:information'])}_{rng.randrange(1000)}"
+            if rng.random() < 0.5:
+                cache.get(key)
+            else:
+                cache.set(key, {'value': key}, ttl=60)
+
+    run_threads(worker)
+    stats = cache.get_stats()
+    labels = cache.telemetry.report()['caches'][cache.namespace]
+
+    rates = ', '.join(f"{label} {row['hit_rate']}%" for label, row in labels.items())
+    print(f"📊 Telemetry hit rates: {rates}")
+    assert set(labels) == {'ai_response:city_services', 'ai_response:information'}
+    assert sum(row.get('hits', 0) for row in labels.values()) == stats['hits']
+    assert sum(row.get('misses', 0) for row in labels.values()) == stats['misses']
+    assert sum(row.get('evictions', 0) for row in labels.values()) == stats['evictions']
+    assert sum(row.get('bytes_stored', 0) - row.get('bytes_evicted', 0) for row in labels.values()) >= stats['memory_bytes']
+    assert set(cache.telemetry.report()['intents']) == {'city_services', 'information'}
+
+def test_telemetry_drops_exited_threads():
+    """Short-lived request threads don't leave their counter dicts behind in telemetry"""
+    telemetry = CacheTelemetry()
+
+    for _ in range(20):  # Like threaded=True, one thread per request
+        run_threads(lambda seed: telemetry.record('ai', 'ai_response:general', 'hits'))
+    registered = len(telemetry._thread_counters)
+    hits = telemetry.report()['caches']['ai']['ai_response:general']['hits']
+
+    print(f"📊 Telemetry: {registered} thread dict(s) registered after {20 * THREADS} threads")
+    assert registered < 64 + 2 * THREADS
+    assert len(telemetry._thread_counters) == 0  # All exited, folded on read
+    assert hits == 20 * THREADS
+
+def test_rate_limiter_counts_consistent():
+    """Every allowed request is counted exactly once under contention"""
+    limiter = RateLimiter()
+    limiter.rules['stress'] = {'limit': 10 ** 9, 'window': 3600, 'block_duration': 60}
+    allowed = []
+
+    def worker(seed):
+        count = 0
+        for _ in range(OPERATIONS // 10):
+            ok, _ = limiter.is_allowed('stress', identifier='shared_client')
+            count += ok
+        allowed.append(count)
+
+    run_threads(worker)
+    key = 'shared_client_stress'
+
+    print(f"📊 Rate limiter: {sum(allowed)} allowed, {limiter.request_counts[key]} counted")
+    assert limiter.request_counts[key] == sum(allowed) == THREADS * (OPERATIONS // 10)
+    assert len(limiter.requests[key]) == sum(allowed)
+
+def test_analytics_counts_consistent():
+    """Message and session counters add up after concurrent tracking"""
+    app = Flask(__name__)
+    with app.app_context():
+        analytics = AnalyticsService()
+
+    def worker(seed):
+        with app.app_context():
+            for i in range(OPERATIONS // 10):
+                analytics.track_message('test', {'intent': 'general'}, 0.01, f"session_{i % 50}")
+                analytics.track_api_call('search', i % 7 != 0, 0.01)
+
+    run_threads(worker)
+    messages = THREADS * (OPERATIONS // 10)
+
+    print(f"📊 Analytics: {analytics.metrics['total_messages']} messages, {analytics.metrics['user_sessions']} sessions")
+    assert analytics.metrics['total_messages'] == messages
+    assert analytics.metrics['intent_distribution']['general'] == messages
+    assert analytics.metrics['user_sessions'] == len(analytics.session_data) == 50
+    assert sum(s['message_count'] for s in analytics.session_data.values()) == messages
+    assert analytics.metrics['api_calls']['search'] == messages
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Cache Concurrency Stress Test\n")
+
+    for test in [test_cache_stats_consistent, test_sqlite_backend_shared, test_telemetry_counts_consistent,
+                 test_telemetry_drops_exited_threads, test_rate_limiter_counts_consistent, test_analytics_counts_consistent]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
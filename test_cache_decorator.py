@@ -0,0 +1,132 @@
+# test_cache_decorator.py
+# Run this to check @cached: fresh, stale, negative and failure paths, and the search TTL split
+
+import itertools
+import time
+
+from app.services.search_service import SearchService
+from app.utils.cache_decorator import cached
+from app.utils.cache_manager import CacheManager
+
+def make_counter(ttl=60, stale_ttl=0, negative_ttl=0, fail_on=()):
+    """@cached function returning {'n': call number}, or an error result on the given call numbers"""
+    manager = CacheManager()
+    calls = itertools.count(1)
+
+    @cached(ttl=ttl, stale_ttl=stale_ttl, negative_ttl=negative_ttl, cache=lambda: manager,
+            name=f"test.counter_{id(manager)}", is_failure=lambda result: bool(result.get('error')))
+    def counter(query):
+        n = next(calls)
+        return {'n': n, 'error': 'upstream down'} if n in fail_on else {'n': n}
+
+    return counter
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_fresh_hit():
+    """A fresh result is served without calling the function again"""
+    counter = make_counter()
+
+    assert counter('a') == {'n': 1}
+    assert counter('a') == {'n': 1}
+    assert counter('b') == {'n': 2}
+    stats = counter.cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+
+def test_stale_served_while_refreshing():
+    """Past ttl but within stale_ttl the old result is served and one background call refreshes it"""
+    counter = make_counter(ttl=0.2, stale_ttl=5)
+    counter('a')
+    time.sleep(0.3)
+
+    assert counter('a') == {'n': 1}  # Stale, refresh started
+    assert wait_for(lambda: counter.cache_stats()['refreshes'] == 1)
+    assert counter('a') == {'n': 2}
+    stats = counter.cache_stats()
+    assert stats['stale_hits'] == 1 and stats['hits'] == 1 and stats['misses'] == 1
+
+def test_no_stale_without_stale_ttl():
+    """Without stale_ttl an expired result is recomputed inline"""
+    counter = make_counter(ttl=0.2)
+    counter('a')
+    time.sleep(0.3)
+
+    assert counter('a') == {'n': 2}
+    assert counter.cache_stats()['stale_hits'] == 0
+
+def test_failed_refresh_keeps_stale():
+    """A failed background refresh leaves the stale result in place"""
+    counter = make_counter(ttl=0.2, stale_ttl=5, fail_on=(2,))
+    counter('a')
+    time.sleep(0.3)
+
+    assert counter('a') == {'n': 1}
+    assert wait_for(lambda: counter.cache_stats()['refresh_failures'] == 1)
+    assert counter('a') == {'n': 1}  # Still stale; the next refresh succeeds
+    assert wait_for(lambda: counter.cache_stats()['refreshes'] == 1)
+
+def test_negative_cache():
+    """Failures are remembered for negative_ttl, then retried"""
+    counter = make_counter(negative_ttl=0.2, fail_on=(1,))
+
+    assert counter('a')['error']
+    assert counter('a')['n'] == 1  # Remembered failure
+    time.sleep(0.3)
+    assert counter('a') == {'n': 2}
+    stats = counter.cache_stats()
+    assert stats['failures'] == 1 and stats['negative_hits'] == 1
+
+def test_failures_not_cached_without_negative_ttl():
+    """Without negative_ttl every call after a failure tries again"""
+    counter = make_counter(fail_on=(1,))
+
+    assert counter('a')['error']
+    assert counter('a') == {'n': 2}
+    assert counter('a') == {'n': 2}
+
+def test_exceptions_propagate_uncached():
+    """An exception reaches the caller and nothing is cached"""
+    manager = CacheManager()
+    calls = []
+
+    @cached(ttl=60, negative_ttl=60, cache=lambda: manager, name='test.raises')
+    def raises(query):
+        calls.append(query)
+        raise ValueError('boom')
+
+    for _ in range(2):
+        try:
+            raises('a')
+            assert False, 'expected ValueError'
+        except ValueError:
+            pass
+    assert len(calls) == 2
+
+def test_live_search_never_stale():
+    """Weather and emergency searches use the short, non-stale cache; other searches may go stale"""
+    service = SearchService()
+    routed = []
+    service._search_live = lambda query, focus_area: routed.append(('live', focus_area)) or {}
+    service._search_reference = lambda query, focus_area: routed.append(('reference', focus_area)) or {}
+
+    for focus_area in ['weather', 'emergency_services', 'city_services', 'community_resources']:
+        service._search_with_focus('query', focus_area)
+
+    assert routed == [('live', 'weather'), ('live', 'emergency_services'),
+                      ('reference', 'city_services'), ('reference', 'community_resources')]
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Cache Decorator Test\n")
+
+    for test in [test_fresh_hit, test_stale_served_while_refreshing, test_no_stale_without_stale_ttl,
+                 test_failed_refresh_keeps_stale, test_negative_cache, test_failures_not_cached_without_negative_ttl,
+                 test_exceptions_propagate_uncached, test_live_search_never_stale]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
@@ -0,0 +1,85 @@
+# test_cache_snapshot.py
+# Run this to check cache snapshots: format, what is saved, merging and restore
+
+import json
+import os
+import tempfile
+import time
+
+from app.utils.cache_manager import get_ai_cache, get_function_cache, get_location_cache, get_weather_cache
+from app.utils.cache_snapshot import restore_snapshot, save_snapshot
+
+def clear_caches():
+    for cache in (get_ai_cache(), get_location_cache(), get_weather_cache(), get_function_cache()):
+        cache.clear()
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_snapshot_is_json_without_responses():
+    """Snapshots are JSON lines and leave out AI responses and non-JSON values"""
+    clear_caches()
+    get_ai_cache().set('ai_response:city_services_abc', {'response': 'Call 311'}, ttl=60)
+    get_weather_cache().set('weather_9zvxd', {'temp': 71}, ttl=60)
+    get_function_cache().set('fn_places_1', {'value': {1, 2}}, ttl=60)  # Sets aren't JSON
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.jsonl')
+        saved = save_snapshot(path)
+        lines = read_lines(path)
+        leftovers = [name for name in os.listdir(tmp) if name != 'snapshot.jsonl']
+
+    clear_caches()
+    assert saved == 1
+    assert lines[0]['version'] == 2
+    assert [(line['cache'], line['key']) for line in lines[1:]] == [(get_weather_cache().namespace, 'weather_9zvxd')]
+    assert leftovers == []  # Temp file renamed into place
+
+def test_workers_merge_into_one_snapshot():
+    """A second worker's save keeps the first worker's unexpired entries"""
+    clear_caches()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.jsonl')
+        namespace = get_weather_cache().namespace
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': 2, 'saved_at': time.time()}) + '\n')
+            f.write(json.dumps({'cache': namespace, 'key': 'weather_other', 'value': {'temp': 60},
+                                'expires_at': time.time() + 60}) + '\n')
+            f.write(json.dumps({'cache': namespace, 'key': 'weather_expired', 'value': {'temp': 50},
+                                'expires_at': time.time() - 1}) + '\n')
+            f.write('{"torn line\n')
+
+        get_weather_cache().set('weather_mine', {'temp': 71}, ttl=60)
+        saved = save_snapshot(path)
+        keys = [line['key'] for line in read_lines(path)[1:]]
+
+        clear_caches()
+        restored = restore_snapshot(path)
+
+    assert saved == 2 and keys == ['weather_other', 'weather_mine']
+    assert restored == 2
+    assert get_weather_cache().get('weather_other') == {'temp': 60}
+    assert get_weather_cache().get('weather_expired') is None
+    clear_caches()
+
+def test_old_or_missing_snapshot_ignored():
+    """A missing file or one from another version restores nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'snapshot.jsonl')
+        assert restore_snapshot(path) == 0
+
+        with open(path, 'w') as f:
+            f.write(json.dumps({'version': 1}) + '\n')
+        assert restore_snapshot(path) == 0
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Cache Snapshot Test\n")
+
+    for test in [test_snapshot_is_json_without_responses, test_workers_merge_into_one_snapshot,
+                 test_old_or_missing_snapshot_ignored]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
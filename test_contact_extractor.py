@@ -0,0 +1,64 @@
+# test_contact_extractor.py
+# Run this to check contact extraction from live search text
+
+from app.utils.contact_extractor import ContactExtractor, ContactIndex
+
+extractor = ContactExtractor()
+
+def test_phone_formats():
+    """Local and toll-free numbers in any common format are normalized"""
+    text = "Call (317) 327-3811, 317.327.4622 or +1 800 222 1222; not 12-317-327-38111"
+
+    assert extractor.extract_phones(text) == ['317-327-3811', '317-327-4622', '1-800-222-1222']
+
+def test_label_stops_at_colon():
+    """A 'Name: address, phone' line is labeled with the name only"""
+    records = extractor.extract("Eskenazi Health: 720 Eskenazi Ave, Indianapolis, IN 46202, 317-880-0000")
+
+    assert records == [{'name': 'Eskenazi Health', 'phones': ['317-880-0000'],
+                        'address': '720 Eskenazi Ave, Indianapolis, IN 46202'}]
+
+def test_label_stops_at_street_number():
+    """Without a colon the label ends where the street address starts"""
+    records = extractor.extract("Citizens Energy Group 2020 N Meridian St, Indianapolis, IN 46202 - 317-924-3311")
+
+    assert records[0]['name'] == 'Citizens Energy Group'
+    assert records[0]['address'] == '2020 N Meridian St, Indianapolis, IN 46202'
+
+def test_label_before_phone():
+    """A numbered "Name – phone" line keeps the name and drops the separator"""
+    records = extractor.extract("2. Crisis Hotline – 317-251-7575")
+
+    assert records[0]['name'] == 'Crisis Hotline'
+    assert extractor.extract("317-327-3811")[0]['name'] == 'Contact'
+
+def test_facility_with_detail_lines():
+    """Bulleted phone and address lines under a facility are merged into it"""
+    text = """**IU Health Methodist Hospital**
+    - 1701 N Senate Blvd, Indianapolis, IN 46202
+    - Phone: 317-962-2000
+Visit their website for visiting hours."""
+    records = extractor.extract(text)
+
+    assert records == [{'name': 'IU Health Methodist Hospital', 'phones': ['317-962-2000'],
+                        'address': '1701 N Senate Blvd, Indianapolis, IN 46202'}]
+
+def test_format_records_only_given_contacts():
+    """Facts for one search result leave out other contacts indexed in the category"""
+    index = ContactIndex()
+    index.index_text('medical', "Riley Hospital for Children: 317-944-5000")
+    records = index.index_text('medical', "Eskenazi Health: 720 Eskenazi Ave, Indianapolis, IN 46202, 317-880-0000")
+
+    assert index.format_records(records) == ['Eskenazi Health | 720 Eskenazi Ave, Indianapolis, IN 46202 | 317-880-0000']
+    assert len(index.format_facts('medical')) == 2
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Contact Extractor Test\n")
+
+    for test in [test_phone_formats, test_label_stops_at_colon, test_label_stops_at_street_number,
+                 test_label_before_phone, test_facility_with_detail_lines, test_format_records_only_given_contacts]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
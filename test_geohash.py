@@ -0,0 +1,99 @@
+# test_geohash.py
+# Run this to check geohash tiles and the neighbor-tile cache lookups built on them
+
+import os
+import tempfile
+
+from app.utils import geohash
+from app.utils.cache_backends import SQLiteCacheBackend
+from app.utils.cache_decorator import cached
+from app.utils.cache_manager import CacheManager, WeatherCache
+from app.utils.cache_telemetry import CacheTelemetry
+
+MONUMENT_CIRCLE = (39.7684, -86.1581)
+
+def test_encode_known_points():
+    """Geohashes match the reference encoding"""
+    assert geohash.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert geohash.encode(42.6, -5.6, 5) == 'ezs42'
+
+def test_tile_for_precision():
+    """tile_for uses the precision configured per data type, and its tile contains the point"""
+    weather = geohash.tile_for(*MONUMENT_CIRCLE, 'weather')
+    places = geohash.tile_for(*MONUMENT_CIRCLE, 'places')
+    box = geohash.bounds(places)
+
+    assert len(weather) == geohash.TILE_PRECISIONS['weather'] and len(places) == geohash.TILE_PRECISIONS['places']
+    assert places.startswith(weather)
+    assert box['south'] <= MONUMENT_CIRCLE[0] <= box['north'] and box['west'] <= MONUMENT_CIRCLE[1] <= box['east']
+
+def test_nearest_neighbors_ordered():
+    """The eight neighbors are distinct, adjacent and sorted by distance to the point"""
+    lat, lng = 39.7684, -86.1581
+    tile = geohash.tile_for(lat, lng, 'weather')
+    tiles = geohash.nearest_neighbors(lat, lng, 'weather')
+    distances = [geohash.haversine_km(lat, lng, *geohash.center(t)) for t in tiles]
+
+    assert len(tiles) == len(set(tiles)) == 8 and tile not in tiles
+    assert sorted(tiles) == sorted(geohash.neighbors(tile))
+    assert distances == sorted(distances)
+    assert all(len(t) == len(tile) for t in tiles)
+
+def test_neighbors_wrap_antimeridian():
+    """Tiles at 180° longitude have neighbors on the other side"""
+    tiles = geohash.neighbors(geohash.encode(0.1, 179.99, 4))
+
+    assert len(tiles) == 8
+    assert any(geohash.center(t)[1] < 0 for t in tiles)
+
+def test_neighbor_lookup_counts_one_miss():
+    """A neighbor-tile hit costs one counted miss, not one per tile tried"""
+    manager = CacheManager()
+    manager.telemetry = CacheTelemetry()
+    calls = []
+
+    @cached(ttl=60, cache=lambda: manager, name='test.tile_weather',
+            key=lambda lat, lng: {'tile': geohash.tile_for(lat, lng, 'weather')},
+            neighbors=lambda lat, lng: [{'tile': t} for t in geohash.nearest_neighbors(lat, lng, 'weather')])
+    def tile_weather(lat, lng):
+        calls.append((lat, lng))
+        return {'temp': 71}
+
+    tile_weather(*MONUMENT_CIRCLE)
+    neighbor = geohash.nearest_neighbors(*MONUMENT_CIRCLE, 'weather')[-1]
+    assert tile_weather(*geohash.center(neighbor)) == {'temp': 71}
+
+    counters = manager.telemetry.report()['caches'][manager.namespace]
+    lookups = sum(row.get('hits', 0) + row.get('misses', 0) for row in counters.values())
+    assert len(calls) == 1
+    assert lookups == 2  # The first call's miss and the neighbor call's own-tile miss
+    assert tile_weather.cache_stats()['neighbor_hits'] == 1
+
+def test_weather_cache_neighbor_lookup():
+    """WeatherCache falls back to neighboring tiles in one uncounted batch"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in [None, SQLiteCacheBackend(os.path.join(tmp, 'cache.db'), 'weather')]:
+            cache = WeatherCache()
+            if backend:
+                cache.backend = backend
+            cache.telemetry = CacheTelemetry()
+            cache.cache_weather_data(*MONUMENT_CIRCLE, {'temp': 71})
+            neighbor = geohash.nearest_neighbors(*MONUMENT_CIRCLE, 'weather')[0]
+
+            assert cache.get_weather_data(*geohash.center(neighbor))['temp'] == 71
+            assert cache.get_weather_data(*geohash.center(neighbor), use_neighbors=False) is None
+            assert cache.get_weather_data(0.0, 0.0) is None
+            stats = cache.backend.get_stats()
+            assert stats['hits'] + stats['misses'] == 3
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Geohash Tile Test\n")
+
+    for test in [test_encode_known_points, test_tile_for_precision, test_nearest_neighbors_ordered,
+                 test_neighbors_wrap_antimeridian, test_neighbor_lookup_counts_one_miss,
+                 test_weather_cache_neighbor_lookup]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
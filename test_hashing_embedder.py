@@ -0,0 +1,57 @@
+# test_hashing_embedder.py
+# Run this to check the local feature-hashing embedder used without Cohere
+
+import numpy as np
+
+from app.utils.embedding_providers import HashingEmbeddingProvider
+
+def cosine(a, b):
+    return float(np.dot(a, b))  # Vectors are unit length
+
+def test_dimensions_and_unit_norm():
+    """Every vector has the configured length and unit norm; empty text gives a zero vector"""
+    provider = HashingEmbeddingProvider(dimensions=128)
+    vectors = provider.embed(['Where is the nearest fire station?', 'IMPD', ''])
+
+    assert all(len(vector) == 128 for vector in vectors)
+    assert abs(np.linalg.norm(vectors[0]) - 1) < 1e-5 and abs(np.linalg.norm(vectors[1]) - 1) < 1e-5
+    assert not any(vectors[2])
+    assert provider.name == 'hashing-128-35' and not provider.remote
+
+def test_deterministic():
+    """The same text embeds to the same vector in a fresh provider (crc32, not hash())"""
+    text = 'Report a pothole with RequestIndy'
+
+    assert HashingEmbeddingProvider().embed([text]) == HashingEmbeddingProvider().embed([text])
+    assert HashingEmbeddingProvider().embed([text], input_type='search_query') == HashingEmbeddingProvider().embed([text])
+
+def test_typos_and_word_forms_stay_close():
+    """Typos and word forms score closer than unrelated text"""
+    provider = HashingEmbeddingProvider()
+    query, typo, form, unrelated = provider.embed([
+        'emergency shelter locations',
+        'emergancy sheltr locations',
+        'emergencies sheltering location',
+        'library book renewal hours'
+    ])
+
+    assert cosine(query, typo) > cosine(query, unrelated) + 0.3
+    assert cosine(query, form) > cosine(query, unrelated) + 0.3
+
+def test_case_and_punctuation_ignored():
+    """Case and punctuation don't change the vector"""
+    provider = HashingEmbeddingProvider()
+    first, second = provider.embed(['Call IMPD, now!', 'call impd now'])
+
+    assert cosine(first, second) > 0.9999
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Hashing Embedder Test\n")
+
+    for test in [test_dimensions_and_unit_norm, test_deterministic, test_typos_and_word_forms_stay_close,
+                 test_case_and_punctuation_ignored]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
@@ -0,0 +1,83 @@
+# test_ingestion_service.py
+# Run this to check re-ingesting edited files against an embedded Qdrant with the offline embedder
+
+import os
+import tempfile
+
+from app.services.ingestion_service import IngestionService
+from test_vector_service import make_vector_service
+
+def write_doc(path, paragraphs, mtime):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join(paragraphs))
+    os.utime(path, (mtime, mtime))
+
+def stored_payloads(vs):
+    points, _ = vs.client.scroll(vs.collection_name, limit=100, with_payload=True)
+    return sorted((point.payload for point in points), key=lambda payload: payload['content'])
+
+def test_edited_file_drops_removed_chunks():
+    """Re-ingesting an edited file deletes the chunks it no longer contains"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        ingestion = IngestionService(vs, chunk_size=40, chunk_overlap=0)
+        doc, checkpoint = os.path.join(tmp, 'trash.md'), os.path.join(tmp, 'ingest.db')
+
+        write_doc(doc, ['Trash is collected weekly.', 'Bulky items need an appointment.',
+                        'Recycling is collected every other week.'], mtime=1000)
+        ingestion.ingest_paths([doc], category='city_services', checkpoint_path=checkpoint)
+        write_doc(doc, ['Trash is collected weekly.', 'Recycling is collected every week.'], mtime=2000)
+        stats = ingestion.ingest_paths([doc], category='city_services', checkpoint_path=checkpoint)
+        contents = [payload['content'] for payload in stored_payloads(vs)]
+        vs.client.close()
+
+    assert contents == ['Recycling is collected every week.', 'Trash is collected weekly.']
+    assert stats['stale_chunks_deleted'] == 2 and stats['duplicates_skipped'] == 1
+
+def test_metadata_change_not_skipped():
+    """The same text under a new category is rewritten rather than skipped as a duplicate"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        ingestion = IngestionService(vs, chunk_size=40, chunk_overlap=0)
+        doc, checkpoint = os.path.join(tmp, 'shelters.md'), os.path.join(tmp, 'ingest.db')
+
+        write_doc(doc, ['Warming centers open below 20 degrees.'], mtime=1000)
+        ingestion.ingest_paths([doc], category='general', checkpoint_path=checkpoint)
+        os.utime(doc, (2000, 2000))
+        stats = ingestion.ingest_paths([doc], category='community_resources', checkpoint_path=checkpoint)
+        payloads = stored_payloads(vs)
+        vs.client.close()
+
+    assert stats['duplicates_skipped'] == 0 and stats['chunks_ingested'] == 1
+    assert [payload['category'] for payload in payloads] == ['community_resources']
+
+def test_chunk_shared_with_another_file_kept():
+    """A chunk removed from one file stays while another file still contains it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        ingestion = IngestionService(vs, chunk_size=40, chunk_overlap=0)
+        first, second = os.path.join(tmp, 'a.md'), os.path.join(tmp, 'b.md')
+        checkpoint = os.path.join(tmp, 'ingest.db')
+
+        write_doc(first, ['Call 311 for city services.', 'Potholes are fixed within a week.'], mtime=1000)
+        write_doc(second, ['Call 311 for city services.'], mtime=1000)
+        ingestion.ingest_paths([first, second], category='city_services', source='indy.gov',
+                               checkpoint_path=checkpoint)
+        write_doc(first, ['Potholes are fixed within a week.'], mtime=2000)
+        ingestion.ingest_paths([first, second], category='city_services', source='indy.gov',
+                               checkpoint_path=checkpoint)
+        contents = [payload['content'] for payload in stored_payloads(vs)]
+        vs.client.close()
+
+    assert contents == ['Call 311 for city services.', 'Potholes are fixed within a week.']
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Ingestion Service Test\n")
+
+    for test in [test_edited_file_drops_removed_chunks, test_metadata_change_not_skipped,
+                 test_chunk_shared_with_another_file_kept]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
@@ -0,0 +1,136 @@
+# test_local_vector_index.py
+# Run this to check the in-process vector mirror: search, filters, writes and swaps
+
+import threading
+
+import numpy as np
+
+from app.utils.local_vector_index import LocalVectorIndex
+
+DIMENSIONS = 8
+
+def axis(i, scale=1.0):
+    """Unit vector along one axis (scaled, to check normalization)"""
+    vector = [0.0] * DIMENSIONS
+    vector[i] = scale
+    return vector
+
+def make_index():
+    index = LocalVectorIndex(DIMENSIONS)
+    index.load(
+        ['a', 'b', 'c'],
+        [axis(0), axis(1, 3.0), [1.0, 1.0] + [0.0] * (DIMENSIONS - 2)],
+        [{'id': 'a', 'category': 'police'}, {'id': 'b', 'category': 'city_services'}, {'id': 'c', 'category': 'police'}]
+    )
+    return index
+
+def result_ids(results):
+    return [payload['id'] for _, payload in results]
+
+def test_search_ranks_by_cosine():
+    """Results come back best first with cosine scores"""
+    index = make_index()
+    results = index.search(axis(0), limit=3)
+
+    assert result_ids(results) == ['a', 'c', 'b']
+    assert abs(results[0][0] - 1.0) < 1e-6 and abs(results[1][0] - 0.7071) < 1e-3
+    assert index.search([0.0] * DIMENSIONS) == []
+
+def test_category_filter():
+    """The category bitmap limits results to one category"""
+    index = make_index()
+
+    assert result_ids(index.search(axis(1), category='police', limit=5)) == ['c', 'a']
+    assert result_ids(index.search(axis(0), category='city_services', limit=5)) == ['b']
+    assert index.search(axis(0), category='weather') == []
+
+def test_upsert_replaces_in_place():
+    """Upserting an id replaces its vector and category without a rebuild"""
+    index = make_index()
+    index.upsert(['a', 'd'], [axis(2), axis(3)], [{'id': 'a', 'category': 'city_services'}, {'id': 'd', 'category': 'police'}])
+
+    assert index.size == 4
+    assert result_ids(index.search(axis(2), limit=1)) == ['a']
+    assert result_ids(index.search(axis(0), category='police', limit=5)) == ['c', 'd']
+    assert sorted(result_ids(index.search(axis(2), category='city_services', limit=5))) == ['a', 'b']
+    assert index.get_stats()['categories'] == {'police': 2, 'city_services': 2}
+
+def test_remove():
+    """Removed points never come back from a search"""
+    index = make_index()
+    index.remove(['a', 'missing'])
+
+    assert index.size == 2
+    assert 'a' not in result_ids(index.search(axis(0), limit=5))
+    assert result_ids(index.search(axis(0), category='police', limit=5)) == ['c']
+    assert index.live_points()[0] == ['b', 'c']
+
+def test_load_swaps_whole_index():
+    """load() replaces every point and stamps the sync time"""
+    index = make_index()
+    index.load(['x'], [axis(4)], [{'id': 'x', 'category': 'general'}])
+
+    assert index.size == 1 and index.last_synced > 0
+    assert result_ids(index.search(axis(0), limit=5)) == ['x']
+    assert index.search(axis(0), category='police') == []
+
+def test_growth_and_compaction_amortized():
+    """Many small writes grow capacity geometrically and compact cleared rows"""
+    index = LocalVectorIndex(DIMENSIONS)
+    capacities = set()
+    for i in range(1000):
+        index.upsert([f"p{i % 50}"], [axis(i % DIMENSIONS)], [{'id': f"p{i % 50}", 'category': 'general'}])
+        capacities.add(index.get_stats()['capacity'])
+
+    stats = index.get_stats()
+    print(f"📊 {stats['points']} points in {stats['rows']} rows, capacities seen: {sorted(capacities)}")
+    assert index.size == 50
+    assert len(capacities) <= 3  # Doubling, not one reallocation per write
+    assert stats['rows'] <= 2 * 50 + 64
+    assert len(index.search(axis(0), limit=100)) == 50
+
+def test_concurrent_writes_and_searches():
+    """Searches during upserts and removals only ever see whole, live points"""
+    index = LocalVectorIndex(DIMENSIONS)
+    errors = []
+
+    def writer(seed):
+        rng = np.random.default_rng(seed)
+        for i in range(500):
+            point_id = f"w{seed}_{i % 20}"
+            if rng.random() < 0.8:
+                index.upsert([point_id], [rng.normal(size=DIMENSIONS)], [{'id': point_id, 'category': 'general'}])
+            else:
+                index.remove([point_id])
+
+    def reader(seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(500):
+            results = index.search(rng.normal(size=DIMENSIONS), category='general', limit=10)
+            ids = result_ids(results)
+            if len(ids) != len(set(ids)):
+                errors.append(ids)  # A replaced row showed up next to its replacement
+            if any(not -1.0001 <= score <= 1.0001 for score, _ in results):
+                errors.append(results)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert index.size == len(set(index.live_points()[0]))
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Local Vector Index Test\n")
+
+    for test in [test_search_ranks_by_cosine, test_category_filter, test_upsert_replaces_in_place, test_remove,
+                 test_load_swaps_whole_index, test_growth_and_compaction_amortized,
+                 test_concurrent_writes_and_searches]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
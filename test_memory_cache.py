@@ -0,0 +1,152 @@
+# test_memory_cache.py
+# Run this to check the in-memory cache backend: LRU order, heap-based expiry and byte limits
+
+import time
+
+from app.utils.cache_backends import MemoryCacheBackend, entry_size
+
+def test_evicts_least_recently_used():
+    """A full stripe evicts its least recently used entry"""
+    backend = MemoryCacheBackend(max_entries=3, stripes=1)
+    for key in ['a', 'b', 'c']:
+        backend.set(key, key, ttl=60)
+    backend.set('d', 'd', ttl=60)
+
+    assert backend.get('a') is None
+    assert [backend.get(key) for key in ['b', 'c', 'd']] == ['b', 'c', 'd']
+    assert backend.get_stats()['evictions'] == 1
+
+def test_get_and_overwrite_refresh_recency():
+    """Reading or rewriting an entry moves it to the most recently used end"""
+    backend = MemoryCacheBackend(max_entries=3, stripes=1)
+    for key in ['a', 'b', 'c']:
+        backend.set(key, key, ttl=60)
+    backend.get('a')
+    backend.set('b', 'b2', ttl=60)
+    backend.set('d', 'd', ttl=60)
+
+    assert backend.get('c') is None
+    assert list(backend._shards[0].entries) == ['a', 'b', 'd']
+    assert backend.get('b') == 'b2'
+
+def test_peek_leaves_recency_alone():
+    """peek_many neither counts nor moves entries in the LRU order"""
+    backend = MemoryCacheBackend(max_entries=2, stripes=1)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+
+    assert backend.peek_many(['a', 'missing']) == {'a': 1}
+    backend.set('c', 3, ttl=60)
+    assert backend.get('a') is None
+    assert backend.get_stats()['total_requests'] == 1
+
+def test_expired_purged_before_lru():
+    """Expired entries are popped off the heap before any live entry is evicted"""
+    backend = MemoryCacheBackend(max_entries=3, stripes=1)
+    backend.set('old', 1, ttl=60)
+    backend.set('short', 2, ttl=0.05)
+    backend.set('new', 3, ttl=60)
+    time.sleep(0.1)
+    backend.set('newest', 4, ttl=60)
+
+    assert backend.get('old') == 1
+    assert backend.get('short') is None
+    assert backend.get_stats()['evictions'] == 0
+
+def test_cleanup_expired_uses_heap():
+    """cleanup_expired removes only expired keys and skips heap entries of rewritten keys"""
+    backend = MemoryCacheBackend(stripes=1)
+    backend.set('a', 1, ttl=0.05)
+    backend.set('a', 1, ttl=60)  # Leaves an outdated heap entry for 'a'
+    backend.set('b', 2, ttl=0.05)
+    time.sleep(0.1)
+
+    assert backend.cleanup_expired() == 1
+    assert backend.get('a') == 1 and backend.get('b') is None
+    assert backend._shards[0].expiry_heap == [(backend._shards[0].entries['a']['expires_at'], 'a')]
+
+def test_heap_compacted_on_rewrites():
+    """Rewriting the same keys doesn't grow the expiry heap without bound"""
+    backend = MemoryCacheBackend(stripes=1)
+    for i in range(1000):
+        backend.set(f"key_{i % 10}", i, ttl=60)
+    shard = backend._shards[0]
+
+    assert len(shard.entries) == 10
+    assert len(shard.expiry_heap) <= 2 * len(shard.entries) + 65
+    live = [key for expires_at, key in shard.expiry_heap if shard.entries[key]['expires_at'] == expires_at]
+    assert sorted(live) == sorted(shard.entries)
+
+def shard_bytes_match(backend):
+    return all(shard.bytes == sum(item['size'] for item in shard.entries.values()) for shard in backend._shards)
+
+def test_bytes_track_entry_sizes():
+    """Each stripe's byte total equals the sizes of its entries through sets, rewrites and deletes"""
+    backend = MemoryCacheBackend()
+    for i in range(200):
+        backend.set(f"key_{i}", 'x' * (i % 50), ttl=60)
+    for i in range(0, 200, 3):
+        backend.set(f"key_{i}", {'rewritten': list(range(i))}, ttl=60)
+    for i in range(0, 200, 7):
+        backend.delete(f"key_{i}")
+
+    assert shard_bytes_match(backend)
+    assert backend.get_stats()['memory_bytes'] == sum(shard.bytes for shard in backend._shards)
+
+def test_evicts_to_stay_under_max_bytes():
+    """Entries are evicted least recently used first until the new one fits the byte limit"""
+    value = 'x' * 1000
+    size = entry_size('key_0', value)
+    backend = MemoryCacheBackend(max_entries=1000, max_bytes=size * 3, stripes=1)
+    for i in range(5):
+        backend.set(f"key_{i}", value, ttl=60)
+
+    assert list(backend._shards[0].entries) == ['key_2', 'key_3', 'key_4']
+    assert backend._shards[0].bytes <= backend.max_bytes
+    assert backend.get_stats()['evictions'] == 2 and shard_bytes_match(backend)
+
+def test_oversized_entry_rejected():
+    """An entry bigger than a stripe's byte share isn't stored and drops the older value"""
+    backend = MemoryCacheBackend(max_bytes=16 * 1024, stripes=4)
+    backend.set('big', 'small', ttl=60)
+
+    assert backend.set('big', 'x' * 5000, ttl=60) is False
+    assert backend.get('big') is None
+    assert backend.get_stats()['memory_bytes'] == 0
+
+def test_stripe_limits_add_up_to_totals():
+    """Limits that don't divide evenly over the stripes still cap the whole cache at the configured totals"""
+    backend = MemoryCacheBackend(max_entries=20, max_bytes=10_007, stripes=16)
+    capacities = [backend._shard_capacity(index) for index in range(16)]
+    for i in range(500):
+        backend.set(f"key_{i}", 'x' * (i % 40), ttl=60)
+    stats = backend.get_stats()
+
+    assert sum(entries for entries, _ in capacities) == 20
+    assert sum(max_bytes for _, max_bytes in capacities) == 10_007
+    assert stats['cache_size'] <= 20 and stats['memory_bytes'] <= 10_007
+    assert all(len(shard.entries) <= capacities[index][0] for index, shard in enumerate(backend._shards))
+
+def test_store_and_evict_events_add_up():
+    """Bytes reported by 'store' minus 'evict' events equal the bytes held"""
+    backend = MemoryCacheBackend(max_entries=20, max_bytes=64 * 1024, stripes=4)
+    totals = {'store': 0, 'evict': 0}
+    backend.listener = lambda event, key, size: totals.__setitem__(event, totals[event] + size)
+    for i in range(300):
+        backend.set(f"key_{i}", 'x' * (i * 7 % 900), ttl=60)
+
+    assert totals['evict'] > 0
+    assert totals['store'] - totals['evict'] == backend.get_stats()['memory_bytes']
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Memory Cache Test\n")
+
+    for test in [test_evicts_least_recently_used, test_get_and_overwrite_refresh_recency, test_peek_leaves_recency_alone,
+                 test_expired_purged_before_lru, test_cleanup_expired_uses_heap, test_heap_compacted_on_rewrites,
+                 test_bytes_track_entry_sizes, test_evicts_to_stay_under_max_bytes, test_oversized_entry_rejected,
+                 test_stripe_limits_add_up_to_totals, test_store_and_evict_events_add_up]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
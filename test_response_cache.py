@@ -0,0 +1,119 @@
+# test_response_cache.py
+# Run this to check which chat answers are served from the AI response cache
+
+from flask import Flask
+
+from app.services.rag_service import RAGService
+from app.utils.cache_manager import AIResponseCache
+from app.utils.semantic_cache import get_semantic_cache
+
+class FakeLLM:
+    """Counts generations; every answer names the user's location to expose leaks"""
+
+    def __init__(self, intent='city_services'):
+        self.intent = intent
+        self.calls = 0
+
+    def _classify_intent(self, user_message, ai_response):
+        return self.intent, 0.8
+
+    def generate_response(self, user_message, context=None):
+        self.calls += 1
+        location = (context or {}).get('user_location')
+        return {'response': f"Call 311 (answer {self.calls}, location {location})", 'intent': self.intent}
+
+class FakeVectors:
+    """Embeds every message to the same vector, so any two questions are paraphrases"""
+
+    embedding_model = 'fake-embed'
+
+    def __init__(self):
+        self.embeds = 0
+
+    def embed_query(self, text):
+        self.embeds += 1
+        return [1.0, 0.0, 0.0]
+
+def make_rag(llm, vectors=None):
+    rag = RAGService.__new__(RAGService)
+    rag.response_cache = AIResponseCache()
+    rag.llm_service = llm
+    rag.search_service = None
+    rag.vector_service = vectors
+    return rag
+
+def anonymous_session():
+    return {'session_id': 'anonymous', 'chat_history': [], 'location': None}
+
+def test_repeated_question_served_from_cache():
+    """An anonymous repeat of an FAQ (typos and punctuation aside) skips the LLM"""
+    llm = FakeLLM()
+    rag = make_rag(llm)
+
+    with Flask(__name__).app_context():
+        first = rag.process_message('How do I report a pothole?', anonymous_session())
+        second = rag.process_message('how do i report a pothol', anonymous_session())
+
+    print(f"📊 {llm.calls} generation(s), second from cache: {second.get('from_cache')}")
+    assert llm.calls == 1
+    assert second.get('from_cache') and second['response'] == first['response']
+    assert rag.response_cache.get_stats()['responses_served'] == 1
+
+def test_personal_sessions_bypass_cache():
+    """Answers for sessions with a location or history are neither served from nor stored in the cache"""
+    llm = FakeLLM()
+    rag = make_rag(llm)
+    located = dict(anonymous_session(), location={'coordinates': {'lat': 39.77, 'lng': -86.16}})
+    with_history = dict(anonymous_session(), chat_history=[{'user': 'hi', 'bot': 'hello'}])
+
+    with Flask(__name__).app_context():
+        rag.process_message('How do I report a pothole?', located)
+        rag.process_message('How do I report a pothole?', with_history)
+        rag.process_message('How do I report a pothole?', anonymous_session())
+        rag.process_message('How do I report a pothole?', located)
+
+    print(f"📊 {llm.calls} generations for 4 personal/anonymous asks")
+    assert llm.calls == 4
+    assert rag.response_cache.get_stats()['cache_size'] == 1  # Only the anonymous answer
+
+def test_personal_sessions_bypass_semantic_cache():
+    """Paraphrases are only matched against, and stored from, anonymous sessions"""
+    llm = FakeLLM()
+    vectors = FakeVectors()
+    rag = make_rag(llm, vectors)
+    get_semantic_cache().clear()
+    located = dict(anonymous_session(), location={'coordinates': {'lat': 39.77, 'lng': -86.16}})
+
+    with Flask(__name__).app_context():
+        rag.process_message('Where do I pay a parking ticket?', located)
+        rag.process_message('How can I pay for a parking citation?', anonymous_session())
+        paraphrase = rag.process_message('Paying a parking ticket online?', anonymous_session())
+        rag.process_message('Can I pay my parking fine by phone?', located)
+
+    print(f"📊 {llm.calls} generations, {vectors.embeds} embeddings")
+    assert llm.calls == 3
+    assert paraphrase.get('from_cache') and 'location None' in paraphrase['response']
+    assert vectors.embeds == 2  # Located sessions never embed for the cache
+    get_semantic_cache().clear()
+
+def test_weather_never_cached():
+    """Weather answers carry live alerts and are always generated fresh"""
+    llm = FakeLLM(intent='weather')
+    rag = make_rag(llm)
+
+    with Flask(__name__).app_context():
+        for _ in range(2):
+            rag.process_message('Any storm warnings?', anonymous_session())
+
+    assert llm.calls == 2
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Response Cache Test\n")
+
+    for test in [test_repeated_question_served_from_cache, test_personal_sessions_bypass_cache,
+                 test_personal_sessions_bypass_semantic_cache, test_weather_never_cached]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
@@ -0,0 +1,200 @@
+# test_vector_service.py
+# Run this to check knowledge writes against an embedded Qdrant with the offline embedder
+
+import os
+import tempfile
+
+from flask import Flask
+from qdrant_client import models
+
+from app.services.vector_service import VectorService
+from app.utils.embedding_providers import HashingEmbeddingProvider
+
+def make_vector_service(qdrant_path):
+    """Initialized VectorService on an embedded Qdrant, no background warm-up"""
+    app = Flask(__name__)
+    app.config.update(
+        QDRANT_PATH=qdrant_path,
+        EMBEDDING_BACKEND='local',
+        LOCAL_EMBEDDING_DIMENSIONS=64,
+        VECTOR_WARMUP_STATE_PATH=None,
+        RETRIEVAL_CACHE_ENABLED=False
+    )
+    vs = VectorService()
+    vs.background_warmup = False
+    with app.app_context():
+        vs._ensure_initialized()
+    vs.ensure_collection()
+    return vs
+
+def count_embedded_texts(vs):
+    """Wrap generate_embeddings_batch; returns the list of texts it embedded"""
+    embedded = []
+    generate = vs.generate_embeddings_batch
+
+    def counting(texts, *args, **kwargs):
+        embedded.extend(texts)
+        return generate(texts, *args, **kwargs)
+
+    vs.generate_embeddings_batch = counting
+    return embedded
+
+def test_metadata_change_rewrites_without_embedding():
+    """Re-adding the same content with new metadata updates the payload and skips the embedder"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        embedded = count_embedded_texts(vs)
+        entry = {'id': 'trash-pickup', 'content': 'Trash is collected weekly on your assigned day.',
+                 'category': 'city_services', 'source': 'indy.gov'}
+
+        first = vs.add_knowledge_batch([entry])
+        unchanged = vs.add_knowledge_batch([dict(entry)])
+        relabeled = vs.add_knowledge_batch([dict(entry, category='information', source='DPW',
+                                                 last_updated='2026-01-05', lat=39.77, lng=-86.16)])
+
+        point = vs.client.retrieve(vs.collection_name, ids=first, with_payload=True, with_vectors=True)[0]
+        local_payload = vs.local_index.payloads[vs.local_index.rows[point.id]] if vs.local_index.size else None
+        vs.client.close()
+
+    print(f"📊 Embedded {len(embedded)} text(s); stored category {point.payload['category']}")
+    assert first == unchanged == relabeled
+    assert len(embedded) == 1
+    assert point.payload['category'] == 'information' and point.payload['source'] == 'DPW'
+    assert point.payload['timestamp'] == '2026-01-05'
+    assert point.payload['location'] == {'lat': 39.77, 'lon': -86.16}
+    assert point.vector is not None
+    assert local_payload is None or local_payload['category'] == 'information'
+
+def test_content_change_reembeds():
+    """Changed content under the same id is embedded again"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        embedded = count_embedded_texts(vs)
+        entry = {'id': 'parking', 'content': 'Pay parking tickets online.', 'category': 'city_services'}
+
+        vs.add_knowledge_batch([entry])
+        vs.add_knowledge_batch([dict(entry, content='Pay parking tickets online or by mail.')])
+        vs.client.close()
+
+    assert embedded == ['Pay parking tickets online.', 'Pay parking tickets online or by mail.']
+
+def test_version_bumped_after_mirrors():
+    """The collection version changes only once the mirrors hold the write"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        seen_at_bump = []
+        bump = vs._bump_collection_version
+        vs._bump_collection_version = lambda: seen_at_bump.append(
+            (vs.local_index.size, vs.lexical_index.size)) or bump()
+
+        point_ids = vs.add_knowledge_batch([{'content': 'Call 317-327-3811 for IMPD non-emergencies.',
+                                             'category': 'police'}])
+        vs.delete_knowledge(point_ids[0])
+        vs.client.close()
+
+    assert seen_at_bump == [(1, 1), (0, 0)]
+
+def test_only_queries_cached():
+    """Document embeddings don't enter (or evict from) the query embedding cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        vs.embedder.remote = True  # Caching only applies to network embedders
+        vs.embedding_cache.clear()
+
+        vs.generate_embeddings_batch([f"Ordinance section {i}" for i in range(20)], input_type="search_document")
+        documents_cached = vs.embedding_cache.get_stats()['cache_size']
+        vs.embed_query('where do I report a pothole')
+        vs.embed_query('Where do I report a pothole?')
+        stats = vs.embedding_cache.get_stats()
+        vs.embedding_cache.clear()
+        vs.client.close()
+
+    assert documents_cached == 0
+    assert stats['cache_size'] == 1 and stats['hits'] == 1
+
+def test_update_moves_content_addressed_id():
+    """Editing a content-addressed entry moves it to its new content's id; slug ids stay put"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        old_id = vs.add_knowledge('Recycling is picked up every other week.', 'city_services')
+        slug_id = vs.add_knowledge_batch([{'id': 'bulky-trash', 'content': 'Schedule bulky trash pickup online.',
+                                           'category': 'city_services'}])[0]
+
+        vs.update_knowledge(old_id, new_content='Recycling is picked up every week.')
+        vs.update_knowledge(slug_id, new_content='Schedule bulky trash pickup by phone.')
+        readded = vs.add_knowledge('Recycling is picked up every week.', 'city_services')
+        stored = {str(point.id): point.payload for point in vs.client.scroll(vs.collection_name, limit=10)[0]}
+        local_ids = set(map(str, vs.local_index.rows))
+        vs.client.close()
+
+    assert readded != old_id
+    assert set(stored) == {readded, slug_id} and local_ids <= set(stored)
+    assert stored[readded]['id'] == readded
+    assert stored[slug_id]['content'] == 'Schedule bulky trash pickup by phone.'
+
+def test_resync_bumps_version_only_on_change():
+    """A resync that finds the collection unchanged keeps cached results; another worker's write invalidates them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        vs.add_knowledge('Call 317-327-3811 for IMPD non-emergencies.', 'police')
+        bumps = []
+        bump = vs._bump_collection_version
+        vs._bump_collection_version = lambda: bumps.append(1) or bump()
+
+        vs._sync_mirrors()  # First resync after local writes records the fingerprint
+        vs._sync_mirrors()
+        vs._sync_mirrors()
+        unchanged = len(bumps)
+
+        # Another worker relabels the point directly in Qdrant
+        point = vs.client.scroll(vs.collection_name, limit=1)[0][0]
+        vs.client.set_payload(vs.collection_name, payload={'payload_hash': 'other-worker'}, points=[point.id])
+        vs._sync_mirrors()
+        vs.client.close()
+
+    assert unchanged == 1
+    assert len(bumps) == 2
+
+def test_offline_backfill_compares_hashes():
+    """The offline collection re-embeds changed points and drops deleted ones even when counts already match"""
+    with tempfile.TemporaryDirectory() as tmp:
+        vs = make_vector_service(os.path.join(tmp, 'qdrant'))
+        ids = vs.add_knowledge_batch([
+            {'id': 'trash', 'content': 'Trash is collected weekly.', 'category': 'city_services'},
+            {'id': 'recycling', 'content': 'Recycling is collected every other week.', 'category': 'city_services'},
+            {'id': 'leaves', 'content': 'Leaf pickup runs in November.', 'category': 'city_services'}
+        ])
+        vs.offline_embedder = HashingEmbeddingProvider(32)
+        vs.offline_collection_name = 'offline_test'
+        first = vs.setup_offline_collection()
+
+        embedded = []
+        embed = vs.offline_embedder.embed
+        vs.offline_embedder.embed = lambda texts, *args: embedded.extend(texts) or embed(texts, *args)
+        # Another worker edits one point and deletes another straight in Qdrant
+        vs.client.set_payload(vs.collection_name, payload={'content': 'Recycling is collected weekly.',
+                                                           'payload_hash': 'other-worker'}, points=[ids[1]])
+        vs.client.delete(vs.collection_name, points_selector=models.PointIdsList(points=[ids[2]]))
+        second = vs.setup_offline_collection()
+        third = vs.setup_offline_collection()
+        offline = {str(point.id): point.payload['content'] for point in vs.client.scroll('offline_test', limit=10)[0]}
+        vs.client.close()
+
+    assert first['status'] == 'backfilled' and first['points'] == 3
+    assert second == {'status': 'backfilled', 'points': 1, 'removed': 1}
+    assert embedded == ['Recycling is collected weekly.']
+    assert third['status'] == 'in_sync'
+    assert offline == {ids[0]: 'Trash is collected weekly.', ids[1]: 'Recycling is collected weekly.'}
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Vector Service Test\n")
+
+    for test in [test_metadata_change_rewrites_without_embedding, test_content_change_reembeds,
+                 test_version_bumped_after_mirrors, test_only_queries_cached,
+                 test_update_moves_content_addressed_id, test_resync_bumps_version_only_on_change,
+                 test_offline_backfill_compares_hashes]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
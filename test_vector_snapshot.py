@@ -0,0 +1,80 @@
+# test_vector_snapshot.py
+# Run this to check that restoring a knowledge snapshot never embeds anything
+
+import json
+import os
+import tempfile
+
+import numpy as np
+from flask import Flask
+
+from app.services.snapshot_service import MANIFEST_FILE, PAYLOADS_FILE, VECTORS_FILE, SnapshotService
+from app.services.vector_service import VectorService
+from app.utils.embedding_providers import HashingEmbeddingProvider
+
+DIMENSIONS = 64
+POINTS = 25
+
+def make_app(qdrant_path):
+    app = Flask(__name__)
+    app.config.update(
+        QDRANT_PATH=qdrant_path,
+        EMBEDDING_BACKEND='local',
+        LOCAL_EMBEDDING_DIMENSIONS=DIMENSIONS,
+        VECTOR_WARMUP_STATE_PATH=None,
+        RETRIEVAL_CACHE_ENABLED=False
+    )
+    return app
+
+def write_snapshot(path):
+    """Snapshot directory of POINTS random unit vectors, as export_collection writes it"""
+    os.makedirs(path)
+    vectors = np.random.default_rng(0).normal(size=(POINTS, DIMENSIONS)).astype(np.float32)
+    np.save(os.path.join(path, VECTORS_FILE), vectors / np.linalg.norm(vectors, axis=1, keepdims=True))
+    with open(os.path.join(path, PAYLOADS_FILE), 'w') as f:
+        for i in range(POINTS):
+            payload = {'content': f"Snapshot entry {i}", 'category': 'city_services'}
+            f.write(json.dumps({'id': i + 1, 'payload': payload}) + '\n')
+    with open(os.path.join(path, MANIFEST_FILE), 'w') as f:
+        json.dump({'collection': 'safeindy_knowledge_local', 'points': POINTS, 'dimensions': DIMENSIONS,
+                   'embedding_model': HashingEmbeddingProvider(DIMENSIONS).name}, f)
+
+def count_embedding_calls(vs):
+    """Wrap every path that embeds or populates the collection; returns the call log"""
+    calls = []
+    for name in ['generate_embedding', 'generate_embeddings_batch', 'populate_initial_knowledge']:
+        method = getattr(vs, name)
+        setattr(vs, name, lambda *args, _name=name, _method=method, **kwargs: calls.append(_name) or _method(*args, **kwargs))
+    return calls
+
+def test_restore_into_empty_collection_embeds_nothing():
+    """Restoring into a fresh node neither warms up in the background nor embeds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, 'snapshot')
+        write_snapshot(snapshot_path)
+
+        with make_app(os.path.join(tmp, 'qdrant')).app_context():
+            vs = VectorService()
+            vs.background_warmup = False  # As vector_snapshot.py sets it
+            calls = count_embedding_calls(vs)
+
+            result = SnapshotService(vs).restore_collection(snapshot_path)
+            warm_up = vs.warm_up(force=True, prime_embedding=False)
+            stored = vs.client.count(vs.collection_name, exact=True).count
+            vs.client.close()
+
+    print(f"📊 Restored {result.get('points')} points, embedding calls: {calls}")
+    assert result['success'] and result['points'] == stored == POINTS
+    assert warm_up['success'] and warm_up['steps']['mirrors']['local_index'] == POINTS
+    assert vs._warmup_thread is None
+    assert calls == []
+
+if __name__ == "__main__":
+    print("🔧 SafeIndy Assistant - Vector Snapshot Test\n")
+
+    for test in [test_restore_into_empty_collection_embeds_nothing]:
+        try:
+            test()
+            print(f"✅ PASS | {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__doc__}: {e}")
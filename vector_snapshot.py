@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+SafeIndy Assistant - Knowledge Base Snapshots
+Exports the Qdrant knowledge collection to vectors.npy + payloads.jsonl and
+restores it without re-embedding anything.
+
+Usage:
+    python vector_snapshot.py export snapshots/knowledge
+    python vector_snapshot.py restore snapshots/knowledge --recreate
+"""
+
+import argparse
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Restoring into a fresh node should not first populate it through Cohere
+os.environ['VECTOR_WARMUP_ON_BOOT'] = 'False'
+
+from app import create_app
+from app.services.snapshot_service import SnapshotService
+
+def main():
+    """Export or restore a snapshot inside a Flask app context"""
+    parser = argparse.ArgumentParser(description='Export or restore the SafeIndy knowledge base')
+    parser.add_argument('action', choices=['export', 'restore'])
+    parser.add_argument('path', help='Snapshot directory')
+    parser.add_argument('--recreate', action='store_true', help='Drop and recreate the collection before restoring')
+    args = parser.parse_args()
+    
+    app = create_app()
+    
+    with app.app_context():
+        snapshot = SnapshotService()
+        # Setting up an empty collection would populate it through Cohere before the restore
+        snapshot.vector_service.background_warmup = False
+        if args.action == 'export':
+            result = snapshot.export_collection(args.path)
+        else:
+            result = snapshot.restore_collection(args.path, recreate=args.recreate)
+            if result.get('success'):
+                # Bring mirrors and the offline collection in line with the restored data
+                snapshot.vector_service.warm_up(force=True, prime_embedding=False)
+    
+    print("=" * 50)
+    print(json.dumps(result, indent=2, default=str))
+    
+    if not result.get('success'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+SafeIndy Assistant - Service Warm-up
+Checks the Qdrant collection schema and payload indexes once, ahead of
+serving traffic, and records the result so workers skip the checks at boot.
+
+Usage:
+    python warmup_services.py          # e.g. as a deploy/release step
+    python warmup_services.py --force  # re-check even if a recent record exists
+"""
+
+import argparse
+import json
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# The explicit warm-up below replaces the one create_app would run
+os.environ['VECTOR_WARMUP_ON_BOOT'] = 'False'
+
+from app import create_app, warm_up_services
+
+def main():
+    """Run service warm-up inside a Flask app context"""
+    parser = argparse.ArgumentParser(description='Warm up SafeIndy services before serving traffic')
+    parser.add_argument('--force', action='store_true', help='Ignore the warm-up record and re-check everything')
+    args = parser.parse_args()
+    
+    print("🚀 Warming up SafeIndy services...")
+    
+    app = create_app()
+    results = warm_up_services(app, force=args.force)
+    
+    print("=" * 50)
+    print(json.dumps(results, indent=2, default=str))
+    
+    if not all(result.get('success') for result in results.values()):
+        print("❌ Warm-up failed")
+        sys.exit(1)
+    
+    print("✅ Warm-up complete")
+
+if __name__ == "__main__":
+    main()